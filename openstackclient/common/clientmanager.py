@@ -15,11 +15,16 @@
 
 """Manage access to the clients, including authenticating when needed."""
 
+import hashlib
 import logging
 import pkg_resources
+import six
 import sys
+import threading
 
+from openstackclient.identity import catalog as identity_catalog
 from openstackclient.identity import client as identity_client
+from openstackclient.identity import lookup as identity_lookup
 
 
 LOG = logging.getLogger(__name__)
@@ -37,10 +42,15 @@ class ClientCache(object):
             self._handle = self.factory(instance)
         return self._handle
 
+    def reset(self):
+        """Forget the client handle so the next access creates a new one"""
+        self._handle = None
+
 
 class ClientManager(object):
     """Manages access to API clients, including authentication."""
     identity = ClientCache(identity_client.make_client)
+    identity_lookup = ClientCache(identity_lookup.make_lookup)
 
     def __init__(self, token=None, url=None, auth_url=None,
                  domain_id=None, domain_name=None,
@@ -48,7 +58,8 @@ class ClientManager(object):
                  username=None, password=None,
                  user_domain_id=None, user_domain_name=None,
                  project_domain_id=None, project_domain_name=None,
-                 region_name=None, api_version=None, verify=True):
+                 region_name=None, api_version=None, verify=True,
+                 identity_cache=None, catalog_cache=None):
         self._token = token
         self._url = url
         self._auth_url = auth_url
@@ -64,7 +75,13 @@ class ClientManager(object):
         self._project_domain_name = project_domain_name
         self._region_name = region_name
         self._api_version = api_version
+        self._identity_cache = identity_cache
+        self._catalog_cache = None
+        if catalog_cache:
+            self._catalog_cache = identity_catalog.CatalogCache(catalog_cache)
         self._service_catalog = None
+        self._refresh_thread = None
+        self.token_from_cache = False
 
         # verify is the Requests-compatible form
         self._verify = verify
@@ -77,22 +94,111 @@ class ClientManager(object):
             self._insecure = True
 
         self.auth_ref = None
+        self.catalog = None
 
         if not self._url:
-            # Populate other password flow attributes
-            self.auth_ref = self.identity.auth_ref
-            self._token = self.identity.auth_token
-            self._service_catalog = self.identity.service_catalog
+            cached = None
+            if self._catalog_cache:
+                cached = self._catalog_cache.load(self._catalog_scope())
+            if cached:
+                # The token is still good, skip authenticating
+                self.auth_ref, self.catalog, stale = cached
+                self._token = self.auth_ref.auth_token
+                self._service_catalog = self.auth_ref.service_catalog
+                self.token_from_cache = True
+                if stale:
+                    self._refresh_thread = threading.Thread(
+                        target=self._refresh_catalog)
+                    self._refresh_thread.daemon = True
+                    self._refresh_thread.start()
+            else:
+                # Populate other password flow attributes
+                self.auth_ref = self.identity.auth_ref
+                self._token = self.identity.auth_token
+                self._service_catalog = self.identity.service_catalog
+                self.catalog = identity_catalog.ServiceCatalog.from_auth_ref(
+                    self.auth_ref)
+                if self._catalog_cache:
+                    self._catalog_cache.save(
+                        self._catalog_scope(),
+                        self.auth_ref,
+                    )
 
         return
 
-    def get_endpoint_for_service_type(self, service_type):
+    def _catalog_scope(self):
+        """Return the key of the credentials in the catalog cache"""
+        scope = '|'.join(six.text_type(v or '') for v in (
+            self._auth_url,
+            self._api_version and self._api_version.get('identity'),
+            self._username,
+            self._user_domain_id,
+            self._user_domain_name,
+            self._project_id,
+            self._project_name,
+            self._project_domain_id,
+            self._project_domain_name,
+            self._domain_id,
+            self._domain_name,
+        ))
+        # A changed or wrong password must not find the token of the old
+        # one, only a digest of it salted with the rest of the key is kept
+        password = self._password or ''
+        if isinstance(password, six.text_type):
+            password = password.encode('utf-8')
+        digest = hashlib.sha256(scope.encode('utf-8') + b'|' + password)
+        return scope + '|' + digest.hexdigest()
+
+    def _refresh_catalog(self):
+        # Runs in the background while the command uses the cached catalog
+        try:
+            client = identity_client.authenticate(self)
+            self._catalog_cache.save(self._catalog_scope(), client.auth_ref)
+        except Exception as e:
+            LOG.debug('unable to refresh the catalog cache: %s' % e)
+
+    def token_rejected(self, error):
+        """Return whether error is a 401 for a token from the catalog cache
+
+        The cache entry is dropped so the next ClientManager authenticates
+        again instead of reusing the token.
+        """
+        if not self.token_from_cache:
+            return False
+        status = (getattr(error, 'http_status', None) or
+                  getattr(error, 'code', None) or
+                  getattr(getattr(error, 'response', None),
+                          'status_code', None))
+        if status != 401 and type(error).__name__ not in (
+                'Unauthorized', 'HTTPUnauthorized'):
+            return False
+        LOG.debug('cached token was rejected, dropping it')
+        self._catalog_cache.drop(self._catalog_scope())
+        self._reset_clients()
+        return True
+
+    @classmethod
+    def _reset_clients(cls):
+        # The handles live on the class, shared by all ClientManagers
+        for value in vars(cls).values():
+            if isinstance(value, ClientCache):
+                value.reset()
+
+    def wait_for_refresh(self, timeout=None):
+        """Wait for a background catalog refresh to finish"""
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout)
+
+    def get_endpoint_for_service_type(self, service_type, interface='public'):
         """Return the endpoint URL for the service type."""
         # See if we are using password flow auth, i.e. we have a
         # service catalog to select endpoints from
-        if self._service_catalog:
-            endpoint = self._service_catalog.url_for(
-                service_type=service_type)
+        if self.catalog:
+            endpoint = self.catalog.url_for(
+                service_type,
+                interface=interface,
+                region=self._region_name,
+            )
         else:
             # Hope we were given the correct URL.
             endpoint = self._url
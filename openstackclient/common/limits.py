@@ -15,6 +15,7 @@
 
 """Limits Action Implementation"""
 
+import functools
 import itertools
 import logging
 
@@ -57,8 +58,13 @@ class ShowLimits(lister.Lister):
         compute_client = self.app.client_manager.compute
         volume_client = self.app.client_manager.volume
 
-        compute_limits = compute_client.limits.get(parsed_args.is_reserved)
-        volume_limits = volume_client.limits.get()
+        compute_limits, volume_limits = utils.run_parallel([
+            functools.partial(
+                compute_client.limits.get,
+                parsed_args.is_reserved,
+            ),
+            volume_client.limits.get,
+        ])
 
         if parsed_args.is_absolute:
             compute_limits = compute_limits.absolute
@@ -0,0 +1,354 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Project purge action implementation"""
+
+import functools
+import logging
+
+from cliff import lister
+
+from openstackclient.common import exceptions
+from openstackclient.common import utils
+from openstackclient.identity import common as identity_common
+from openstackclient.object.v1.lib import container as lib_container
+from openstackclient.object.v1.lib import object as lib_object
+
+
+SERVICES = ('compute', 'volume', 'image', 'object-store')
+
+# Resources are deleted one stage at a time, a stage only starts when
+# everything in the previous one is gone: servers release their volumes
+# and snapshots must go before the volumes they were taken from
+STAGES = (
+    ('server', 'image', 'container'),
+    ('snapshot',),
+    ('volume',),
+)
+
+# The attributes holding the owning project of each resource type
+OWNER_ATTRS = {
+    'server': 'tenant_id',
+    'snapshot': 'os-extended-snapshot-attributes:project_id',
+    'volume': 'os-vol-tenant-attr:tenant_id',
+}
+
+
+def _account_url(endpoint, project_id):
+    """Return the object store account URL of another project
+
+    Only endpoints with the usual AUTH_<project> account can be
+    rewritten, None is returned for any other layout.
+    """
+
+    base, sep, account = endpoint.rstrip('/').rpartition('/AUTH_')
+    if not sep or '/' in account:
+        return None
+    return base + sep + project_id
+
+
+class PurgeProject(lister.Lister):
+    """Delete a project along with its servers, volumes, images and objects"""
+
+    log = logging.getLogger(__name__ + '.PurgeProject')
+
+    def get_parser(self, prog_name):
+        parser = super(PurgeProject, self).get_parser(prog_name)
+        parser.add_argument(
+            'project',
+            metavar='<project>',
+            help='Project to purge (name or ID)',
+        )
+        parser.add_argument(
+            '--skip',
+            metavar='<service>',
+            action='append',
+            default=[],
+            choices=SERVICES,
+            help='Leave the resources of this service alone, one of %s '
+                 '(repeat option to skip multiple services)' %
+                 ', '.join(SERVICES),
+        )
+        parser.add_argument(
+            '--keep-project',
+            action='store_true',
+            default=False,
+            help='Only delete the resources, keep the project itself',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the resources that would be deleted',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of resources to delete at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--timeout',
+            metavar='<seconds>',
+            type=int,
+            default=600,
+            help='Seconds to wait for each stage of deletions to finish '
+                 '(default: 600)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            metavar='<seconds>',
+            type=int,
+            default=2,
+            help='Seconds between checks for finished deletions '
+                 '(default: 2)',
+        )
+        return parser
+
+    def _owned(self, kind, resources, project_id, name_attr='name'):
+        """Return the (id, name) of the resources owned by project_id
+
+        A service that ignores the project filter must not get us to
+        delete the resources of other projects, those are left out.
+
+        :raises: CommandError if the owner of a resource is not shown
+        """
+
+        owned = []
+        for resource in resources:
+            owner = getattr(resource, OWNER_ATTRS[kind], None)
+            if owner is None:
+                msg = ("Unable to tell which project %s %s belongs to, not "
+                       "purging anything" % (kind, resource.id))
+                raise exceptions.CommandError(msg)
+            if owner != project_id:
+                self.log.warning('Leaving %s %s of project %s alone' %
+                                 (kind, resource.id, owner))
+                continue
+            owned.append((resource.id, getattr(resource, name_attr)))
+        return owned
+
+    def _discover(self, project_id, skip):
+        """Return the resources of a project, listing all services at once
+
+        Servers waiting to be reclaimed are remembered in soft_deleted,
+        they need a forced delete to go away.
+
+        :rtype: a dict mapping each resource type to a list of (id, name)
+        """
+
+        client_manager = self.app.client_manager
+        search_opts = {'all_tenants': True}
+        listings = {}
+        self.soft_deleted = set()
+
+        if 'compute' not in skip:
+            def _servers():
+                servers = client_manager.compute.servers.list(
+                    search_opts=dict(search_opts, tenant_id=project_id))
+                owned = self._owned('server', servers, project_id)
+                ids = set(server_id for server_id, name in owned)
+                self.soft_deleted.update(
+                    s.id for s in servers
+                    if s.id in ids and s.status.lower() == 'soft_deleted')
+                return owned
+
+            listings['server'] = _servers
+        if 'volume' not in skip:
+            volume_opts = dict(search_opts, project_id=project_id)
+            listings['snapshot'] = lambda: self._owned(
+                'snapshot',
+                client_manager.volume.volume_snapshots.list(
+                    search_opts=volume_opts),
+                project_id,
+                name_attr='display_name',
+            )
+            listings['volume'] = lambda: self._owned(
+                'volume',
+                client_manager.volume.volumes.list(search_opts=volume_opts),
+                project_id,
+                name_attr='display_name',
+            )
+        if 'image' not in skip:
+            if client_manager._api_version['image'] == '1':
+                # Image API v1 only lists public images unless is_public
+                # is cleared, and matches the owner on the client
+                image_opts = {'owner': project_id, 'is_public': None}
+            else:
+                image_opts = {'filters': {'owner': project_id}}
+            listings['image'] = lambda: [
+                (i.id, i.name)
+                for i in client_manager.image.images.list(**image_opts)
+                # Never take the images of another project
+                if getattr(i, 'owner', None) == project_id
+            ]
+        if 'object-store' not in skip:
+            url = _account_url(
+                client_manager.object_store.endpoint,
+                project_id,
+            )
+            if url:
+                listings['container'] = lambda: [
+                    (c['name'], c['name'])
+                    for c in lib_container.list_containers(
+                        self.app.restapi,
+                        url,
+                        full_listing=True,
+                    )
+                ]
+            else:
+                self.log.warning('Unable to find the object store account '
+                                 'of project %s, skipping objects' %
+                                 project_id)
+
+        kinds = sorted(listings)
+        return dict(zip(kinds, utils.run_parallel(
+            [listings[kind] for kind in kinds])))
+
+    def _delete_container(self, url, container,
+                          concurrency=utils.DEFAULT_WORKERS):
+        # Containers have to be emptied before they can be deleted
+        list(utils.map_parallel(
+            lambda obj: lib_object.delete_object(
+                self.app.restapi,
+                url,
+                container,
+                obj['name'],
+            ),
+            lib_object.iter_objects(self.app.restapi, url, container),
+            max_workers=concurrency,
+        ))
+        lib_container.delete_container(self.app.restapi, url, container)
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        client_manager = self.app.client_manager
+
+        project = utils.find_resource(
+            identity_common.project_manager(client_manager.identity),
+            parsed_args.project,
+        )
+        resources = self._discover(project.id, parsed_args.skip)
+
+        rows = []
+        if parsed_args.dry_run:
+            for stage in STAGES:
+                for kind in stage:
+                    rows.extend(
+                        (kind, resource_id, name, 'pending')
+                        for resource_id, name in resources.get(kind, []))
+            if not parsed_args.keep_project:
+                rows.append(('project', project.id, project.name, 'pending'))
+            return (('Type', 'ID', 'Name', 'Status'), rows)
+
+        # Deleting a resource starts the deletion, waiting for servers,
+        # snapshots and volumes to actually disappear is done per stage
+        deleters = {}
+        waiters = {}
+        if 'server' in resources:
+            servers = client_manager.compute.servers
+
+            def _delete_server(server_id):
+                if server_id in self.soft_deleted:
+                    servers.force_delete(server_id)
+                else:
+                    servers.delete(server_id)
+
+            def _get_server(server_id):
+                server = servers.get(server_id)
+                if (server.status.lower() == 'soft_deleted' and
+                        server_id not in self.soft_deleted):
+                    # Deferred deletes are only reclaimed much later, and
+                    # never show up as gone until then
+                    self.soft_deleted.add(server_id)
+                    servers.force_delete(server_id)
+                return server
+
+            deleters['server'] = _delete_server
+            waiters['server'] = _get_server
+        if 'volume' in resources:
+            deleters['snapshot'] = \
+                client_manager.volume.volume_snapshots.delete
+            waiters['snapshot'] = client_manager.volume.volume_snapshots.get
+            deleters['volume'] = client_manager.volume.volumes.delete
+            waiters['volume'] = client_manager.volume.volumes.get
+        if 'image' in resources:
+            deleters['image'] = client_manager.image.images.delete
+        if 'container' in resources:
+            url = _account_url(
+                client_manager.object_store.endpoint,
+                project.id,
+            )
+            deleters['container'] = functools.partial(
+                self._delete_container,
+                url,
+                concurrency=parsed_args.concurrency,
+            )
+
+        failed = False
+        for stage in STAGES:
+            work = [
+                (kind, resource_id, name)
+                for kind in stage
+                for resource_id, name in resources.get(kind, [])
+            ]
+
+            def _delete(item):
+                kind, resource_id, name = item
+                try:
+                    deleters[kind](resource_id)
+                except Exception as e:
+                    self.log.error('Unable to delete %s %s: %s' %
+                                   (kind, resource_id, e))
+                    return item, False
+                return item, True
+
+            started = []
+            for item, ok in utils.map_parallel(
+                _delete,
+                work,
+                max_workers=parsed_args.concurrency,
+            ):
+                if ok and item[0] in waiters:
+                    started.append(item)
+                else:
+                    rows.append(item + ('deleted' if ok else 'failed',))
+                    failed = failed or not ok
+
+            # One waiter polls everything deleted in this stage together
+            deleted = utils.wait_for_delete(
+                lambda item: waiters[item[0]](item[1]),
+                started,
+                sleep_time=parsed_args.poll_interval,
+                timeout=parsed_args.timeout,
+                max_workers=parsed_args.concurrency,
+            )
+            for item in started:
+                rows.append(item + ('deleted' if deleted[item] else 'failed',))
+                failed = failed or not deleted[item]
+
+        if not parsed_args.keep_project:
+            if failed:
+                self.log.error('Not deleting project %s, some of its '
+                               'resources are left' % project.name)
+                status = 'kept'
+            else:
+                identity_common.project_manager(
+                    client_manager.identity).delete(project.id)
+                status = 'deleted'
+            rows.append(('project', project.id, project.name, status))
+        return (('Type', 'ID', 'Name', 'Status'), rows)
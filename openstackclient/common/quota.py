@@ -15,13 +15,23 @@
 
 """Quota action implementations"""
 
+import csv
+import functools
 import itertools
 import logging
 import six
 import sys
+import yaml
 
+from cinderclient import exceptions as volume_exc
 from cliff import command
+from cliff import lister
 from cliff import show
+from novaclient import exceptions as compute_exc
+
+from openstackclient.common import exceptions
+from openstackclient.common import utils
+from openstackclient.identity import common as identity_common
 
 
 # List the quota items, map the internal argument name to the option
@@ -48,6 +58,329 @@ VOLUME_QUOTAS = {
     'volumes': 'volumes',
 }
 
+# Map compute quota names to the absolute limits reporting their usage
+COMPUTE_USAGE = {
+    'cores': 'totalCoresUsed',
+    'floating_ips': 'totalFloatingIpsUsed',
+    'instances': 'totalInstancesUsed',
+    'ram': 'totalRAMUsed',
+    'security_groups': 'totalSecurityGroupsUsed',
+}
+
+# Quotas shown by 'quota list' without --long
+LIST_QUOTAS = (
+    'instances',
+    'cores',
+    'ram',
+    'volumes',
+    'gigabytes',
+    'snapshots',
+)
+
+
+def _format_usage(used, limit):
+    """Return used/limit with the utilisation percentage"""
+    if used is None:
+        return limit
+    if limit is None or limit < 0:
+        return '%s/unlimited' % used
+    if limit == 0:
+        return '%s/0' % used
+    return '%s/%s (%d%%)' % (used, limit, 100 * used // limit)
+
+
+def _load_quota_file(path):
+    """Read desired quotas from a YAML, JSON or CSV file
+
+    YAML and JSON files map project names or IDs to a mapping of quota
+    names to values.  CSV files have a 'project' column and one column
+    per quota, empty cells are ignored.
+
+    :param path: the file to read
+    :rtype: a dict mapping project to a dict of internal quota names to
+            integer values
+    """
+
+    # Accept both the internal quota names and the option names
+    quota_names = {}
+    for k, v in itertools.chain(
+            COMPUTE_QUOTAS.items(), VOLUME_QUOTAS.items()):
+        quota_names[k] = k
+        quota_names[v] = k
+
+    try:
+        with open(path) as f:
+            if path.lower().endswith('.csv'):
+                data = {}
+                for row in csv.DictReader(f):
+                    project = row.pop('project', None)
+                    if not project:
+                        continue
+                    data[project] = dict(
+                        (k, v) for k, v in row.items() if v not in ('', None))
+            else:
+                data = yaml.safe_load(f)
+    except (IOError, csv.Error, yaml.YAMLError) as e:
+        msg = "Error reading quota file %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+    if not isinstance(data, dict):
+        msg = "Quota file %s must map projects to quotas" % path
+        raise exceptions.CommandError(msg)
+
+    desired = {}
+    for project, quotas in data.items():
+        project = identity_common.text(project)
+        desired[project] = {}
+        for name, value in (quotas or {}).items():
+            if name not in quota_names:
+                msg = "Unknown quota '%s' for project %s" % (name, project)
+                raise exceptions.CommandError(msg)
+            try:
+                desired[project][quota_names[name]] = int(value)
+            except (TypeError, ValueError):
+                msg = "Invalid value '%s' for quota %s of project %s" % (
+                    value, name, project)
+                raise exceptions.CommandError(msg)
+    return desired
+
+
+class ApplyQuota(lister.Lister):
+    """Apply quotas for many projects from a file"""
+
+    log = logging.getLogger(__name__ + '.ApplyQuota')
+
+    def get_parser(self, prog_name):
+        parser = super(ApplyQuota, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            required=True,
+            help='YAML, JSON or CSV file with the desired quotas per project',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the changes that would be made',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of projects to handle at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--rate',
+            metavar='<calls>',
+            type=float,
+            help='Make at most <calls> quota updates per second',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+
+        compute_client = self.app.client_manager.compute
+        volume_client = self.app.client_manager.volume
+        identity_client = self.app.client_manager.identity
+
+        desired = _load_quota_file(parsed_args.file)
+
+        # Two projects sharing a name in the file is an error, not a guess
+        index, unknown = identity_common.find_resources(
+            identity_common.project_manager(identity_client),
+            desired,
+        )
+        if unknown:
+            msg = "Unknown project(s) in %s: %s" % (
+                parsed_args.file,
+                ', '.join(unknown),
+            )
+            raise exceptions.CommandError(msg)
+
+        def _diff(item):
+            project, quotas = item
+            current = {}
+            if any(k in COMPUTE_QUOTAS for k in quotas):
+                current.update(compute_client.quotas.get(project.id)._info)
+            if any(k in VOLUME_QUOTAS for k in quotas):
+                current.update(volume_client.quotas.get(project.id)._info)
+            changes = dict(
+                (k, (current.get(k), v)) for k, v in quotas.items()
+                if current.get(k) != v)
+            return project, changes
+
+        plan = [
+            (project, changes) for project, changes in utils.map_parallel(
+                _diff,
+                ((index[p], quotas) for p, quotas in desired.items()),
+                max_workers=parsed_args.concurrency,
+            ) if changes
+        ]
+
+        limiter = utils.RateLimiter(parsed_args.rate)
+        names = dict(itertools.chain(
+            COMPUTE_QUOTAS.items(), VOLUME_QUOTAS.items()))
+
+        def _apply(item):
+            project, changes = item
+            compute_kwargs = dict(
+                (k, v[1]) for k, v in changes.items() if k in COMPUTE_QUOTAS)
+            volume_kwargs = dict(
+                (k, v[1]) for k, v in changes.items() if k in VOLUME_QUOTAS)
+            if parsed_args.dry_run:
+                status = 'pending'
+            else:
+                try:
+                    if compute_kwargs:
+                        limiter.wait()
+                        compute_client.quotas.update(
+                            project.id,
+                            **compute_kwargs)
+                    if volume_kwargs:
+                        limiter.wait()
+                        volume_client.quotas.update(
+                            project.id,
+                            **volume_kwargs)
+                    status = 'updated'
+                except (compute_exc.ClientException,
+                        volume_exc.ClientException) as e:
+                    self.log.error('Unable to update quotas for project '
+                                   '%s: %s' % (project.id, e))
+                    status = 'failed'
+            return [
+                (project.id, project.name, names[k], old, new, status)
+                for k, (old, new) in sorted(changes.items())
+            ]
+
+        columns = ('Project ID', 'Project Name', 'Quota', 'Old Value',
+                   'New Value', 'Status')
+        data = list(itertools.chain.from_iterable(utils.map_parallel(
+            _apply,
+            plan,
+            max_workers=parsed_args.concurrency,
+            ordered=False,
+        )))
+        failed = sorted(set(row[1] for row in data if row[5] == 'failed'))
+        if failed:
+            msg = "Unable to update quotas of %d of %d projects: %s" % (
+                len(failed),
+                len(plan),
+                ', '.join(failed),
+            )
+            raise exceptions.CommandError(msg)
+        return (columns, data)
+
+
+class ListQuota(lister.Lister):
+    """List quotas for all projects"""
+
+    log = logging.getLogger(__name__ + '.ListQuota')
+
+    def get_parser(self, prog_name):
+        parser = super(ListQuota, self).get_parser(prog_name)
+        parser.add_argument(
+            '--usage',
+            action='store_true',
+            default=False,
+            help='Include current usage and utilisation percentages',
+        )
+        parser.add_argument(
+            '--long',
+            action='store_true',
+            default=False,
+            help='List all quotas instead of the most common ones',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of projects to query at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+
+        compute_client = self.app.client_manager.compute
+        volume_client = self.app.client_manager.volume
+        identity_client = self.app.client_manager.identity
+
+        if parsed_args.long:
+            quotas = sorted(itertools.chain(COMPUTE_QUOTAS, VOLUME_QUOTAS))
+        else:
+            quotas = LIST_QUOTAS
+        names = dict(itertools.chain(
+            COMPUTE_QUOTAS.items(), VOLUME_QUOTAS.items()))
+        columns = ('Project ID', 'Project Name') + tuple(
+            names[q] for q in quotas)
+
+        def _project_row(project):
+            # The services are independent, ask all of them at once
+            calls = [
+                functools.partial(compute_client.quotas.get, project.id),
+            ]
+            if parsed_args.usage:
+                calls.append(functools.partial(
+                    volume_client.quotas.get,
+                    project.id,
+                    usage=True,
+                ))
+                calls.append(functools.partial(
+                    compute_client.limits.get,
+                    tenant_id=project.id,
+                ))
+            else:
+                calls.append(functools.partial(
+                    volume_client.quotas.get,
+                    project.id,
+                ))
+            try:
+                results = utils.run_parallel(calls)
+            except (compute_exc.ClientException,
+                    volume_exc.ClientException) as e:
+                # Do not lose the whole report over one project
+                self.log.warning('Unable to get quotas for project %s: %s' %
+                                 (project.id, e))
+                return None
+
+            compute_quota = results[0]._info
+            volume_quota = results[1]._info
+            used = {}
+            if parsed_args.usage:
+                absolute = dict(
+                    (l.name, l.value) for l in results[2].absolute)
+                for k, v in COMPUTE_USAGE.items():
+                    if v in absolute:
+                        used[k] = absolute[v]
+                for k in VOLUME_QUOTAS:
+                    if isinstance(volume_quota.get(k), dict):
+                        used[k] = volume_quota[k].get('in_use')
+                        volume_quota[k] = volume_quota[k].get('limit')
+
+            row = [project.id, project.name]
+            for q in quotas:
+                if q in COMPUTE_QUOTAS:
+                    limit = compute_quota.get(q)
+                else:
+                    limit = volume_quota.get(q)
+                row.append(_format_usage(used.get(q), limit))
+            return tuple(row)
+
+        projects = identity_common.project_manager(identity_client).list()
+        rows = utils.map_parallel(
+            _project_row,
+            projects,
+            max_workers=parsed_args.concurrency,
+            ordered=False,
+        )
+        return (columns, (row for row in rows if row is not None))
+
 
 class SetQuota(command.Command):
     """Set quotas for project or class"""
@@ -99,23 +432,25 @@ class SetQuota(command.Command):
             return
 
         if parsed_args.quota_class:
-            if compute_kwargs:
-                compute_client.quota_classes.update(
-                    parsed_args.project,
-                    **compute_kwargs)
-            if volume_kwargs:
-                volume_client.quota_classes.update(
-                    parsed_args.project,
-                    **volume_kwargs)
+            compute_manager = compute_client.quota_classes
+            volume_manager = volume_client.quota_classes
         else:
-            if compute_kwargs:
-                compute_client.quotas.update(
-                    parsed_args.project,
-                    **compute_kwargs)
-            if volume_kwargs:
-                volume_client.quotas.update(
-                    parsed_args.project,
-                    **volume_kwargs)
+            compute_manager = compute_client.quotas
+            volume_manager = volume_client.quotas
+
+        # The compute and volume updates are independent, do them at once
+        calls = []
+        if compute_kwargs:
+            calls.append(functools.partial(
+                compute_manager.update,
+                parsed_args.project,
+                **compute_kwargs))
+        if volume_kwargs:
+            calls.append(functools.partial(
+                volume_manager.update,
+                parsed_args.project,
+                **volume_kwargs))
+        utils.run_parallel(calls)
 
 
 class ShowQuota(show.ShowOne):
@@ -160,18 +495,19 @@ class ShowQuota(show.ShowOne):
         #                intended behaviour of the API we will validate
         #                the argument with Identity ourselves later.
         if parsed_args.quota_class:
-            compute_quota = compute_client.quota_classes.get(
-                parsed_args.project)
-            volume_quota = volume_client.quota_classes.get(
-                parsed_args.project)
+            compute_get = compute_client.quota_classes.get
+            volume_get = volume_client.quota_classes.get
         elif parsed_args.default:
-            compute_quota = compute_client.quotas.defaults(
-                parsed_args.project)
-            volume_quota = volume_client.quotas.defaults(
-                parsed_args.project)
+            compute_get = compute_client.quotas.defaults
+            volume_get = volume_client.quotas.defaults
         else:
-            compute_quota = compute_client.quotas.get(parsed_args.project)
-            volume_quota = volume_client.quotas.get(parsed_args.project)
+            compute_get = compute_client.quotas.get
+            volume_get = volume_client.quotas.get
+
+        compute_quota, volume_quota = utils.run_parallel([
+            functools.partial(compute_get, parsed_args.project),
+            functools.partial(volume_get, parsed_args.project),
+        ])
 
         info = {}
         info.update(compute_quota._info)
@@ -0,0 +1,247 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Passphrase encrypted files for secrets created by bulk commands"""
+
+import csv
+import getpass
+import hmac
+import logging
+import os
+import six
+import sys
+import tempfile
+
+from cliff import lister
+from Crypto.Cipher import AES
+from Crypto.Hash import HMAC
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2
+
+from openstackclient.common import exceptions
+
+
+MAGIC = b'OSCSECRETS1'
+SALT_SIZE = 16
+KDF_ROUNDS = 20000
+PASSPHRASE_ENV = 'OS_SECRETS_PASSPHRASE'
+
+
+def get_passphrase(stdin, confirm=True):
+    """Return the passphrase from the environment or a prompt"""
+
+    passphrase = os.environ.get(PASSPHRASE_ENV)
+    if passphrase:
+        return passphrase
+    if hasattr(stdin, 'isatty') and stdin.isatty():
+        try:
+            while True:
+                first = getpass.getpass("Secrets file passphrase: ")
+                if not confirm:
+                    return first
+                second = getpass.getpass("Repeat passphrase: ")
+                if first and first == second:
+                    return first
+                sys.stderr.write("The passphrases entered were empty or "
+                                 "not the same\n")
+        except EOFError:  # Ctl-D
+            raise exceptions.CommandError("Error reading passphrase.")
+    raise exceptions.CommandError(
+        "A passphrase is needed for the secrets file, set %s or run from "
+        "a terminal" % PASSPHRASE_ENV)
+
+
+def check_output(path, overwrite=False):
+    """Make sure a secrets file can be written before creating any secret
+
+    :param path: the file write_secrets() will write
+    :param overwrite: whether an existing file may be replaced
+    :raises: CommandError
+    """
+
+    if os.path.exists(path) and not overwrite:
+        msg = "%s already exists, refusing to replace it" % path
+        raise exceptions.CommandError(msg)
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.access(directory, os.W_OK | os.X_OK):
+        msg = "Unable to write %s: directory %s is not writable" % (
+            path, directory)
+        raise exceptions.CommandError(msg)
+
+
+def _constant_time_compare(first, second):
+    # Same running time wherever the first difference is
+    if len(first) != len(second):
+        return False
+    result = 0
+    for x, y in zip(bytearray(first), bytearray(second)):
+        result |= x ^ y
+    return result == 0
+
+
+# hmac.compare_digest() is new in Python 2.7.7
+_compare_digest = getattr(hmac, 'compare_digest', _constant_time_compare)
+
+
+def _keys(passphrase, salt):
+    key = PBKDF2(passphrase, salt, dkLen=64, count=KDF_ROUNDS)
+    return key[:32], key[32:]
+
+
+def encrypt(passphrase, plaintext):
+    """Encrypt bytes with AES-256 and authenticate them with HMAC-SHA256"""
+    salt = os.urandom(SALT_SIZE)
+    iv = os.urandom(AES.block_size)
+    cipher_key, mac_key = _keys(passphrase, salt)
+    body = salt + iv + AES.new(cipher_key, AES.MODE_CFB, iv).encrypt(
+        plaintext)
+    mac = HMAC.new(mac_key, MAGIC + body, SHA256).digest()
+    return MAGIC + body + mac
+
+
+def decrypt(passphrase, data):
+    """Decrypt bytes from encrypt()
+
+    :raises: CommandError if the data is not ours, was changed or the
+             passphrase is wrong
+    """
+
+    mac_size = SHA256.digest_size
+    if (not data.startswith(MAGIC) or
+            len(data) < len(MAGIC) + SALT_SIZE + AES.block_size + mac_size):
+        raise exceptions.CommandError("Not a secrets file")
+    body, mac = data[len(MAGIC):-mac_size], data[-mac_size:]
+    salt = body[:SALT_SIZE]
+    iv = body[SALT_SIZE:SALT_SIZE + AES.block_size]
+    cipher_key, mac_key = _keys(passphrase, salt)
+    if not _compare_digest(
+            HMAC.new(mac_key, MAGIC + body, SHA256).digest(), mac):
+        raise exceptions.CommandError(
+            "Wrong passphrase or damaged secrets file")
+    return AES.new(cipher_key, AES.MODE_CFB, iv).decrypt(
+        body[SALT_SIZE + AES.block_size:])
+
+
+def _encode(value):
+    # The Python 2 csv module only handles bytes
+    if six.PY2 and isinstance(value, six.text_type):
+        return value.encode('utf-8')
+    return value
+
+
+def _decode(value):
+    if six.PY2 and isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def encode_secrets(columns, rows):
+    """Return rows as the UTF-8 CSV plaintext of a secrets file
+
+    Bulk commands call this with the rows they are about to create
+    secrets for, so a row that cannot be written is found before any
+    secret exists.
+
+    :param columns: the CSV header
+    :param rows: an iterable of sequences
+    :rtype: bytes
+    :raises: CommandError if a value cannot be written
+    """
+
+    buf = six.BytesIO() if six.PY2 else six.StringIO()
+    writer = csv.writer(buf)
+    try:
+        writer.writerow([_encode(c) for c in columns])
+        writer.writerows([_encode(v) for v in row] for row in rows)
+    except (csv.Error, UnicodeError) as e:
+        msg = "Unable to write the secrets: %s" % e
+        raise exceptions.CommandError(msg)
+    data = buf.getvalue()
+    if not six.PY2:
+        data = data.encode('utf-8')
+    return data
+
+
+def write_secrets(path, passphrase, columns, rows):
+    """Write rows as encrypted CSV, readable by the owner only
+
+    :param path: the file to write, replaced if it exists
+    :param passphrase: the passphrase to encrypt with
+    :param columns: the CSV header
+    :param rows: an iterable of sequences
+    """
+
+    data = encrypt(passphrase, encode_secrets(columns, rows))
+
+    # mkstemp() creates the file readable by its owner only, renaming it
+    # into place never leaves a partial file behind
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as e:
+        msg = "Error writing %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+
+def read_secrets(path, passphrase):
+    """Read a file from write_secrets()
+
+    :rtype: a list of dicts keyed by the CSV header
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except IOError as e:
+        msg = "Error reading %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+    data = decrypt(passphrase, data)
+    if six.PY2:
+        buf = six.BytesIO(data)
+    else:
+        buf = six.StringIO(data.decode('utf-8'))
+    return [
+        dict((_decode(k), _decode(v)) for k, v in row.items())
+        for row in csv.DictReader(buf)
+    ]
+
+
+class ShowSecrets(lister.Lister):
+    """Show the contents of an encrypted secrets file"""
+
+    log = logging.getLogger(__name__ + '.ShowSecrets')
+
+    def get_parser(self, prog_name):
+        parser = super(ShowSecrets, self).get_parser(prog_name)
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            help='Secrets file to decrypt',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        passphrase = get_passphrase(self.app.stdin, confirm=False)
+        entries = read_secrets(parsed_args.file, passphrase)
+        if not entries:
+            return ((), ())
+        columns = sorted(entries[0])
+        return (columns, (
+            tuple(entry[c] for c in columns) for entry in entries
+        ))
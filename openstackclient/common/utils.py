@@ -15,14 +15,18 @@
 
 """Common client utilities"""
 
+import collections
 import getpass
 import logging
 import os
 import six
 import sys
+import threading
 import time
 import uuid
 
+from concurrent import futures
+
 from openstackclient.common import exceptions
 from openstackclient.openstack.common import strutils
 
@@ -196,7 +200,9 @@ def wait_for_status(status_f,
                     status_field='status',
                     success_status=['active'],
                     sleep_time=5,
-                    callback=None):
+                    callback=None,
+                    error_status=['error'],
+                    max_sleep_time=None):
     """Wait for status change on a resource during a long-running operation
 
     :param status_f: a status function that takes a single id argument
@@ -205,6 +211,9 @@ def wait_for_status(status_f,
     :param status_field: the status attribute in the returned resource object
     :param sleep_time: wait this long (seconds)
     :param callback: called per sleep cycle, useful to display progress
+    :param error_status: a list of status strings for failed completion
+    :param max_sleep_time: if set, double sleep_time after every cycle up to
+                           this many seconds
     :rtype: True on success
     """
     while True:
@@ -213,16 +222,167 @@ def wait_for_status(status_f,
         if status in success_status:
             retval = True
             break
-        elif status == 'error':
+        elif status in error_status:
             retval = False
             break
         if callback:
             progress = getattr(res, 'progress', None) or 0
             callback(progress)
         time.sleep(sleep_time)
+        if max_sleep_time:
+            sleep_time = min(sleep_time * 2, max_sleep_time)
     return retval
 
 
+# Default number of API calls run_parallel() and map_parallel() keep in flight
+DEFAULT_WORKERS = 8
+
+
+def run_parallel(calls, max_workers=None):
+    """Run independent API calls concurrently
+
+    Use this for calls that go to different services or resources and do
+    not depend on each other's results; the total latency becomes that of
+    the slowest call rather than the sum of all of them.
+
+    :param calls: a list of callables that take no arguments
+    :param max_workers: most calls in flight at once, default all of them
+    :rtype: a list of the results in the same order as calls
+    """
+    if len(calls) < 2:
+        return [call() for call in calls]
+    with futures.ThreadPoolExecutor(max_workers or len(calls)) as executor:
+        pending = [executor.submit(call) for call in calls]
+    # Re-raises the first exception in calls order
+    return [f.result() for f in pending]
+
+
+def map_parallel(func, items, max_workers=DEFAULT_WORKERS, ordered=True):
+    """Apply func to every item with bounded concurrency
+
+    Items are consumed lazily and only a small window of calls is queued
+    at any time, so items may be a generator over a very large listing.
+
+    :param func: a callable taking a single item
+    :param items: an iterable of items
+    :param max_workers: most calls in flight at once
+    :param ordered: if False, results are yielded as soon as they
+                    complete instead of in the order of items
+    :rtype: a generator of func results
+    """
+    items = iter(items)
+    window = max(1, max_workers) * 2
+    with futures.ThreadPoolExecutor(max(1, max_workers)) as executor:
+        if ordered:
+            pending = collections.deque()
+            for item in items:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for item in items:
+                pending.add(executor.submit(func, item))
+                if len(pending) >= window:
+                    done, pending = futures.wait(
+                        pending,
+                        return_when=futures.FIRST_COMPLETED,
+                    )
+                    for f in done:
+                        yield f.result()
+            for f in futures.as_completed(pending):
+                yield f.result()
+
+
+def wait_for_delete(status_f,
+                    res_ids,
+                    status_field='status',
+                    error_status=['error', 'error_deleting'],
+                    sleep_time=5,
+                    timeout=None,
+                    max_sleep_time=None,
+                    max_workers=DEFAULT_WORKERS):
+    """Wait for many resources to disappear after they were deleted
+
+    All resources are polled together, one round of concurrent status
+    calls per sleep cycle, instead of a waiting loop per resource.
+
+    :param status_f: a status function that takes a single id argument
+                     and raises an exception named NotFound once it is gone
+    :param res_ids: the resource ids to watch
+    :param status_field: the status attribute in the returned resource object
+    :param error_status: a list of status strings for failed deletion
+    :param sleep_time: wait this long (seconds) between rounds
+    :param timeout: give up on the remaining resources after this many
+                    seconds, wait forever if None
+    :param max_sleep_time: if set, double sleep_time after every round up to
+                           this many seconds
+    :param max_workers: most status calls in flight at once
+    :rtype: a dict mapping each of res_ids to True if it was deleted, False
+            if it went into an error status or the timeout expired
+    """
+
+    def _poll(res_id):
+        try:
+            res = status_f(res_id)
+        except Exception as ex:
+            if type(ex).__name__ == 'NotFound':
+                return res_id, True
+            # Anything else may be transient, look again next round
+            return res_id, None
+        if getattr(res, status_field, '').lower() in error_status:
+            return res_id, False
+        return res_id, None
+
+    result = {}
+    pending = set(res_ids)
+    if timeout is not None:
+        deadline = time.time() + timeout
+    while pending:
+        for res_id, deleted in map_parallel(
+            _poll,
+            list(pending),
+            max_workers=max_workers,
+        ):
+            if deleted is not None:
+                result[res_id] = deleted
+                pending.discard(res_id)
+        if not pending:
+            break
+        if timeout is not None and time.time() >= deadline:
+            result.update((res_id, False) for res_id in pending)
+            break
+        time.sleep(sleep_time)
+        if max_sleep_time:
+            sleep_time = min(sleep_time * 2, max_sleep_time)
+    return result
+
+
+class RateLimiter(object):
+    """Space out API calls made from any number of threads
+
+    :param rate: most calls per second, None or 0 for no limit
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may make its next call"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def get_effective_log_level():
     """Returns the lowest logging level considered by logging handlers
 
@@ -23,10 +23,57 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import parseractions
 from openstackclient.common import utils
 
 
+def _change_hosts(compute_client, aggregate, hosts, add, concurrency, log):
+    """Add hosts to or remove hosts from an aggregate concurrently
+
+    Hosts that are already in (or not in) the aggregate are skipped.
+    Hosts that fail are logged; once all hosts were tried a CommandError
+    naming the failed ones is raised.
+
+    :rtype: dict of the aggregate details after all changes
+    """
+
+    if add:
+        change = compute_client.aggregates.add_host
+        hosts = [h for h in sorted(set(hosts)) if h not in aggregate.hosts]
+    else:
+        change = compute_client.aggregates.remove_host
+        hosts = [h for h in sorted(set(hosts)) if h in aggregate.hosts]
+
+    def _change(host):
+        try:
+            change(aggregate, host)
+        except Exception as e:
+            log.error('Unable to %s host %s: %s' % (
+                'add' if add else 'remove', host, e))
+            return host, False
+        return host, True
+
+    failed = [host for host, ok in utils.map_parallel(
+        _change,
+        hosts,
+        max_workers=concurrency,
+        ordered=False,
+    ) if not ok]
+    if failed:
+        msg = "Unable to %s %d of %d hosts: %s" % (
+            'add' if add else 'remove', len(failed), len(hosts),
+            ', '.join(sorted(failed)))
+        raise exceptions.CommandError(msg)
+
+    # Report the aggregate once, after all of the changes
+    if hosts:
+        aggregate = compute_client.aggregates.get(aggregate.id)
+    info = {}
+    info.update(aggregate._info)
+    return info
+
+
 class AddAggregateHost(show.ShowOne):
     """Add host to aggregate"""
 
@@ -42,7 +89,16 @@ class AddAggregateHost(show.ShowOne):
         parser.add_argument(
             'host',
             metavar='<host>',
-            help='Host to add to aggregate',
+            nargs='+',
+            help='Host(s) to add to aggregate',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of hosts to add at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
         )
         return parser
 
@@ -55,10 +111,14 @@ class AddAggregateHost(show.ShowOne):
             compute_client.aggregates,
             parsed_args.aggregate,
         )
-        data = compute_client.aggregates.add_host(aggregate, parsed_args.host)
-
-        info = {}
-        info.update(data._info)
+        info = _change_hosts(
+            compute_client,
+            aggregate,
+            parsed_args.host,
+            True,
+            parsed_args.concurrency,
+            self.log,
+        )
         return zip(*sorted(six.iteritems(info)))
 
 
@@ -202,7 +262,16 @@ class RemoveAggregateHost(show.ShowOne):
         parser.add_argument(
             'host',
             metavar='<host>',
-            help='Host to remove from aggregate',
+            nargs='+',
+            help='Host(s) to remove from aggregate',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of hosts to remove at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
         )
         return parser
 
@@ -215,13 +284,14 @@ class RemoveAggregateHost(show.ShowOne):
             compute_client.aggregates,
             parsed_args.aggregate,
         )
-        data = compute_client.aggregates.remove_host(
+        info = _change_hosts(
+            compute_client,
             aggregate,
             parsed_args.host,
+            False,
+            parsed_args.concurrency,
+            self.log,
         )
-
-        info = {}
-        info.update(data._info)
         return zip(*sorted(six.iteritems(info)))
 
 
@@ -265,26 +335,25 @@ class SetAggregate(show.ShowOne):
             parsed_args.aggregate,
         )
 
-        info = {}
         kwargs = {}
         if parsed_args.name:
             kwargs['name'] = parsed_args.name
         if parsed_args.zone:
             kwargs['availability_zone'] = parsed_args.zone
-        if kwargs:
-            info.update(compute_client.aggregates.update(
-                aggregate,
-                kwargs
-            )._info)
 
+        # Nova keeps the availability zone in the aggregate metadata as
+        # well, so the two changes must not race; the last reply is then
+        # current for both
+        data = None
+        if kwargs:
+            data = compute_client.aggregates.update(aggregate, kwargs)
         if parsed_args.property:
-            info.update(compute_client.aggregates.set_metadata(
+            data = compute_client.aggregates.set_metadata(
                 aggregate,
                 parsed_args.property,
-            )._info)
-
-        if info:
-            return zip(*sorted(six.iteritems(info)))
+            )
+        if data:
+            return zip(*sorted(six.iteritems(data._info)))
         else:
             return ({}, {})
 
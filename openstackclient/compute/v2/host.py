@@ -16,12 +16,231 @@
 """Host action implementations"""
 
 import logging
+import time
 
 from cliff import lister
+from novaclient import exceptions as compute_exc
 
+from openstackclient.common import exceptions
 from openstackclient.common import utils
 
 
+# Server states live migration accepts
+LIVE_MIGRATE_STATUS = ('active', 'paused')
+
+# Number of servers to request in each paginated request
+PAGE_SIZE = 500
+
+
+class EvacuateHost(lister.Lister):
+    """Live-migrate all servers off a compute host"""
+
+    log = logging.getLogger(__name__ + ".EvacuateHost")
+
+    def get_parser(self, prog_name):
+        parser = super(EvacuateHost, self).get_parser(prog_name)
+        parser.add_argument(
+            "host",
+            metavar="<host>",
+            help="Name of host to evacuate")
+        parser.add_argument(
+            "--target",
+            metavar="<host>",
+            help="Migrate to this host (default: let the scheduler choose)")
+        parser.add_argument(
+            "--block-migration",
+            action="store_true",
+            default=False,
+            help="Perform block live migrations")
+        parser.add_argument(
+            "--disk-overcommit",
+            action="store_true",
+            default=False,
+            help="Allow disk over-commit on the destination host")
+        parser.add_argument(
+            "--concurrency",
+            metavar="<count>",
+            type=int,
+            default=2,
+            help="Number of migrations to run at once (default: 2)")
+        parser.add_argument(
+            "--retries",
+            metavar="<count>",
+            type=int,
+            default=1,
+            help="Retry a failed migration up to <count> times "
+                 "(default: 1)")
+        parser.add_argument(
+            "--poll-interval",
+            metavar="<seconds>",
+            type=float,
+            default=5,
+            help="Seconds between status checks (default: 5)")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            default=False,
+            help="Only list the servers that would be migrated")
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)" % parsed_args)
+        compute_client = self.app.client_manager.compute
+        columns = (
+            "ID",
+            "Name",
+            "Status",
+            "Attempts",
+            "Host",
+            "Duration",
+        )
+        if parsed_args.concurrency < 1:
+            msg = "--concurrency must be at least 1"
+            raise exceptions.CommandError(msg)
+
+        report = {}
+        queue = []
+
+        def _servers():
+            # Servers come back a page at a time, stop once a page brings
+            # nothing new in case the server ignores the marker
+            marker = None
+            while True:
+                search = {
+                    'host': parsed_args.host,
+                    'all_tenants': True,
+                    'limit': PAGE_SIZE,
+                }
+                if marker:
+                    search['marker'] = marker
+                page = [
+                    s for s in compute_client.servers.list(search_opts=search)
+                    if s.id not in report
+                ]
+                if not page:
+                    return
+                for server in page:
+                    yield server
+                marker = page[-1].id
+
+        for server in _servers():
+            report[server.id] = {
+                'name': server.name,
+                'status': 'pending',
+                'attempts': 0,
+                'host': parsed_args.host,
+                'duration': None,
+                'retry_at': 0,
+            }
+            if server.status.lower() not in LIVE_MIGRATE_STATUS:
+                report[server.id]['status'] = 'skipped'
+            elif not parsed_args.dry_run:
+                queue.append(server.id)
+
+        def _start(server_id):
+            entry = report[server_id]
+            entry['attempts'] += 1
+            entry['started'] = time.time()
+            try:
+                compute_client.servers.live_migrate(
+                    server_id,
+                    parsed_args.target,
+                    parsed_args.block_migration,
+                    parsed_args.disk_overcommit,
+                )
+            except Exception as e:
+                self.log.error('Unable to migrate server %s: %s' %
+                               (server_id, e))
+                return False
+            return True
+
+        def _finish(server_id, succeeded, host=None, retry=True,
+                    status='failed'):
+            entry = report[server_id]
+            entry['duration'] = round(time.time() - entry['started'], 1)
+            if succeeded:
+                entry['status'] = 'migrated'
+                entry['host'] = host
+            elif retry and entry['attempts'] <= parsed_args.retries:
+                # Back off so a busy scheduler or host gets time to recover
+                entry['retry_at'] = time.time() + (
+                    parsed_args.poll_interval * 2 ** (entry['attempts'] - 1))
+                queue.append(server_id)
+            else:
+                entry['status'] = status
+
+        def _next():
+            now = time.time()
+            for server_id in queue:
+                if report[server_id]['retry_at'] <= now:
+                    queue.remove(server_id)
+                    return server_id
+            return None
+
+        def _get(server_id):
+            try:
+                return server_id, compute_client.servers.get(server_id)
+            except compute_exc.NotFound:
+                return server_id, None
+
+        # One loop starts new migrations as slots free up and checks on
+        # all of the running ones with each poll
+        in_flight = set()
+        while queue or in_flight:
+            while len(in_flight) < parsed_args.concurrency:
+                server_id = _next()
+                if server_id is None:
+                    break
+                if _start(server_id):
+                    in_flight.add(server_id)
+                else:
+                    _finish(server_id, False)
+            if not in_flight:
+                if queue:
+                    # Only retries that are not due yet are left
+                    time.sleep(max(0, min(
+                        report[server_id]['retry_at'] for server_id in queue
+                    ) - time.time()))
+                continue
+            time.sleep(parsed_args.poll_interval)
+            for server_id, server in utils.map_parallel(
+                _get,
+                list(in_flight),
+                max_workers=parsed_args.concurrency,
+            ):
+                if server is None:
+                    self.log.error('Server %s was deleted during migration' %
+                                   server_id)
+                    in_flight.discard(server_id)
+                    _finish(server_id, False, retry=False, status='deleted')
+                    continue
+                status = server.status.lower()
+                task_state = getattr(server, 'OS-EXT-STS:task_state', None)
+                if status == 'migrating' or task_state:
+                    continue
+                host = getattr(server, 'OS-EXT-SRV-ATTR:host', None)
+                in_flight.discard(server_id)
+                if status == 'error':
+                    self.log.error('Server %s went into error state during '
+                                   'migration' % server_id)
+                    _finish(server_id, False, retry=False)
+                else:
+                    # A failed live migration leaves the server where it was
+                    _finish(server_id, host != parsed_args.host, host)
+
+        return (columns, ((
+            server_id,
+            entry['name'],
+            entry['status'],
+            entry['attempts'],
+            entry['host'],
+            entry['duration'],
+        ) for server_id, entry in sorted(
+            report.items(),
+            key=lambda item: item[1]['name'],
+        )))
+
+
 class ListHost(lister.Lister):
     """List host command"""
 
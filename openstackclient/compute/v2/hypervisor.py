@@ -15,6 +15,7 @@
 
 """Hypervisor action implementations"""
 
+import functools
 import logging
 import six
 
@@ -81,3 +82,156 @@ class ShowHypervisor(show.ShowOne):
         del hypervisor["service"]
 
         return zip(*sorted(six.iteritems(hypervisor)))
+
+
+# Per-host counters for each resource: (total, used)
+HYPERVISOR_RESOURCES = {
+    'vcpus': ('vcpus', 'vcpus_used'),
+    'ram': ('memory_mb', 'memory_mb_used'),
+    'disk': ('local_gb', 'local_gb_used'),
+}
+
+
+def _percentile(values, percent):
+    """Return the nearest-rank percentile of a sorted list of values"""
+    if not values:
+        return 0
+    rank = max(int(-(-len(values) * percent // 100)), 1)
+    return values[rank - 1]
+
+
+def _used_percent(hypervisor, resource):
+    total_attr, used_attr = HYPERVISOR_RESOURCES[resource]
+    total = getattr(hypervisor, total_attr, 0) or 0
+    if not total:
+        return 0.0
+    return 100.0 * (getattr(hypervisor, used_attr, 0) or 0) / total
+
+
+class StatHypervisor(lister.Lister):
+    """Report hypervisor capacity by availability zone or aggregate"""
+
+    log = logging.getLogger(__name__ + ".StatHypervisor")
+
+    def get_parser(self, prog_name):
+        parser = super(StatHypervisor, self).get_parser(prog_name)
+        parser.add_argument(
+            "--group-by",
+            metavar="<group>",
+            choices=["zone", "aggregate", "none"],
+            default="zone",
+            help="Group hosts by 'zone', 'aggregate' or 'none' "
+                 "(default: zone)",
+        )
+        parser.add_argument(
+            "--resource",
+            metavar="<resource>",
+            choices=sorted(HYPERVISOR_RESOURCES),
+            default="ram",
+            help="Resource used for percentiles and --top, one of "
+                 "'vcpus', 'ram' or 'disk' (default: ram)",
+        )
+        parser.add_argument(
+            "--top",
+            metavar="<count>",
+            type=int,
+            help="List the <count> fullest hosts instead of the groups",
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)" % parsed_args)
+        compute_client = self.app.client_manager.compute
+
+        # None of these depend on each other
+        hypervisors, aggregates, services = utils.run_parallel([
+            compute_client.hypervisors.list,
+            compute_client.aggregates.list,
+            functools.partial(
+                compute_client.services.list,
+                binary="nova-compute",
+            ),
+        ])
+
+        host_zone = dict(
+            (service.host, getattr(service, "zone", ""))
+            for service in services
+        )
+        host_aggregates = {}
+        for aggregate in aggregates:
+            for host in aggregate.hosts:
+                host_aggregates.setdefault(host, []).append(aggregate.name)
+
+        def _host(hypervisor):
+            service = getattr(hypervisor, "service", None) or {}
+            return service.get("host", hypervisor.hypervisor_hostname)
+
+        if parsed_args.top is not None:
+            columns = (
+                "Host",
+                "Zone",
+                "Aggregates",
+                "vCPUs Used %",
+                "RAM Used %",
+                "Disk Used %",
+            )
+            fullest = sorted(
+                hypervisors,
+                key=lambda h: _used_percent(h, parsed_args.resource),
+                reverse=True,
+            )[:parsed_args.top]
+            return (columns, ((
+                _host(h),
+                host_zone.get(_host(h), ""),
+                ",".join(sorted(host_aggregates.get(_host(h), []))),
+                round(_used_percent(h, "vcpus"), 1),
+                round(_used_percent(h, "ram"), 1),
+                round(_used_percent(h, "disk"), 1),
+            ) for h in fullest))
+
+        groups = {}
+        for hypervisor in hypervisors:
+            host = _host(hypervisor)
+            if parsed_args.group_by == "zone":
+                keys = [host_zone.get(host, "")]
+            elif parsed_args.group_by == "aggregate":
+                keys = host_aggregates.get(host, [""])
+            else:
+                keys = []
+            for key in keys + ["(total)"]:
+                groups.setdefault(key, []).append(hypervisor)
+
+        columns = (
+            "Zone" if parsed_args.group_by == "zone" else "Aggregate",
+            "Hosts",
+            "vCPUs",
+            "vCPUs Free",
+            "RAM MB",
+            "RAM MB Free",
+            "Disk GB",
+            "Disk GB Free",
+            "Used % p50",
+            "Used % p90",
+            "Used % Max",
+        )
+        if parsed_args.group_by == "none":
+            columns = ("Group",) + columns[1:]
+
+        def _row(key):
+            members = groups[key]
+            row = [key, len(members)]
+            for resource in ("vcpus", "ram", "disk"):
+                total_attr, used_attr = HYPERVISOR_RESOURCES[resource]
+                total = sum(getattr(h, total_attr, 0) or 0 for h in members)
+                used = sum(getattr(h, used_attr, 0) or 0 for h in members)
+                row.extend([total, total - used])
+            used = sorted(
+                _used_percent(h, parsed_args.resource) for h in members)
+            row.extend(round(_percentile(used, p), 1) for p in (50, 90, 100))
+            return tuple(row)
+
+        # Keep the total last
+        keys = sorted(k for k in groups if k != "(total)")
+        if "(total)" in groups:
+            keys.append("(total)")
+        return (columns, (_row(key) for key in keys))
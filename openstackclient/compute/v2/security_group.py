@@ -16,14 +16,18 @@
 
 """Compute v2 Security Group action implementations"""
 
+import itertools
+import json
 import logging
 import six
+import yaml
 
 from cliff import command
 from cliff import lister
 from cliff import show
 
 from novaclient.v1_1 import security_group_rules
+from openstackclient.common import exceptions
 from openstackclient.common import parseractions
 from openstackclient.common import utils
 
@@ -51,6 +55,73 @@ def _xform_security_group_rule(sgroup):
     return info
 
 
+def _rule_key(rule):
+    """Return a hashable key describing what a rule allows
+
+    :param rule: a rule dict, either as returned by the server or as read
+        from a rule file
+    """
+
+    def _port(port):
+        return None if port in (None, '') else int(port)
+
+    if 'ip_range' in rule or 'group' in rule:
+        cidr = (rule.get('ip_range') or {}).get('cidr')
+        remote_group = (rule.get('group') or {}).get('name')
+    else:
+        cidr = rule.get('cidr')
+        remote_group = rule.get('remote_group')
+    if not cidr and not remote_group:
+        # Nova opens a rule without a source to everyone
+        cidr = '0.0.0.0/0'
+    return (
+        (rule.get('ip_protocol') or '').lower() or None,
+        _port(rule.get('from_port')),
+        _port(rule.get('to_port')),
+        cidr or None,
+        remote_group or None,
+    )
+
+
+def _format_rule_key(key):
+    ip_protocol, from_port, to_port, cidr, remote_group = key
+    if from_port is None and to_port is None:
+        port_range = ''
+    else:
+        port_range = "%s:%s" % (from_port, to_port)
+    return (ip_protocol or '', cidr or '', port_range, remote_group or '')
+
+
+def _load_rule_file(path):
+    """Read security group rules from a YAML or JSON file
+
+    The file holds either a list of rules or a mapping with a 'rules'
+    list, as written by 'security group rule export'.
+
+    :param path: the file to read
+    :rtype: a list of rule keys
+    """
+
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f)
+    except (IOError, yaml.YAMLError) as e:
+        msg = "Error reading rule file %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+    if isinstance(data, dict):
+        data = data.get('rules')
+    if not isinstance(data, list) or not all(
+            isinstance(rule, dict) for rule in data):
+        msg = "Rule file %s must contain a list of rules" % path
+        raise exceptions.CommandError(msg)
+    try:
+        return [_rule_key(rule) for rule in data]
+    except (TypeError, ValueError) as e:
+        msg = "Invalid rule in %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+
 class CreateSecurityGroup(show.ShowOne):
     """Create a new security group"""
 
@@ -124,19 +195,31 @@ class ListSecurityGroup(lister.Lister):
             default=False,
             help='Display information from all projects (admin only)',
         )
+        parser.add_argument(
+            '--name',
+            metavar='<name>',
+            help='Only list security groups with this name',
+        )
+        parser.add_argument(
+            '--page-size',
+            metavar='<size>',
+            type=int,
+            help='Number of security groups to request in each paginated '
+                 'request',
+        )
+        parser.add_argument(
+            '--limit',
+            metavar='<count>',
+            type=int,
+            help='Stop after listing <count> security groups',
+        )
         return parser
 
     def take_action(self, parsed_args):
-
-        def _get_project(project_id):
-            try:
-                return getattr(project_hash[project_id], 'name', project_id)
-            except KeyError:
-                return project_id
-
         self.log.debug("take_action(%s)" % parsed_args)
 
         compute_client = self.app.client_manager.compute
+        identity_lookup = self.app.client_manager.identity_lookup
         columns = (
             "ID",
             "Name",
@@ -144,22 +227,54 @@ class ListSecurityGroup(lister.Lister):
         )
         column_headers = columns
         if parsed_args.all_projects:
-            # TODO(dtroyer): Translate Project_ID to Project (name)
             columns = columns + ('Tenant ID',)
             column_headers = column_headers + ('Project',)
         search = {'all_tenants': parsed_args.all_projects}
-        data = compute_client.security_groups.list(search_opts=search)
-
-        projects = self.app.client_manager.identity.projects.list()
-        project_hash = {}
-        for project in projects:
-            project_hash[project.id] = project
+        if parsed_args.name is not None:
+            search['name'] = parsed_args.name
+
+        def _pages():
+            if not parsed_args.page_size:
+                yield compute_client.security_groups.list(search_opts=search)
+                return
+            offset = 0
+            while True:
+                page = compute_client.security_groups.list(search_opts=dict(
+                    search,
+                    limit=parsed_args.page_size,
+                    offset=offset,
+                ))
+                yield page
+                if len(page) < parsed_args.page_size:
+                    return
+                offset += len(page)
+
+        def _groups():
+            for page in _pages():
+                # Not every server filters by name, so check it here too
+                if parsed_args.name is not None:
+                    page = [g for g in page if g.name == parsed_args.name]
+                if parsed_args.all_projects:
+                    # Resolve the names of the projects owning this page
+                    # only, earlier pages' names are already cached
+                    project_names = identity_lookup.names(
+                        'project',
+                        (getattr(g, 'tenant_id', None) for g in page),
+                    )
+                else:
+                    project_names = {}
+                for group in page:
+                    yield group, project_names
+
+        data = _groups()
+        if parsed_args.limit is not None:
+            data = itertools.islice(data, parsed_args.limit)
 
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
-                    formatters={'Tenant ID': _get_project},
-                ) for s in data))
+                    formatters={'Tenant ID': lambda p, n=names: n.get(p, p)},
+                ) for s, names in data))
 
 
 class SetSecurityGroup(show.ShowOne):
@@ -400,3 +515,185 @@ class ListSecurityGroupRule(lister.Lister):
                 (utils.get_item_properties(
                     s, columns,
                 ) for s in rules))
+
+
+class ExportSecurityGroupRule(command.Command):
+    """Export the rules of a security group to a file"""
+
+    log = logging.getLogger(__name__ + '.ExportSecurityGroupRule')
+
+    def get_parser(self, prog_name):
+        parser = super(ExportSecurityGroupRule, self).get_parser(prog_name)
+        parser.add_argument(
+            'group',
+            metavar='<group>',
+            help='Security group to export (name or ID)',
+        )
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            help='File to write the rules to (default: stdout)',
+        )
+        parser.add_argument(
+            '--format',
+            metavar='<format>',
+            choices=['json', 'yaml'],
+            help='Output format, json or yaml (default: yaml for .yaml '
+                 'and .yml files, otherwise json)',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+
+        compute_client = self.app.client_manager.compute
+        group = utils.find_resource(
+            compute_client.security_groups,
+            parsed_args.group,
+        )
+
+        rules = []
+        for key in sorted(set(_rule_key(rule) for rule in group.rules),
+                          key=lambda k: tuple(str(x) for x in k)):
+            ip_protocol, from_port, to_port, cidr, remote_group = key
+            rule = {
+                'ip_protocol': ip_protocol,
+                'from_port': from_port,
+                'to_port': to_port,
+            }
+            if remote_group:
+                rule['remote_group'] = remote_group
+            else:
+                rule['cidr'] = cidr
+            rules.append(rule)
+        data = {'group': group.name, 'rules': rules}
+
+        output_format = parsed_args.format
+        if not output_format:
+            path = (parsed_args.file or '').lower()
+            if path.endswith('.yaml') or path.endswith('.yml'):
+                output_format = 'yaml'
+            else:
+                output_format = 'json'
+        if output_format == 'yaml':
+            text = yaml.safe_dump(data, default_flow_style=False)
+        else:
+            text = json.dumps(data, indent=2, sort_keys=True) + '\n'
+
+        if parsed_args.file:
+            with open(parsed_args.file, 'w') as f:
+                f.write(text)
+        else:
+            self.app.stdout.write(text)
+        return
+
+
+class ImportSecurityGroupRule(lister.Lister):
+    """Bring the rules of a security group in line with a file"""
+
+    log = logging.getLogger(__name__ + '.ImportSecurityGroupRule')
+
+    def get_parser(self, prog_name):
+        parser = super(ImportSecurityGroupRule, self).get_parser(prog_name)
+        parser.add_argument(
+            'group',
+            metavar='<group>',
+            help='Security group to import into (name or ID)',
+        )
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            required=True,
+            help='YAML or JSON file with the rules, as written by '
+                 'security group rule export',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            default=False,
+            help='Also delete rules that are not in the file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the changes that would be made',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of rules to change at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+
+        compute_client = self.app.client_manager.compute
+        desired = _load_rule_file(parsed_args.file)
+        group = utils.find_resource(
+            compute_client.security_groups,
+            parsed_args.group,
+        )
+
+        current = {}
+        for rule in group.rules:
+            current.setdefault(_rule_key(rule), rule['id'])
+        plan = [('create', key) for key in sorted(
+            set(desired) - set(current),
+            key=lambda k: tuple(str(x) for x in k),
+        )]
+        if parsed_args.prune:
+            plan.extend(('delete', key) for key in sorted(
+                set(current) - set(desired),
+                key=lambda k: tuple(str(x) for x in k),
+            ))
+
+        # Resolve each remote group once, not once per rule
+        remote_groups = {}
+        for action, key in plan:
+            name = key[4]
+            if action == 'create' and name and name not in remote_groups:
+                remote_groups[name] = utils.find_resource(
+                    compute_client.security_groups,
+                    name,
+                ).id
+
+        def _apply(item):
+            action, key = item
+            ip_protocol, from_port, to_port, cidr, remote_group = key
+            if parsed_args.dry_run:
+                status = 'pending'
+            else:
+                try:
+                    if action == 'create':
+                        compute_client.security_group_rules.create(
+                            group.id,
+                            ip_protocol,
+                            from_port,
+                            to_port,
+                            cidr,
+                            remote_groups.get(remote_group),
+                        )
+                        status = 'created'
+                    else:
+                        compute_client.security_group_rules.delete(
+                            current[key],
+                        )
+                        status = 'deleted'
+                except Exception as e:
+                    self.log.error('Unable to %s rule %s: %s' % (
+                        action, ' '.join(_format_rule_key(key)), e))
+                    status = 'failed'
+            return (action,) + _format_rule_key(key) + (status,)
+
+        columns = ('Action', 'IP Protocol', 'IP Range', 'Port Range',
+                   'Remote Group', 'Status')
+        return (columns, utils.map_parallel(
+            _apply,
+            plan,
+            max_workers=parsed_args.concurrency,
+        ))
@@ -44,22 +44,39 @@ class ListUsage(lister.Lister):
             default=None,
             help="Usage range end date, ex 2012-01-20 (default: tomorrow)"
         )
+        # Buckets set the windows, the two cannot be combined
+        split_group = parser.add_mutually_exclusive_group()
+        split_group.add_argument(
+            "--window",
+            metavar="<days>",
+            type=int,
+            default=None,
+            help="Fetch the range in windows of <days> days concurrently"
+                 " (default: the whole range at once)"
+        )
+        split_group.add_argument(
+            "--bucket",
+            metavar="<period>",
+            choices=["day", "week"],
+            default=None,
+            help="Report usage per 'day' or 'week' instead of for the"
+                 " whole range"
+        )
+        parser.add_argument(
+            "--concurrency",
+            metavar="<count>",
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help="Number of windows to fetch at once (default: %d)" %
+                 utils.DEFAULT_WORKERS
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)" % parsed_args)
 
-        def _format_project(project):
-            if not project:
-                return ""
-            if project in project_cache.keys():
-                return project_cache[project].name
-            else:
-                return project
-
         compute_client = self.app.client_manager.compute
         columns = (
-            "tenant_id",
             "total_memory_mb_usage",
             "total_vcpus_usage",
             "total_local_gb_usage"
@@ -84,30 +101,63 @@ class ListUsage(lister.Lister):
         else:
             end = now + datetime.timedelta(days=1)
 
-        usage_list = compute_client.usage.list(start, end)
-
-        # Cache the project list
-        project_cache = {}
-        try:
-            for p in self.app.client_manager.identity.tenants.list():
-                project_cache[p.id] = p
-        except Exception:
-            # Just forget it if there's any trouble
-            pass
+        # Split the range so no single call has to cover all of it
+        if parsed_args.bucket == "week":
+            step = datetime.timedelta(weeks=1)
+        elif parsed_args.bucket == "day":
+            step = datetime.timedelta(days=1)
+        elif parsed_args.window:
+            step = datetime.timedelta(days=parsed_args.window)
+        else:
+            step = end - start
+        windows = []
+        window_start = start
+        while window_start < end:
+            windows.append((window_start, min(window_start + step, end)))
+            window_start += step
+
+        def _fetch(window):
+            return window, compute_client.usage.list(*window)
+
+        # Merge the windows, keyed by bucket start (if any) and project
+        totals = {}
+        for window, usage_list in utils.map_parallel(
+            _fetch,
+            windows,
+            max_workers=parsed_args.concurrency,
+        ):
+            bucket = window[0] if parsed_args.bucket else None
+            for usage in usage_list:
+                key = (bucket, getattr(usage, 'tenant_id', ''))
+                total = totals.setdefault(key, [0.0] * len(columns))
+                for i, column in enumerate(columns):
+                    total[i] += getattr(usage, column, 0) or 0
+
+        # Only look up the names of projects that actually have usage
+        project_names = self.app.client_manager.identity_lookup.names(
+            'project',
+            (key[1] for key in totals),
+        )
 
-        if len(usage_list) > 0:
+        if len(totals) > 0:
             sys.stdout.write("Usage from %s to %s:" % (
                 start.strftime(dateformat),
                 end.strftime(dateformat),
             ))
 
+        if parsed_args.bucket:
+            column_headers = ("Start",) + column_headers
+
+        def _row(key):
+            bucket, project_id = key
+            row = [project_names.get(project_id, project_id)]
+            row.extend(float("%.2f" % x) for x in totals[key])
+            if parsed_args.bucket:
+                row.insert(0, bucket.strftime(dateformat))
+            return tuple(row)
+
         return (column_headers,
-                (utils.get_item_properties(
-                    s, columns,
-                    formatters={
-                        'tenant_id': _format_project,
-                        'total_memory_mb_usage': lambda x: float("%.2f" % x),
-                        'total_vcpus_usage': lambda x: float("%.2f" % x),
-                        'total_local_gb_usage': lambda x: float("%.2f" % x),
-                    },
-                ) for s in usage_list))
+                (_row(key) for key in sorted(
+                    totals,
+                    key=lambda k: (k[0], project_names.get(k[1], k[1])),
+                )))
@@ -0,0 +1,206 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Indexed service catalog with an optional on-disk cache"""
+
+import calendar
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from keystoneclient import access
+
+from openstackclient.common import exceptions
+
+
+LOG = logging.getLogger(__name__)
+
+# Seconds after which a cached catalog is refreshed in the background
+DEFAULT_REFRESH = 600
+
+# Cached tokens this close to expiring are not used any more
+EXPIRY_MARGIN = 60
+
+INTERFACES = ('public', 'internal', 'admin')
+
+
+def _v2_endpoints(catalog):
+    for service in catalog:
+        for endpoint in service.get('endpoints', []):
+            for interface in INTERFACES:
+                url = endpoint.get(interface + 'URL')
+                if url:
+                    yield {
+                        'id': endpoint.get('id', ''),
+                        'service_type': service.get('type', ''),
+                        'service_name': service.get('name', ''),
+                        'interface': interface,
+                        'region': endpoint.get('region', ''),
+                        'url': url,
+                    }
+
+
+def _v3_endpoints(catalog):
+    for service in catalog:
+        for endpoint in service.get('endpoints', []):
+            yield {
+                'id': endpoint.get('id', ''),
+                'service_type': service.get('type', ''),
+                'service_name': service.get('name', ''),
+                'interface': endpoint.get('interface', ''),
+                'region': (endpoint.get('region_id') or
+                           endpoint.get('region') or ''),
+                'url': endpoint.get('url', ''),
+            }
+
+
+class ServiceCatalog(object):
+    """Service catalog endpoints indexed by type, interface and region
+
+    :param endpoints: a list of endpoint dicts with the keys id,
+                      service_type, service_name, interface, region and url
+    """
+
+    def __init__(self, endpoints):
+        self.endpoints = list(endpoints)
+        self._index = {}
+        for endpoint in self.endpoints:
+            key = (endpoint['service_type'], endpoint['interface'])
+            self._index.setdefault(key + (endpoint['region'],),
+                                   endpoint['url'])
+            # The first region listed is used when none is asked for
+            self._index.setdefault(key + (None,), endpoint['url'])
+
+    @classmethod
+    def from_auth_ref(cls, auth_ref):
+        """Build the index from an Identity v2.0 or v3 AccessInfo"""
+        if 'serviceCatalog' in auth_ref:
+            return cls(_v2_endpoints(auth_ref['serviceCatalog']))
+        return cls(_v3_endpoints(auth_ref.get('catalog') or []))
+
+    def url_for(self, service_type, interface='public', region=None):
+        """Return the URL of an endpoint
+
+        :param service_type: the service type, e.g. 'compute'
+        :param interface: one of 'public', 'internal' or 'admin'
+        :param region: the region, or None for the first one in the catalog
+        :raises: EndpointNotFound
+        """
+
+        try:
+            return self._index[(service_type, interface, region or None)]
+        except KeyError:
+            msg = "No %s endpoint for %s" % (interface, service_type)
+            if region:
+                msg += " in region %s" % region
+            raise exceptions.EndpointNotFound(msg)
+
+
+class CatalogCache(object):
+    """Keep tokens with their service catalogs in a file between commands
+
+    Entries are kept per scope so credentials for different users, projects
+    or clouds never share a token.  The file holds tokens, it is created
+    readable by its owner only.
+
+    :param path: the JSON file to keep the catalogs in
+    :param refresh: seconds after which an entry is reported as stale
+    """
+
+    def __init__(self, path, refresh=DEFAULT_REFRESH):
+        self.path = path
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    def _read_file(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as e:
+            LOG.warning("Ignoring corrupt catalog cache %s: %s",
+                        self.path, e)
+            return {}
+
+    def load(self, scope):
+        """Return the cached token and catalog of scope
+
+        :param scope: a string identifying the credentials
+        :rtype: a tuple of a keystoneclient AccessInfo, a ServiceCatalog and
+                whether the entry is stale and should be refreshed, or None
+                if nothing usable is cached
+        """
+
+        entry = self._read_file().get(scope)
+        now = time.time()
+        if (not entry or 'auth_token' not in entry or
+                entry.get('expires', 0) - EXPIRY_MARGIN <= now):
+            return None
+        if entry['access'].get('version') == 'v3':
+            # The v3 token is not part of the body, the service catalog
+            # only gets it as an argument
+            auth_ref = access.AccessInfoV3(
+                entry['auth_token'], **entry['access'])
+        else:
+            auth_ref = access.AccessInfoV2(**entry['access'])
+        return (
+            auth_ref,
+            ServiceCatalog(entry['endpoints']),
+            entry.get('fetched', 0) + self.refresh <= now,
+        )
+
+    def save(self, scope, auth_ref):
+        """Save an AccessInfo, with its token and catalog, for scope"""
+        expires = auth_ref.expires
+        entry = {
+            'auth_token': auth_ref.auth_token,
+            'access': dict(auth_ref),
+            'expires': calendar.timegm(expires.utctimetuple()),
+            'fetched': time.time(),
+            'endpoints': ServiceCatalog.from_auth_ref(auth_ref).endpoints,
+        }
+        with self._lock:
+            data = self._read_file()
+            now = time.time()
+            # Drop the expired tokens of other scopes on the way
+            data = dict(
+                (k, v) for k, v in data.items() if v.get('expires', 0) > now)
+            data[scope] = entry
+            self._write(data)
+
+    def drop(self, scope):
+        """Forget the entry of scope, e.g. when its token was revoked"""
+        with self._lock:
+            data = self._read_file()
+            if data.pop(scope, None) is not None:
+                self._write(data)
+
+    def _write(self, data):
+        # Write a temporary file and rename it so concurrent invocations
+        # never see a partially written cache; mkstemp() creates it
+        # readable by its owner only
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            LOG.warning("Unable to save catalog cache %s: %s",
+                        self.path, e)
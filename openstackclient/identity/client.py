@@ -16,6 +16,7 @@
 import logging
 
 from keystoneclient.v2_0 import client as identity_client_v2_0
+from openstackclient.common import exceptions
 from openstackclient.common import utils
 
 
@@ -32,40 +33,66 @@ API_VERSIONS = {
 
 def make_client(instance):
     """Returns an identity service client."""
-    identity_client = utils.get_client_class(
-        API_NAME,
-        instance._api_version[API_NAME],
-        API_VERSIONS)
     if instance._url:
         LOG.debug('instantiating identity client: token flow')
-        client = identity_client(
+        client = _client_class(instance)(
             endpoint=instance._url,
             token=instance._token,
             cacert=instance._cacert,
             insecure=instance._insecure,
         )
-    else:
-        LOG.debug('instantiating identity client: password flow')
-        client = identity_client(
-            username=instance._username,
-            password=instance._password,
-            user_domain_id=instance._user_domain_id,
-            user_domain_name=instance._user_domain_name,
-            project_domain_id=instance._project_domain_id,
-            project_domain_name=instance._project_domain_name,
-            domain_id=instance._domain_id,
-            domain_name=instance._domain_name,
-            tenant_name=instance._project_name,
-            tenant_id=instance._project_id,
-            auth_url=instance._auth_url,
-            region_name=instance._region_name,
+    elif instance._token and instance.catalog:
+        # Token and catalog came from the catalog cache, use them instead
+        # of authenticating again
+        LOG.debug('instantiating identity client: cached token')
+        try:
+            endpoint = instance.get_endpoint_for_service_type(
+                API_NAME,
+                interface='admin',
+            )
+        except exceptions.EndpointNotFound:
+            endpoint = instance.get_endpoint_for_service_type(API_NAME)
+        client = _client_class(instance)(
+            endpoint=endpoint,
+            token=instance._token,
+            auth_ref=instance.auth_ref,
             cacert=instance._cacert,
             insecure=instance._insecure,
         )
+    else:
+        LOG.debug('instantiating identity client: password flow')
+        client = authenticate(instance)
         instance.auth_ref = client.auth_ref
     return client
 
 
+def authenticate(instance):
+    """Returns an identity service client authenticated with a password"""
+    return _client_class(instance)(
+        username=instance._username,
+        password=instance._password,
+        user_domain_id=instance._user_domain_id,
+        user_domain_name=instance._user_domain_name,
+        project_domain_id=instance._project_domain_id,
+        project_domain_name=instance._project_domain_name,
+        domain_id=instance._domain_id,
+        domain_name=instance._domain_name,
+        tenant_name=instance._project_name,
+        tenant_id=instance._project_id,
+        auth_url=instance._auth_url,
+        region_name=instance._region_name,
+        cacert=instance._cacert,
+        insecure=instance._insecure,
+    )
+
+
+def _client_class(instance):
+    return utils.get_client_class(
+        API_NAME,
+        instance._api_version[API_NAME],
+        API_VERSIONS)
+
+
 class IdentityClientv2_0(identity_client_v2_0.Client):
     """Tweak the earlier client class to deal with some changes"""
     def __getattr__(self, name):
@@ -15,11 +15,21 @@
 
 """Common identity code"""
 
+import csv
+import functools
+import six
+import yaml
+
 from keystoneclient import exceptions as identity_exc
 from openstackclient.common import exceptions
 from openstackclient.common import utils
 
 
+# Above this many unknown values a single list() is cheaper than looking
+# each one up
+LIST_THRESHOLD = 20
+
+
 def find_service(identity_client, name_type_or_id):
     """Find a service by id, name or type."""
 
@@ -36,3 +46,315 @@ def find_service(identity_client, name_type_or_id):
             msg = ("No service with a type, name or ID of '%s' exists."
                    % name_type_or_id)
             raise exceptions.CommandError(msg)
+
+
+def service_names(identity_client, endpoints):
+    """Set service_name and service_type on endpoints from one service list"""
+
+    services = dict((s.id, s) for s in identity_client.services.list())
+    for ep in endpoints:
+        service = services.get(ep.service_id)
+        if service is None:
+            # Created after the listing, fall back to a lookup
+            service = find_service(identity_client, ep.service_id)
+            services[service.id] = service
+        ep.service_name = service.name
+        ep.service_type = service.type
+    return endpoints
+
+
+def catalog_endpoints(client_manager):
+    """Return the columns and rows of the authenticated service catalog
+
+    The catalog is the one received with the token, listing it takes no
+    API calls at all.
+    """
+
+    catalog = getattr(client_manager, 'catalog', None)
+    if catalog is None:
+        raise exceptions.CommandError(
+            "No service catalog available, --catalog needs password "
+            "authentication")
+    columns = ('ID', 'Region', 'Service Name', 'Service Type', 'Interface',
+               'URL')
+    keys = ('id', 'region', 'service_name', 'service_type', 'interface',
+            'url')
+    return (columns, (
+        tuple(ep[k] for k in keys)
+        for ep in sorted(catalog.endpoints, key=lambda ep: (
+            ep['service_type'], ep['region'], ep['interface']))
+    ))
+
+
+def assignment_ids(assignment):
+    """Return the role, user, group, project and domain IDs of an assignment"""
+    scope = getattr(assignment, 'scope', None) or {}
+    return (
+        (getattr(assignment, 'role', None) or {}).get('id'),
+        (getattr(assignment, 'user', None) or {}).get('id'),
+        (getattr(assignment, 'group', None) or {}).get('id'),
+        (scope.get('project') or {}).get('id'),
+        (scope.get('domain') or {}).get('id'),
+    )
+
+
+def project_manager(identity_client):
+    """Return the project manager of an Identity v3 or v2.0 client"""
+
+    try:
+        return identity_client.projects
+    except AttributeError:
+        # Identity v2.0 calls them tenants
+        return identity_client.tenants
+
+
+def find_resources(manager, names_or_ids):
+    """Find many resources by name or ID with as few calls as possible
+
+    Each distinct value is resolved once.  A few values are looked up
+    concurrently with find_resource(); more than LIST_THRESHOLD are matched
+    against a single list() indexed by ID and name.
+
+    :param manager: the resource manager to search
+    :param names_or_ids: iterable of names or IDs, empty values are ignored
+    :rtype: a tuple of a dict mapping each value to its resource and a
+            sorted list of the values that matched nothing
+    :raises: CommandError if a name matches more than one resource
+    """
+
+    values = set(v for v in names_or_ids if v)
+    found = {}
+    ambiguous = []
+    if len(values) > LIST_THRESHOLD:
+        ids = {}
+        names = {}
+        for resource in manager.list():
+            ids[resource.id] = resource
+            names.setdefault(resource.name, []).append(resource)
+        for value in values:
+            if value in ids:
+                found[value] = ids[value]
+            elif len(names.get(value, ())) > 1:
+                ambiguous.append(value)
+            elif value in names:
+                found[value] = names[value][0]
+    else:
+        def _find(value):
+            try:
+                return value, utils.find_resource(manager, value), False
+            except exceptions.CommandError as e:
+                # find_resource() tells an ambiguous name only by message
+                return value, None, str(e).startswith('More than one')
+
+        for value, resource, is_ambiguous in utils.map_parallel(
+            _find,
+            values,
+        ):
+            if is_ambiguous:
+                ambiguous.append(value)
+            elif resource is not None:
+                found[value] = resource
+    if ambiguous:
+        msg = "More than one %s exists with the name(s) %s, use IDs" % (
+            manager.resource_class.__name__.lower(),
+            ', '.join("'%s'" % v for v in sorted(ambiguous)),
+        )
+        raise exceptions.CommandError(msg)
+    return found, sorted(values - set(found))
+
+
+def read_entries(path, what='entries'):
+    """Read a list of entries from a YAML, JSON or CSV file
+
+    :param path: the file to read, CSV if it ends in .csv
+    :param what: what the entries are, for error messages
+    :rtype: a list, validating the entries is up to the caller
+    """
+
+    try:
+        with open(path) as f:
+            if path.lower().endswith('.csv'):
+                data = list(csv.DictReader(f))
+            else:
+                data = yaml.safe_load(f)
+    except (IOError, csv.Error, yaml.YAMLError) as e:
+        msg = "Error reading %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+    if not isinstance(data, list):
+        msg = "%s must contain a list of %s" % (path, what)
+        raise exceptions.CommandError(msg)
+    return data
+
+
+def read_lines(path):
+    """Read one value per line, skipping blank lines and # comments"""
+
+    try:
+        with open(path) as f:
+            return [
+                line.strip() for line in f
+                if line.strip() and not line.strip().startswith('#')
+            ]
+    except IOError as e:
+        msg = "Error reading %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+
+def write_results(path, columns, rows):
+    """Write per-entry results of a bulk command to a CSV file
+
+    :param path: the file to write
+    :param columns: the column headers
+    :param rows: an iterable of row tuples
+    """
+
+    try:
+        with open(path, 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                if six.PY2:
+                    # The py2 csv module only writes bytes
+                    row = [
+                        v.encode('utf-8') if isinstance(v, six.text_type)
+                        else v for v in row
+                    ]
+                writer.writerow(row)
+    except (IOError, OSError) as e:
+        msg = "Error writing results to %s: %s" % (path, e)
+        raise exceptions.CommandError(msg)
+
+
+def text(value):
+    """Return a value read from a file as text"""
+    # py2 CSV values are UTF-8 bytes, YAML gives text for non-ASCII values
+    if isinstance(value, six.binary_type):
+        return value.decode('utf-8')
+    return six.text_type(value)
+
+
+def load_user_file(path, fields):
+    """Read users from a YAML, JSON or CSV file
+
+    Every entry needs a name, user names may only appear once per domain.
+
+    :param path: the file to read
+    :param fields: the other fields an entry may have
+    :rtype: a list of dicts with text values, empty fields are dropped
+    """
+
+    entries = []
+    names = set()
+    for n, entry in enumerate(read_entries(path, 'users'), 1):
+        if not isinstance(entry, dict):
+            entry = {}
+        entry = dict(
+            (k, text(v)) for k, v in entry.items()
+            if (k in fields or k == 'name') and v not in (None, '')
+        )
+        if not entry.get('name'):
+            msg = "Entry %d in %s has no user name" % (n, path)
+            raise exceptions.CommandError(msg)
+        # User names are only unique within a domain
+        key = (entry['name'], entry.get('domain'))
+        if key in names:
+            msg = "User %s appears more than once in %s" % (
+                entry['name'],
+                path,
+            )
+            raise exceptions.CommandError(msg)
+        names.add(key)
+        entries.append(entry)
+    return entries
+
+
+def delete_users_from_file(identity_client, path, concurrency, results, log,
+                           domains=False, domain=None):
+    """Delete every user named in a user file
+
+    All users are resolved in one batch and deleted concurrently.  With
+    domains, entries may name the domain of their user and names are
+    matched within it; a name without a domain that belongs to users in
+    several domains is refused.
+
+    :param identity_client: an Identity v2.0 or v3 client
+    :param path: a file as read by load_user_file()
+    :param concurrency: number of users to delete at once
+    :param results: CSV file to write the outcome of every entry to
+    :param log: logger for failed deletes
+    :param domains: whether users live in domains (Identity v3)
+    :param domain: domain name or ID for entries without one
+    :raises: CommandError if any user could not be deleted
+    """
+
+    entries = load_user_file(path, ('domain',) if domains else ())
+    if domain:
+        for entry in entries:
+            entry.setdefault('domain', domain)
+
+    # Names without a domain must be unique across all of them
+    found, unknown = find_resources(
+        identity_client.users,
+        [e['name'] for e in entries if not e.get('domain')],
+    )
+    users = dict(
+        ((name, None), user) for name, user in found.items())
+
+    # Users with a domain come from one listing per domain
+    scoped = [e for e in entries if e.get('domain')]
+    if scoped:
+        domain_found, unknown_domains = find_resources(
+            identity_client.domains,
+            [e['domain'] for e in scoped],
+        )
+        if unknown_domains:
+            msg = "Unknown domains in %s: %s" % (
+                path,
+                ', '.join(unknown_domains),
+            )
+            raise exceptions.CommandError(msg)
+        domain_ids = sorted(set(d.id for d in domain_found.values()))
+        indexes = {}
+        for domain_id, listing in zip(domain_ids, utils.run_parallel([
+            functools.partial(identity_client.users.list, domain=domain_id)
+            for domain_id in domain_ids
+        ])):
+            index = indexes[domain_id] = {}
+            for user in listing:
+                index[user.id] = user
+                index[user.name] = user
+        for entry in scoped:
+            user = indexes[domain_found[entry['domain']].id].get(
+                entry['name'])
+            if user is not None:
+                users[(entry['name'], entry['domain'])] = user
+
+    def _delete(entry):
+        name = entry['name']
+        user = users.get((name, entry.get('domain')))
+        if user is None:
+            return (name, '', 'not found')
+        try:
+            identity_client.users.delete(user.id)
+        except Exception as e:
+            log.error('Unable to delete user %s: %s' % (name, e))
+            return (name, user.id, 'failed')
+        return (name, user.id, 'deleted')
+
+    rows = list(utils.map_parallel(
+        _delete,
+        entries,
+        max_workers=concurrency,
+    ))
+    if results:
+        write_results(results, ('Name', 'ID', 'Status'), rows)
+    # Users that are already gone are only reported, not failures
+    failed = [row[0] for row in rows if row[2] == 'failed']
+    if failed:
+        msg = "%d of %d users could not be deleted: %s" % (
+            len(failed),
+            len(rows),
+            ', '.join(failed),
+        )
+        raise exceptions.CommandError(msg)
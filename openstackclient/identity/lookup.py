@@ -0,0 +1,192 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Cached Identity ID to name lookups"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+LOG = logging.getLogger(__name__)
+
+# Seconds a resolved name is trusted before it is looked up again
+DEFAULT_TTL = 300
+
+
+def make_lookup(instance):
+    """Returns an identity lookup service for a ClientManager"""
+    return IdentityLookup(
+        instance,
+        cache_file=getattr(instance, '_identity_cache', None),
+    )
+
+
+class IdentityLookup(object):
+    """Resolve Identity project, user, group, domain and role IDs to names
+
+    Resolved names are kept for ttl seconds so list commands only fetch
+    the IDs they have not seen yet.  If cache_file is given the names are
+    also saved there for the next invocation.
+
+    :param client_manager: ClientManager providing the identity client
+    :param ttl: seconds to keep a resolved name
+    :param cache_file: JSON file to persist names in, optional
+    """
+
+    KINDS = ('project', 'user', 'group', 'domain', 'role')
+
+    def __init__(self, client_manager, ttl=DEFAULT_TTL, cache_file=None):
+        self._client_manager = client_manager
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self._cache = dict((kind, {}) for kind in self.KINDS)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def _scope(self):
+        # Names are only valid for the cloud they came from
+        return (getattr(self._client_manager, '_auth_url', None) or
+                getattr(self._client_manager, '_url', None) or '')
+
+    def _manager(self, kind):
+        identity_client = self._client_manager.identity
+        if kind == 'project':
+            return common.project_manager(identity_client)
+        return getattr(identity_client, kind + 's')
+
+    def name(self, kind, resource_id):
+        """Return the name of a single resource, or its ID if unknown"""
+        if not resource_id:
+            return ""
+        return self.names(kind, [resource_id])[resource_id]
+
+    def names(self, kind, ids):
+        """Return a dict mapping each of ids to a name
+
+        IDs that can not be resolved map to themselves.
+
+        :param kind: one of 'project', 'user', 'group', 'domain' or 'role'
+        :param ids: iterable of resource IDs, empty values are ignored
+        """
+
+        if kind not in self.KINDS:
+            raise ValueError("Unknown identity resource kind: %s" % kind)
+        ids = set(i for i in ids if i)
+        self._load()
+
+        now = time.time()
+        result = {}
+        missing = []
+        with self._lock:
+            cache = self._cache[kind]
+            for resource_id in ids:
+                entry = cache.get(resource_id)
+                if entry and entry[1] > now:
+                    result[resource_id] = entry[0]
+                else:
+                    missing.append(resource_id)
+
+        if missing:
+            found = self._fetch(kind, missing)
+            expires = now + self.ttl
+            with self._lock:
+                for resource_id, name in found.items():
+                    cache[resource_id] = (name, expires)
+            if found:
+                self._save()
+            for resource_id in missing:
+                result[resource_id] = found.get(resource_id, resource_id)
+        return result
+
+    def _fetch(self, kind, ids):
+        manager = self._manager(kind)
+        found = {}
+        if len(ids) > common.LIST_THRESHOLD:
+            try:
+                for resource in manager.list():
+                    found[resource.id] = resource.name
+            except Exception as e:
+                LOG.warning("Unable to list %ss: %s", kind, e)
+            return found
+
+        def _get(resource_id):
+            try:
+                return resource_id, manager.get(resource_id).name
+            except Exception as e:
+                LOG.debug("Unable to look up %s %s: %s", kind, resource_id, e)
+                return resource_id, None
+
+        for resource_id, name in utils.map_parallel(_get, ids):
+            if name is not None:
+                found[resource_id] = name
+        return found
+
+    def _read_file(self):
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as e:
+            LOG.warning("Ignoring corrupt identity cache %s: %s",
+                        self.cache_file, e)
+            return {}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.cache_file:
+            return
+        saved = self._read_file().get(self._scope, {})
+        now = time.time()
+        with self._lock:
+            for kind in self.KINDS:
+                for resource_id, entry in saved.get(kind, {}).items():
+                    if entry[1] > now:
+                        self._cache[kind][resource_id] = tuple(entry)
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        data = self._read_file()
+        now = time.time()
+        with self._lock:
+            data[self._scope] = dict(
+                (kind, dict(
+                    (i, list(entry)) for i, entry in self._cache[kind].items()
+                    if entry[1] > now
+                ))
+                for kind in self.KINDS
+            )
+        # Write a temporary file and rename it so concurrent invocations
+        # never see a partially written cache
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp_path, self.cache_file)
+        except (IOError, OSError) as e:
+            LOG.warning("Unable to save identity cache %s: %s",
+                        self.cache_file, e)
@@ -0,0 +1,343 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Credential rotation action implementation"""
+
+import abc
+import logging
+import time
+
+from cliff import lister
+
+from openstackclient.common import exceptions
+from openstackclient.common import secretfile
+from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+COLUMNS = ('User', 'Project', 'Old Access', 'New Access', 'Status')
+SECRET_COLUMNS = ('user_id', 'user', 'project_id', 'access', 'secret',
+                  'old_id', 'old_access', 'delete_after')
+
+
+class RotateCredentials(lister.Lister):
+    """Replace the EC2 credentials of many users
+
+    Subclasses provide the Identity API specific calls: listing the users
+    of a project and listing, creating and deleting the credentials of a
+    user.  Credentials are dicts with the keys id, access and project_id.
+
+    The secrets file also records the replaced credentials and when they
+    may be deleted, so a later run with --delete-replaced deletes them
+    once the grace period of --delete-old-after is over.
+    """
+
+    log = logging.getLogger(__name__ + '.RotateCredentials')
+
+    def get_parser(self, prog_name):
+        parser = super(RotateCredentials, self).get_parser(prog_name)
+        parser.add_argument(
+            '--user',
+            metavar='<user>',
+            action='append',
+            default=[],
+            help='Rotate the credentials of this user (name or ID) '
+                 '(repeat option to rotate for multiple users)',
+        )
+        parser.add_argument(
+            '--project',
+            metavar='<project>',
+            help='Only rotate credentials for this project (name or ID), '
+                 'for all of its users unless --user is given',
+        )
+        parser.add_argument(
+            '--output',
+            metavar='<file>',
+            help='Encrypted file to write the new secrets to, the '
+                 'passphrase is read from %s or prompted for' %
+                 secretfile.PASSPHRASE_ENV,
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            default=False,
+            help='Replace the --output file if it exists',
+        )
+        parser.add_argument(
+            '--delete-old-after',
+            metavar='<seconds>',
+            type=int,
+            help='Allow deleting the replaced credentials this many seconds '
+                 'after creating the new ones, 0 deletes them right away '
+                 '(default: keep them)',
+        )
+        parser.add_argument(
+            '--delete-replaced',
+            metavar='<file>',
+            help='Delete the credentials replaced by an earlier run whose '
+                 '--delete-old-after time has passed, as recorded in this '
+                 'secrets file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the credentials that would be rotated',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of requests to make at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    @abc.abstractmethod
+    def project_users(self, identity_client, project_id):
+        """Return (id, name) of the users with a role on a project"""
+
+    @abc.abstractmethod
+    def list_credentials(self, identity_client, user_id):
+        """Return the EC2 credentials of a user"""
+
+    @abc.abstractmethod
+    def create_credential(self, identity_client, user_id, project_id):
+        """Create an EC2 credential, return it along with its secret"""
+
+    @abc.abstractmethod
+    def delete_credential(self, identity_client, user_id, credential):
+        """Delete a credential returned by list_credentials()"""
+
+    def _delete_old(self, identity_client, replaced, concurrency):
+        """Delete replaced credentials, yield each (item, status)"""
+
+        def _delete(item):
+            (user_id, user, credential), new = item
+            try:
+                self.delete_credential(identity_client, user_id, credential)
+            except Exception as e:
+                self.log.error('Unable to delete credential %s of user '
+                               '%s: %s' % (credential['access'], user, e))
+                return item, 'delete failed'
+            return item, 'replaced'
+
+        return utils.map_parallel(_delete, replaced, max_workers=concurrency)
+
+    def _delete_replaced(self, identity_client, parsed_args):
+        passphrase = secretfile.get_passphrase(self.app.stdin, confirm=False)
+        entries = secretfile.read_secrets(
+            parsed_args.delete_replaced, passphrase)
+
+        now = time.time()
+        rows = []
+        due = []
+        for entry in entries:
+            if not entry.get('delete_after'):
+                continue
+            if float(entry['delete_after']) > now:
+                rows.append((entry['user'], entry['project_id'],
+                             entry['old_access'], entry['access'],
+                             'waiting'))
+                continue
+            due.append((
+                (entry['user_id'], entry['user'], {
+                    'id': entry['old_id'],
+                    'access': entry['old_access'],
+                    'project_id': entry['project_id'],
+                }),
+                entry,
+            ))
+
+        deleted = False
+        for ((user_id, user, c), entry), status in self._delete_old(
+            identity_client,
+            due,
+            parsed_args.concurrency,
+        ):
+            rows.append((user, c['project_id'], c['access'],
+                         entry['access'], status))
+            if status == 'replaced':
+                # Nothing left to delete for this entry
+                entry.update(old_id='', old_access='', delete_after='')
+                deleted = True
+        if deleted:
+            secretfile.write_secrets(
+                parsed_args.delete_replaced,
+                passphrase,
+                SECRET_COLUMNS,
+                [tuple(e.get(c, '') for c in SECRET_COLUMNS)
+                 for e in entries],
+            )
+        return (COLUMNS, rows)
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        if parsed_args.delete_replaced:
+            return self._delete_replaced(identity_client, parsed_args)
+        if not parsed_args.user and not parsed_args.project:
+            msg = "Specify the users to rotate with --user or --project"
+            raise exceptions.CommandError(msg)
+        if (parsed_args.delete_old_after is not None and
+                parsed_args.delete_old_after < 0):
+            msg = "--delete-old-after must not be negative"
+            raise exceptions.CommandError(msg)
+        if not parsed_args.dry_run:
+            if not parsed_args.output:
+                msg = "--output is required to keep the new secrets"
+                raise exceptions.CommandError(msg)
+            # Check and ask before changing anything
+            secretfile.check_output(
+                parsed_args.output,
+                overwrite=parsed_args.overwrite,
+            )
+            passphrase = secretfile.get_passphrase(self.app.stdin)
+        project_id = None
+        if parsed_args.project:
+            project_id = utils.find_resource(
+                common.project_manager(identity_client),
+                parsed_args.project,
+            ).id
+
+        rows = []
+        if parsed_args.user:
+            found, unknown = common.find_resources(
+                identity_client.users,
+                parsed_args.user,
+            )
+            users = dict((u.id, u.name) for u in found.values())
+            rows.extend((value, '', '', '', 'not found') for value in unknown)
+        else:
+            users = dict(self.project_users(identity_client, project_id))
+
+        # Enumerate the credentials of all users at once
+        def _list(user_id):
+            try:
+                return user_id, self.list_credentials(
+                    identity_client, user_id)
+            except Exception as e:
+                self.log.error('Unable to list credentials of user %s: %s' %
+                               (users[user_id], e))
+                return user_id, None
+
+        old = []
+        for user_id, credentials in utils.map_parallel(
+            _list,
+            sorted(users),
+            max_workers=parsed_args.concurrency,
+        ):
+            if credentials is None:
+                rows.append((users[user_id], '', '', '', 'failed'))
+                continue
+            old.extend(
+                (user_id, c) for c in credentials
+                if not project_id or c['project_id'] == project_id)
+
+        if parsed_args.dry_run:
+            rows.extend(
+                (users[user_id], c['project_id'], c['access'], '', 'pending')
+                for user_id, c in old)
+            return (COLUMNS, rows)
+
+        def _create(item):
+            user_id, credential = item
+            try:
+                return item, self.create_credential(
+                    identity_client,
+                    user_id,
+                    credential['project_id'],
+                )
+            except Exception as e:
+                self.log.error('Unable to replace credential %s of user '
+                               '%s: %s' % (credential['access'],
+                                           users[user_id], e))
+                return item, None
+
+        # Find a user name that cannot be written before any new
+        # credential exists
+        secretfile.encode_secrets(SECRET_COLUMNS, [
+            [user_id, users[user_id], c['project_id'], '', '', c['id'],
+             c['access'], '']
+            for user_id, c in old
+        ])
+        created = list(utils.map_parallel(
+            _create,
+            old,
+            max_workers=parsed_args.concurrency,
+        ))
+        replaced = [(item, new) for item, new in created if new]
+        rows.extend(
+            (users[user_id], c['project_id'], c['access'], '', 'failed')
+            for (user_id, c), new in created if not new)
+
+        delete_after = ''
+        if parsed_args.delete_old_after is not None:
+            delete_after = int(time.time()) + parsed_args.delete_old_after
+
+        # The secrets are saved before any old credential goes away
+        secrets = [
+            [user_id, users[user_id], new[0]['project_id'], new[0]['access'],
+             new[1], c['id'], c['access'], delete_after]
+            for (user_id, c), new in replaced
+        ]
+        if secrets:
+            secretfile.write_secrets(
+                parsed_args.output,
+                passphrase,
+                SECRET_COLUMNS,
+                secrets,
+            )
+
+        if parsed_args.delete_old_after != 0:
+            status = 'rotated'
+            if replaced and parsed_args.delete_old_after:
+                status = 'scheduled'
+                self.log.warning(
+                    'The old credentials can be deleted after %s with '
+                    '--delete-replaced %s' % (
+                        time.strftime('%Y-%m-%d %H:%M:%S',
+                                      time.localtime(delete_after)),
+                        parsed_args.output,
+                    ))
+            rows.extend(
+                (users[user_id], c['project_id'], c['access'],
+                 new[0]['access'], status)
+                for (user_id, c), new in replaced)
+            return (COLUMNS, rows)
+
+        deleted = False
+        for ((user_id, user, c), (new, secret)), status in self._delete_old(
+            identity_client,
+            [((user_id, users[user_id], c), (new, secret))
+             for ((user_id, c), new), secret in zip(replaced, secrets)],
+            parsed_args.concurrency,
+        ):
+            rows.append((user, c['project_id'], c['access'],
+                         new[0]['access'], status))
+            if status == 'replaced':
+                # Failed ones are left for --delete-replaced
+                secret[5:] = ['', '', '']
+                deleted = True
+        if deleted:
+            secretfile.write_secrets(
+                parsed_args.output,
+                passphrase,
+                SECRET_COLUMNS,
+                secrets,
+            )
+        return (COLUMNS, rows)
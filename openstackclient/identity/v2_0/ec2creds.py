@@ -24,6 +24,7 @@ from cliff import lister
 from cliff import show
 
 from openstackclient.common import utils
+from openstackclient.identity import rotation
 
 
 class CreateEC2Creds(show.ShowOne):
@@ -146,6 +147,35 @@ class ListEC2Creds(lister.Lister):
                 ) for s in data))
 
 
+class RotateEC2Creds(rotation.RotateCredentials):
+    """Replace the EC2 credentials of many users"""
+
+    log = logging.getLogger(__name__ + '.RotateEC2Creds')
+
+    def project_users(self, identity_client, project_id):
+        return [
+            (u.id, u.name)
+            for u in identity_client.users.list(tenant_id=project_id)
+        ]
+
+    def list_credentials(self, identity_client, user_id):
+        return [
+            {'id': c.access, 'access': c.access, 'project_id': c.tenant_id}
+            for c in identity_client.ec2.list(user_id)
+        ]
+
+    def create_credential(self, identity_client, user_id, project_id):
+        creds = identity_client.ec2.create(user_id, project_id)
+        return ({
+            'id': creds.access,
+            'access': creds.access,
+            'project_id': creds.tenant_id,
+        }, creds.secret)
+
+    def delete_credential(self, identity_client, user_id, credential):
+        identity_client.ec2.delete(user_id, credential['access'])
+
+
 class ShowEC2Creds(show.ShowOne):
     """Show EC2 credentials"""
 
@@ -106,10 +106,18 @@ class ListEndpoint(lister.Lister):
             action='store_true',
             default=False,
             help='List additional fields in output')
+        parser.add_argument(
+            '--catalog',
+            action='store_true',
+            default=False,
+            help='List the endpoints of the service catalog received '
+                 'when authenticating, without any API calls')
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)' % parsed_args)
+        if parsed_args.catalog:
+            return common.catalog_endpoints(self.app.client_manager)
         identity_client = self.app.client_manager.identity
         if parsed_args.long:
             columns = ('ID', 'Region', 'Service Name', 'Service Type',
@@ -118,10 +126,7 @@ class ListEndpoint(lister.Lister):
             columns = ('ID', 'Region', 'Service Name', 'Service Type')
         data = identity_client.endpoints.list()
 
-        for ep in data:
-            service = common.find_service(identity_client, ep.service_id)
-            ep.service_name = service.name
-            ep.service_type = service.type
+        common.service_names(identity_client, data)
         return (columns,
                 (utils.get_item_properties(
                     s, columns,
@@ -20,6 +20,8 @@ import six
 
 from cliff import show
 
+from openstackclient.identity import validation
+
 
 class CreateToken(show.ShowOne):
     """Create token command"""
@@ -36,3 +38,17 @@ class CreateToken(show.ShowOne):
         token = identity_client.service_catalog.get_token()
         token['project_id'] = token.pop('tenant_id')
         return zip(*sorted(six.iteritems(token)))
+
+
+class ShowToken(validation.ShowToken):
+    """Show the user, project, roles and lifetime of a token"""
+
+    log = logging.getLogger(__name__ + '.ShowToken')
+    api_version = '2.0'
+
+
+class ValidateToken(validation.ValidateToken):
+    """Validate tokens and show their user, project, roles and lifetime"""
+
+    log = logging.getLogger(__name__ + '.ValidateToken')
+    api_version = '2.0'
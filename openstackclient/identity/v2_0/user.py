@@ -15,6 +15,7 @@
 
 """Identity v2.0 User action implementations"""
 
+import functools
 import logging
 import six
 
@@ -22,7 +23,9 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import utils
+from openstackclient.identity import common
 
 
 class CreateUser(show.ShowOne):
@@ -118,14 +121,47 @@ class DeleteUser(command.Command):
         parser.add_argument(
             'user',
             metavar='<user>',
+            nargs='?',
             help='User to delete (name or ID)',
         )
+        parser.add_argument(
+            '--from-file',
+            metavar='<file>',
+            help='Delete every user named in a YAML, JSON or CSV file',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of users to delete at once with --from-file '
+                 '(default: %d)' % utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--results',
+            metavar='<file>',
+            help='Write the outcome for every user in --from-file to a '
+                 'CSV file',
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)' % parsed_args)
         identity_client = self.app.client_manager.identity
 
+        if bool(parsed_args.user) == bool(parsed_args.from_file):
+            msg = "Specify either a user or --from-file"
+            raise exceptions.CommandError(msg)
+        if parsed_args.from_file:
+            common.delete_users_from_file(
+                identity_client,
+                parsed_args.from_file,
+                parsed_args.concurrency,
+                parsed_args.results,
+                self.log,
+            )
+            return
+
         user = utils.find_resource(
             identity_client.users,
             parsed_args.user,
@@ -135,6 +171,153 @@ class DeleteUser(command.Command):
         return
 
 
+class ImportUser(lister.Lister):
+    """Create many users from a file"""
+
+    log = logging.getLogger(__name__ + '.ImportUser')
+
+    def get_parser(self, prog_name):
+        parser = super(ImportUser, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            required=True,
+            help='YAML, JSON or CSV file listing name and optionally '
+                 'password, email, project and enabled for each user',
+        )
+        parser.add_argument(
+            '--project',
+            metavar='<project>',
+            help='Default project for users without one (name or ID)',
+        )
+        parser.add_argument(
+            '--role',
+            metavar='<role>',
+            action='append',
+            default=[],
+            help='Grant role on the default project of every new user '
+                 '(name or ID, repeat option to grant multiple roles)',
+        )
+        parser.add_argument(
+            '--results',
+            metavar='<file>',
+            help='Write the outcome for every user to a CSV file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the users that would be created',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of users to create at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        entries = common.load_user_file(
+            parsed_args.file,
+            ('password', 'email', 'project', 'enabled'),
+        )
+        for entry in entries:
+            entry.setdefault('project', parsed_args.project)
+            if parsed_args.role and not entry['project']:
+                msg = ("User %s has no project to grant roles on" %
+                       entry['name'])
+                raise exceptions.CommandError(msg)
+
+        # Existing users, projects and roles are each resolved in a
+        # single batch, not once per user
+        (users, _), (projects, unknown_projects), (roles, unknown_roles) = \
+            utils.run_parallel([
+                functools.partial(
+                    common.find_resources,
+                    identity_client.users,
+                    [e['name'] for e in entries],
+                ),
+                functools.partial(
+                    common.find_resources,
+                    identity_client.tenants,
+                    [e['project'] for e in entries],
+                ),
+                functools.partial(
+                    common.find_resources,
+                    identity_client.roles,
+                    parsed_args.role,
+                ),
+            ])
+        unknown = ["project '%s'" % p for p in unknown_projects]
+        unknown.extend("role '%s'" % r for r in unknown_roles)
+        if unknown:
+            msg = "Unknown names in %s: %s" % (
+                parsed_args.file,
+                ', '.join(unknown),
+            )
+            raise exceptions.CommandError(msg)
+
+        def _create(entry):
+            name = entry['name']
+            project = entry['project'] or ''
+            user = users.get(name)
+            if user is not None:
+                return (name, user.id, project, '', 'exists')
+            if parsed_args.dry_run:
+                return (name, '', project, '', 'pending')
+            project_id = projects[project].id if project else None
+            try:
+                user = identity_client.users.create(
+                    name,
+                    entry.get('password'),
+                    entry.get('email'),
+                    tenant_id=project_id,
+                    enabled=utils.string_to_bool(
+                        entry.get('enabled', 'true')),
+                )
+            except Exception as e:
+                self.log.error('Unable to create user %s: %s' % (name, e))
+                return (name, '', project, '', 'failed')
+            granted = []
+            status = 'created'
+            for role in parsed_args.role:
+                try:
+                    identity_client.roles.add_user_role(
+                        user.id,
+                        roles[role].id,
+                        project_id,
+                    )
+                    granted.append(role)
+                except Exception as e:
+                    self.log.error('Unable to grant role %s to user %s: '
+                                   '%s' % (role, name, e))
+                    status = 'incomplete'
+            return (name, user.id, project, ','.join(granted), status)
+
+        rows = list(utils.map_parallel(
+            _create,
+            entries,
+            max_workers=parsed_args.concurrency,
+        ))
+        columns = ('Name', 'ID', 'Project', 'Roles', 'Status')
+        if parsed_args.results:
+            common.write_results(parsed_args.results, columns, rows)
+        failed = [
+            row[0] for row in rows if row[4] in ('failed', 'incomplete')
+        ]
+        if failed:
+            msg = ("%d of %d users could not be created or given their "
+                   "roles: %s" % (len(failed), len(rows), ', '.join(failed)))
+            raise exceptions.CommandError(msg)
+        return (columns, rows)
+
+
 class ListUser(lister.Lister):
     """List users"""
 
@@ -158,14 +341,6 @@ class ListUser(lister.Lister):
         self.log.debug('take_action(%s)' % parsed_args)
         identity_client = self.app.client_manager.identity
 
-        def _format_project(project):
-            if not project:
-                return ""
-            if project in project_cache.keys():
-                return project_cache[project].name
-            else:
-                return project
-
         project = None
         if parsed_args.project:
             project = utils.find_resource(
@@ -189,14 +364,6 @@ class ListUser(lister.Lister):
                 'Email',
                 'Enabled',
             )
-            # Cache the project list
-            project_cache = {}
-            try:
-                for p in identity_client.tenants.list():
-                    project_cache[p.id] = p
-            except Exception:
-                # Just forget it if there's any trouble
-                pass
         else:
             columns = column_headers = ('ID', 'Name')
         data = identity_client.users.list(tenant_id=project)
@@ -217,6 +384,19 @@ class ListUser(lister.Lister):
                     d._info['tenantId'] = d._info.pop('tenant_id')
                     d._add_details(d._info)
 
+            # Only look up the projects the listed users belong to
+            project_names = self.app.client_manager.identity_lookup.names(
+                'project',
+                (getattr(d, 'tenantId', None) for d in data),
+            )
+        else:
+            project_names = {}
+
+        def _format_project(project):
+            if not project:
+                return ""
+            return project_names.get(project, project)
+
         return (column_headers,
                 (utils.get_item_properties(
                     s, columns,
@@ -15,15 +15,19 @@
 
 """Identity v3 Credential action implementations"""
 
+import json
 import logging
 import six
 import sys
+import uuid
 
 from cliff import command
 from cliff import lister
 from cliff import show
 
 from openstackclient.common import utils
+from openstackclient.identity import common
+from openstackclient.identity import rotation
 
 
 class CreateCredential(show.ShowOne):
@@ -113,6 +117,62 @@ class ListCredential(lister.Lister):
                 ) for s in data))
 
 
+class RotateCredential(rotation.RotateCredentials):
+    """Replace the EC2 credentials of many users"""
+
+    log = logging.getLogger(__name__ + '.RotateCredential')
+
+    def project_users(self, identity_client, project_id):
+        # Effective assignments include the members of assigned groups
+        user_ids = set(
+            common.assignment_ids(a)[1]
+            for a in identity_client.role_assignments.list(
+                project=project_id,
+                effective=True,
+            )
+        )
+        user_ids.discard(None)
+        return self.app.client_manager.identity_lookup.names(
+            'user', user_ids).items()
+
+    def list_credentials(self, identity_client, user_id):
+        credentials = []
+        for c in identity_client.credentials.list(user_id=user_id):
+            if c.type != 'ec2' or c.user_id != user_id:
+                continue
+            blob = getattr(c, 'blob', None) or getattr(c, 'data', None)
+            try:
+                access = json.loads(blob)['access']
+            except (TypeError, ValueError, KeyError):
+                self.log.warning('Skipping credential %s with unreadable '
+                                 'data' % c.id)
+                continue
+            credentials.append({
+                'id': c.id,
+                'access': access,
+                'project_id': getattr(c, 'project_id', None),
+            })
+        return credentials
+
+    def create_credential(self, identity_client, user_id, project_id):
+        access = uuid.uuid4().hex
+        secret = uuid.uuid4().hex
+        credential = identity_client.credentials.create(
+            user=user_id,
+            type='ec2',
+            blob=json.dumps({'access': access, 'secret': secret}),
+            project=project_id,
+        )
+        return ({
+            'id': credential.id,
+            'access': access,
+            'project_id': project_id,
+        }, secret)
+
+    def delete_credential(self, identity_client, user_id, credential):
+        identity_client.credentials.delete(credential['id'])
+
+
 class SetCredential(command.Command):
     """Set credential command"""
 
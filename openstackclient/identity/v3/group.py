@@ -23,7 +23,9 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import utils
+from openstackclient.identity import common
 
 
 class AddUserToGroup(command.Command):
@@ -356,6 +358,167 @@ class SetGroup(command.Command):
         return
 
 
+class SyncGroup(lister.Lister):
+    """Make the members of a group match a list of users"""
+
+    log = logging.getLogger(__name__ + '.SyncGroup')
+
+    def get_parser(self, prog_name):
+        parser = super(SyncGroup, self).get_parser(prog_name)
+        parser.add_argument(
+            'group',
+            metavar='<group>',
+            help='Group to synchronize (name or ID)',
+        )
+        parser.add_argument(
+            '--members-file',
+            metavar='<file>',
+            required=True,
+            help='File with the name or ID of one desired member per line',
+        )
+        parser.add_argument(
+            '--domain',
+            metavar='<domain>',
+            help='Look up member names in this domain (name or ID)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the changes that would be made',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of memberships to change at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--rate',
+            metavar='<calls>',
+            type=float,
+            help='Make at most <calls> membership changes per second',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            default=False,
+            help='Allow removing every member of the group',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        desired = common.read_lines(parsed_args.members_file)
+
+        group = utils.find_resource(identity_client.groups, parsed_args.group)
+        if parsed_args.domain:
+            domain_id = utils.find_resource(
+                identity_client.domains,
+                parsed_args.domain,
+            ).id
+        else:
+            domain_id = None
+
+        # Current members come from a single listing, and desired users
+        # that are already members are resolved against it for free.
+        # User names are only unique within a domain, so with a domain
+        # only its members can match by name.
+        current = dict(
+            (u.id, u) for u in identity_client.users.list(group=group.id))
+        names = {}
+        for user in current.values():
+            if domain_id is None or (
+                    getattr(user, 'domain_id', None) == domain_id):
+                names.setdefault(user.name, []).append(user)
+        ambiguous = sorted(set(
+            v for v in desired
+            if v not in current and len(names.get(v, ())) > 1))
+        if ambiguous:
+            msg = ("More than one member of group %s is named %s, use IDs "
+                   "or --domain" % (group.name, ', '.join(ambiguous)))
+            raise exceptions.CommandError(msg)
+        resolved = {}
+        for value in desired:
+            if value in current:
+                resolved[value] = current[value]
+            elif value in names:
+                resolved[value] = names[value][0]
+        missing = [v for v in desired if v not in resolved]
+        if missing and domain_id:
+            index = {}
+            for user in identity_client.users.list(domain=domain_id):
+                index[user.id] = user
+                index[user.name] = user
+            resolved.update((v, index[v]) for v in missing if v in index)
+        elif missing:
+            # Refuses names shared by users in several domains
+            resolved.update(common.find_resources(
+                identity_client.users,
+                missing,
+            )[0])
+
+        plan = []
+        seen = set()
+        desired_ids = set()
+        for value in desired:
+            user = resolved.get(value)
+            key = user.id if user is not None else value
+            if key in seen:
+                continue
+            seen.add(key)
+            if user is None:
+                plan.append(('add', value, None))
+            else:
+                desired_ids.add(user.id)
+                if user.id not in current:
+                    plan.append(('add', value, user.id))
+        for user_id, user in sorted(current.items()):
+            if user_id not in desired_ids:
+                plan.append(('remove', user.name, user_id))
+
+        # An empty or unresolvable members file is more likely a mistake
+        # than a request to empty the group
+        if (current and not desired_ids and not parsed_args.force and
+                not parsed_args.dry_run):
+            msg = ("This would remove all %d members of group %s, use "
+                   "--force to do so" % (len(current), group.name))
+            raise exceptions.CommandError(msg)
+
+        limiter = utils.RateLimiter(parsed_args.rate)
+
+        def _apply(change):
+            action, name, user_id = change
+            if user_id is None:
+                return (action, name, 'not found')
+            if parsed_args.dry_run:
+                return (action, name, 'pending')
+            if action == 'add':
+                apply_change = identity_client.users.add_to_group
+            else:
+                apply_change = identity_client.users.remove_from_group
+            limiter.wait()
+            try:
+                apply_change(user_id, group.id)
+            except Exception as e:
+                self.log.error('Unable to %s user %s: %s' %
+                               (action, name, e))
+                return (action, name, 'failed')
+            return (action, name, 'added' if action == 'add' else 'removed')
+
+        columns = ('Action', 'User', 'Status')
+        return (columns, utils.map_parallel(
+            _apply,
+            plan,
+            max_workers=parsed_args.concurrency,
+            ordered=False,
+        ))
+
+
 class ShowGroup(show.ShowOne):
     """Show group command"""
 
@@ -15,6 +15,7 @@
 
 """Identity v3 Role action implementations"""
 
+import functools
 import logging
 import six
 import sys
@@ -23,7 +24,58 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+ACTOR_TYPES = ('user', 'group')
+SCOPE_TYPES = ('project', 'domain', 'sid', 'sip')
+
+
+def _load_role_file(path):
+    """Read role assignments from a YAML, JSON or CSV file
+
+    Each entry names a role, exactly one of user or group, and exactly one
+    of project, domain, sid or sip.  An optional state of 'absent' asks for
+    the assignment to be removed instead of granted.
+
+    :param path: the file to read
+    :rtype: a list of (role, actor type, actor, scope type, scope, state)
+            tuples
+    """
+
+    entries = []
+    for n, entry in enumerate(common.read_entries(path, 'assignments'), 1):
+        if not isinstance(entry, dict):
+            entry = {}
+        entry = dict((k, common.text(v)) for k, v in entry.items() if v)
+        actors = [t for t in ACTOR_TYPES if t in entry]
+        scopes = [t for t in SCOPE_TYPES if t in entry]
+        state = entry.get('state', 'present')
+        if (not entry.get('role') or len(actors) != 1 or len(scopes) != 1 or
+                state not in ('present', 'absent')):
+            msg = ("Entry %d in %s needs a role, one of user or group, one "
+                   "of project, domain, sid or sip, and an optional state "
+                   "of present or absent" % (n, path))
+            raise exceptions.CommandError(msg)
+        if state == 'absent' and scopes[0] in ('sid', 'sip'):
+            msg = ("Entry %d in %s: assignments on a %s can not be "
+                   "removed" % (n, path, scopes[0]))
+            raise exceptions.CommandError(msg)
+        if actors[0] == 'group' and scopes[0] in ('sid', 'sip'):
+            msg = ("Entry %d in %s: roles on a %s can only be granted to "
+                   "users" % (n, path, scopes[0]))
+            raise exceptions.CommandError(msg)
+        entries.append((
+            entry['role'],
+            actors[0],
+            entry[actors[0]],
+            scopes[0],
+            entry[scopes[0]],
+            state,
+        ))
+    return entries
 
 
 class AddRole(command.Command):
@@ -176,6 +228,180 @@ class AddRole(command.Command):
         return
 
 
+class ApplyRole(lister.Lister):
+    """Grant and revoke many role assignments from a file"""
+
+    log = logging.getLogger(__name__ + '.ApplyRole')
+
+    def get_parser(self, prog_name):
+        parser = super(ApplyRole, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            required=True,
+            help='YAML, JSON or CSV file listing role, user or group, '
+                 'project, domain, sid or sip, and optionally state',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the changes that would be made',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of assignments to change at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--rate',
+            metavar='<calls>',
+            type=float,
+            help='Make at most <calls> grants or revokes per second',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        entries = _load_role_file(parsed_args.file)
+
+        # Resolve every distinct name once, one batch per resource type.
+        # As elsewhere, a sid is a domain and a sip a project.
+        managers = {
+            'role': identity_client.roles,
+            'user': identity_client.users,
+            'group': identity_client.groups,
+            'project': identity_client.projects,
+            'domain': identity_client.domains,
+            'sid': identity_client.domains,
+            'sip': identity_client.projects,
+        }
+        values = dict((kind, set()) for kind in managers)
+        for role, actor_type, actor, scope_type, scope, state in entries:
+            values['role'].add(role)
+            values[actor_type].add(actor)
+            values[scope_type].add(scope)
+        kinds = sorted(kind for kind in values if values[kind])
+        resolved = {}
+        unknown = []
+        for kind, (found, missing) in zip(kinds, utils.run_parallel([
+            functools.partial(
+                common.find_resources,
+                managers[kind],
+                values[kind],
+            ) for kind in kinds
+        ])):
+            resolved[kind] = found
+            unknown.extend("%s '%s'" % (kind, v) for v in missing)
+        if unknown:
+            msg = "Unknown names in %s: %s" % (
+                parsed_args.file,
+                ', '.join(unknown),
+            )
+            raise exceptions.CommandError(msg)
+
+        # Fetch the current assignments of each project and domain once
+        scopes = set(
+            (scope_type, resolved[scope_type][scope].id)
+            for role, actor_type, actor, scope_type, scope, state in entries
+            if scope_type in ('project', 'domain')
+        )
+
+        def _current(scope):
+            scope_type, scope_id = scope
+            return identity_client.role_assignments.list(
+                **{scope_type: scope_id})
+
+        current = set()
+        for assignments in utils.map_parallel(
+            _current,
+            scopes,
+            max_workers=parsed_args.concurrency,
+        ):
+            for assignment in assignments:
+                role_id, user_id, group_id, project_id, domain_id = \
+                    common.assignment_ids(assignment)
+                actor = ('user', user_id) if user_id else ('group', group_id)
+                if project_id:
+                    scope = ('project', project_id)
+                else:
+                    scope = ('domain', domain_id)
+                # OS-INHERIT grants only apply to the projects below, they
+                # are not the direct assignments of the file
+                inherited = bool(
+                    (getattr(assignment, 'scope', None) or {}).get(
+                        'OS-INHERIT:inherited_to'))
+                current.add((role_id,) + actor + scope + (inherited,))
+
+        requested = {}
+        plan = {}
+        for role, actor_type, actor, scope_type, scope, state in entries:
+            key = (
+                resolved['role'][role].id,
+                actor_type,
+                resolved[actor_type][actor].id,
+                scope_type,
+                resolved[scope_type][scope].id,
+            )
+            action = 'grant' if state == 'present' else 'revoke'
+            if requested.setdefault(key, action) != action:
+                msg = ("Role %s for %s %s on %s %s is both granted and "
+                       "revoked in %s" % (role, actor_type, actor,
+                                          scope_type, scope,
+                                          parsed_args.file))
+                raise exceptions.CommandError(msg)
+            # There is no way to list sid and sip assignments, but
+            # granting is idempotent
+            if scope_type in ('sid', 'sip') or (
+                    (key + (False,) in current) != (action == 'grant')):
+                plan[key] = (action, role, actor, scope)
+
+        limiter = utils.RateLimiter(parsed_args.rate)
+
+        def _apply(item):
+            key, (action, role, actor, scope) = item
+            role_id, actor_type, actor_id, scope_type, scope_id = key
+            kwargs = {actor_type: actor_id, scope_type: scope_id}
+            if parsed_args.dry_run:
+                status = 'pending'
+            else:
+                if scope_type in ('sid', 'sip'):
+                    change = identity_client.roles.grant_sid
+                elif action == 'grant':
+                    change = identity_client.roles.grant
+                else:
+                    change = identity_client.roles.revoke
+                limiter.wait()
+                try:
+                    change(role_id, **kwargs)
+                    status = 'granted' if action == 'grant' else 'revoked'
+                except Exception as e:
+                    self.log.error('Unable to %s role %s for %s %s on %s '
+                                   '%s: %s' % (action, role, actor_type,
+                                               actor, scope_type, scope, e))
+                    status = 'failed'
+            return (
+                action,
+                role,
+                '%s:%s' % (actor_type, actor),
+                '%s:%s' % (scope_type, scope),
+                status,
+            )
+
+        columns = ('Action', 'Role', 'Actor', 'Scope', 'Status')
+        return (columns, utils.map_parallel(
+            _apply,
+            sorted(plan.items()),
+            max_workers=parsed_args.concurrency,
+            ordered=False,
+        ))
+
+
 class CreateRole(show.ShowOne):
     """Create new role"""
 
@@ -0,0 +1,125 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Identity v3 Role Assignment action implementations"""
+
+import functools
+import logging
+
+from cliff import lister
+
+from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+class ListRoleAssignment(lister.Lister):
+    """List role assignments"""
+
+    log = logging.getLogger(__name__ + '.ListRoleAssignment')
+
+    def get_parser(self, prog_name):
+        parser = super(ListRoleAssignment, self).get_parser(prog_name)
+        parser.add_argument(
+            '--role',
+            metavar='<role>',
+            help='Only list assignments of this role (name or ID)',
+        )
+        user_or_group = parser.add_mutually_exclusive_group()
+        user_or_group.add_argument(
+            '--user',
+            metavar='<user>',
+            help='Only list assignments of this user (name or ID)',
+        )
+        user_or_group.add_argument(
+            '--group',
+            metavar='<group>',
+            help='Only list assignments of this group (name or ID)',
+        )
+        domain_or_project = parser.add_mutually_exclusive_group()
+        domain_or_project.add_argument(
+            '--domain',
+            metavar='<domain>',
+            help='Only list assignments on this domain (name or ID)',
+        )
+        domain_or_project.add_argument(
+            '--project',
+            metavar='<project>',
+            help='Only list assignments on this project (name or ID)',
+        )
+        parser.add_argument(
+            '--effective',
+            action='store_true',
+            default=False,
+            help='List the effective assignments of users, with group '
+                 'memberships and inheritance expanded',
+        )
+        parser.add_argument(
+            '--no-names',
+            dest='names',
+            action='store_false',
+            default=True,
+            help='Show IDs only, do not look up names',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+        identity_lookup = self.app.client_manager.identity_lookup
+
+        # Filters are resolved to IDs once; the listing itself is a single
+        # call no matter how many assignments it returns
+        filters = {}
+        for attr, manager in (
+            ('role', identity_client.roles),
+            ('user', identity_client.users),
+            ('group', identity_client.groups),
+            ('domain', identity_client.domains),
+            ('project', identity_client.projects),
+        ):
+            value = getattr(parsed_args, attr)
+            if value:
+                filters[attr] = utils.find_resource(manager, value).id
+        if parsed_args.effective:
+            filters['effective'] = True
+        data = [
+            (common.assignment_ids(a), bool(
+                (getattr(a, 'scope', None) or {}).get(
+                    'OS-INHERIT:inherited_to')))
+            for a in identity_client.role_assignments.list(**filters)
+        ]
+
+        kinds = ('role', 'user', 'group', 'project', 'domain')
+        if parsed_args.names:
+            # One batched lookup per kind, all kinds at once
+            names = dict(zip(kinds, utils.run_parallel([
+                functools.partial(
+                    identity_lookup.names,
+                    kind,
+                    set(ids[i] for ids, inherited in data),
+                ) for i, kind in enumerate(kinds)
+            ])))
+        else:
+            names = dict((kind, {}) for kind in kinds)
+
+        def _row(item):
+            ids, inherited = item
+            return tuple(
+                names[kind].get(i, i) or ''
+                for kind, i in zip(kinds, ids)
+            ) + (inherited,)
+
+        columns = ('Role', 'User', 'Group', 'Project', 'Domain', 'Inherited')
+        return (columns, (_row(item) for item in data))
@@ -23,8 +23,32 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import parseractions
 from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+def _find_members(identity_client, members):
+    """Resolve a comma separated list of member domains to their IDs
+
+    All members are resolved together, with a single domain listing when
+    there are many of them, and every unknown member is reported at once.
+
+    :param identity_client: an Identity v3 client
+    :param members: comma separated domain names or IDs
+    :rtype: a list of domain IDs in the order given
+    """
+
+    names = []
+    for name in (m.strip() for m in members.split(',')):
+        if name and name not in names:
+            names.append(name)
+    found, unknown = common.find_resources(identity_client.domains, names)
+    if unknown:
+        msg = "Unknown sid member domain(s): %s" % ', '.join(unknown)
+        raise exceptions.CommandError(msg)
+    return [found[name].id for name in names]
 
 
 class CreateSid(show.ShowOne):
@@ -42,7 +66,7 @@ class CreateSid(show.ShowOne):
         parser.add_argument(
             '--members',
             metavar='<sid-members>',
-            help='Sid member domains(name or ID)',
+            help='Comma separated sid member domains (name or ID)',
         )
         parser.add_argument(
             '--description',
@@ -73,24 +97,11 @@ class CreateSid(show.ShowOne):
         self.log.debug('take_action(%s)' % parsed_args)
         identity_client = self.app.client_manager.identity
 
-	#print("openstack client: parsed_args.members=", parsed_args.members)
         if parsed_args.members:
-	    members_list=[]
-	    members_list=parsed_args.members.split(',')
-	    #print("openstack client: members_list=", members_list)
-	    members_id_list=[]
-	    for element in members_list:
-                member_id = utils.find_resource(
-                    identity_client.domains,
-                    element,
-                ).id
-		members_id_list.append(member_id)
-	    members = members_id_list
+            members = _find_members(identity_client, parsed_args.members)
         else:
             members = None
 
-	#print("openstack client: members_id_list=", members_id_list)
-
         enabled = True
         if parsed_args.disable:
             enabled = False
@@ -200,7 +211,7 @@ class SetSid(command.Command):
         parser.add_argument(
             '--members',
             metavar='<sid-members>',
-            help='New members owning the sid (name or ID)',
+            help='Comma separated member domains of the sid (name or ID)',
         )
         parser.add_argument(
             '--description',
@@ -248,10 +259,10 @@ class SetSid(command.Command):
         if parsed_args.name:
             kwargs['name'] = parsed_args.name
         if parsed_args.members:
-            kwargs['members'] = utils.find_resource(
-                identity_client.memberss,
+            kwargs['members'] = _find_members(
+                identity_client,
                 parsed_args.members,
-            ).id
+            )
         if parsed_args.description:
             kwargs['description'] = parsed_args.description
         if parsed_args.enable:
@@ -263,15 +274,116 @@ class SetSid(command.Command):
         if 'id' in kwargs:
             del kwargs['id']
         if 'members_id' in kwargs:
-            # Hack around borken Identity API arg names
-            kwargs.update(
-                {'members': kwargs.pop('members_id')}
-            )
+            # Hack around borken Identity API arg names, the old members
+            # must not replace the ones given with --members
+            members = kwargs.pop('members_id')
+            if not parsed_args.members:
+                kwargs['members'] = members
 
         identity_client.sids.update(sid.id, **kwargs)
         return
 
 
+class TreeSid(lister.Lister):
+    """Show sids with their member domains, sips and projects"""
+
+    log = logging.getLogger(__name__ + '.TreeSid')
+
+    def get_parser(self, prog_name):
+        parser = super(TreeSid, self).get_parser(prog_name)
+        parser.add_argument(
+            'sid',
+            metavar='<sid>',
+            nargs='?',
+            help='Only show this sid (name or ID)',
+        )
+        parser.add_argument(
+            '--no-assignments',
+            dest='assignments',
+            action='store_false',
+            default=True,
+            help='Do not count role assignments, skips listing them',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        calls = [
+            identity_client.domains.list,
+            identity_client.projects.list,
+        ]
+        if parsed_args.sid:
+            sid = utils.find_resource(identity_client.sids, parsed_args.sid)
+            calls.append(lambda: [sid])
+        else:
+            calls.append(identity_client.sids.list)
+        if parsed_args.assignments:
+            calls.append(identity_client.role_assignments.list)
+        else:
+            calls.append(list)
+        # The whole hierarchy comes from four listings fetched at once,
+        # everything after that is done from the in-memory graph
+        domains, projects, sids, assignments = utils.run_parallel(calls)
+
+        nodes = {}
+        for resource in domains:
+            nodes[resource.id] = ('domain', resource)
+        for resource in projects:
+            nodes[resource.id] = ('project', resource)
+        sid_ids = set(s.id for s in sids)
+
+        children = {}
+        for resource in projects:
+            parent = getattr(resource, 'parent_id', None)
+            if parent not in nodes or nodes[parent][0] != 'project':
+                parent = getattr(resource, 'domain_id', None)
+            children.setdefault(parent, []).append(resource.id)
+        for s in sids:
+            members = (getattr(s, 'members', None) or
+                       getattr(s, 'members_id', None) or [])
+            children[s.id] = [
+                m for m in members if m in nodes and m != s.id
+            ] + children.get(s.id, [])
+
+        counts = {}
+        for assignment in assignments:
+            project_id, domain_id = common.assignment_ids(assignment)[3:]
+            target = project_id or domain_id
+            counts[target] = counts.get(target, 0) + 1
+
+        def _name(node_id):
+            return getattr(nodes[node_id][1], 'name', node_id)
+
+        def _walk(node_id, parent_id, path, seen):
+            kind = nodes[node_id][0]
+            if parent_id in sid_ids and kind == 'project':
+                # Projects owned directly by a sid are its sips
+                kind = 'sip'
+            yield (kind, node_id, _name(node_id), '/'.join(path),
+                   parent_id, counts.get(node_id, 0))
+            for child_id in sorted(children.get(node_id, []), key=_name):
+                if child_id in seen:
+                    continue
+                for row in _walk(child_id, node_id,
+                                 path + [_name(child_id)],
+                                 seen | set([child_id])):
+                    yield row
+
+        def _rows():
+            for s in sorted(sids, key=lambda s: s.name):
+                yield ('sid', s.id, s.name, s.name, '', counts.get(s.id, 0))
+                for child_id in sorted(children[s.id], key=_name):
+                    for row in _walk(child_id, s.id,
+                                     [s.name, _name(child_id)],
+                                     set([s.id, child_id])):
+                        yield row
+
+        columns = ('Type', 'ID', 'Name', 'Path', 'Parent', 'Assignments')
+        return (columns, _rows())
+
+
 class ShowSid(show.ShowOne):
     """Show sid command"""
 
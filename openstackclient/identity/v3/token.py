@@ -23,6 +23,7 @@ from cliff import lister
 from cliff import show
 
 from openstackclient.common import utils
+from openstackclient.identity import validation
 
 
 class AuthenticateAccessToken(show.ShowOne):
@@ -262,3 +263,17 @@ class ListAccessToken(lister.Lister):
                     s, columns,
                     formatters={},
                 ) for s in data))
+
+
+class ShowToken(validation.ShowToken):
+    """Show the user, scope, roles and lifetime of a token"""
+
+    log = logging.getLogger(__name__ + '.ShowToken')
+    api_version = '3'
+
+
+class ValidateToken(validation.ValidateToken):
+    """Validate tokens and show their user, scope, roles and lifetime"""
+
+    log = logging.getLogger(__name__ + '.ValidateToken')
+    api_version = '3'
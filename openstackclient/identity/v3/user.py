@@ -15,6 +15,7 @@
 
 """Identity v3 User action implementations"""
 
+import functools
 import logging
 import six
 import sys
@@ -23,7 +24,9 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
+from openstackclient.common import exceptions
 from openstackclient.common import utils
+from openstackclient.identity import common
 
 
 class CreateUser(show.ShowOne):
@@ -131,14 +134,55 @@ class DeleteUser(command.Command):
         parser.add_argument(
             'user',
             metavar='<user>',
+            nargs='?',
             help='User to delete (name or ID)',
         )
+        parser.add_argument(
+            '--from-file',
+            metavar='<file>',
+            help='Delete every user named in a YAML, JSON or CSV file',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of users to delete at once with --from-file '
+                 '(default: %d)' % utils.DEFAULT_WORKERS,
+        )
+        parser.add_argument(
+            '--results',
+            metavar='<file>',
+            help='Write the outcome for every user in --from-file to a '
+                 'CSV file',
+        )
+        parser.add_argument(
+            '--domain',
+            metavar='<domain>',
+            help='Domain of the users in --from-file without one '
+                 '(name or ID)',
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)' % parsed_args)
         identity_client = self.app.client_manager.identity
 
+        if bool(parsed_args.user) == bool(parsed_args.from_file):
+            msg = "Specify either a user or --from-file"
+            raise exceptions.CommandError(msg)
+        if parsed_args.from_file:
+            common.delete_users_from_file(
+                identity_client,
+                parsed_args.from_file,
+                parsed_args.concurrency,
+                parsed_args.results,
+                self.log,
+                domains=True,
+                domain=parsed_args.domain,
+            )
+            return
+
         user = utils.find_resource(
             identity_client.users,
             parsed_args.user,
@@ -148,6 +192,190 @@ class DeleteUser(command.Command):
         return
 
 
+class ImportUser(lister.Lister):
+    """Create many users from a file"""
+
+    log = logging.getLogger(__name__ + '.ImportUser')
+
+    def get_parser(self, prog_name):
+        parser = super(ImportUser, self).get_parser(prog_name)
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            required=True,
+            help='YAML, JSON or CSV file listing name and optionally '
+                 'password, email, project, domain, description and '
+                 'enabled for each user',
+        )
+        parser.add_argument(
+            '--project',
+            metavar='<project>',
+            help='Default project for users without one (name or ID)',
+        )
+        parser.add_argument(
+            '--domain',
+            metavar='<domain>',
+            help='Domain for users without one (name or ID)',
+        )
+        parser.add_argument(
+            '--role',
+            metavar='<role>',
+            action='append',
+            default=[],
+            help='Grant role to every new user on its default project, '
+                 'or its domain if it has none (name or ID, repeat option '
+                 'to grant multiple roles)',
+        )
+        parser.add_argument(
+            '--results',
+            metavar='<file>',
+            help='Write the outcome for every user to a CSV file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help='Only show the users that would be created',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of users to create at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        identity_client = self.app.client_manager.identity
+
+        entries = common.load_user_file(
+            parsed_args.file,
+            ('password', 'email', 'project', 'domain', 'description',
+             'enabled'),
+        )
+        for entry in entries:
+            entry.setdefault('project', parsed_args.project)
+            entry.setdefault('domain', parsed_args.domain)
+            if (parsed_args.role and not entry['project'] and
+                    not entry['domain']):
+                msg = ("User %s has no project or domain to grant roles "
+                       "on" % entry['name'])
+                raise exceptions.CommandError(msg)
+
+        # Users without a domain go to the configured default domain, it is
+        # named explicitly so listing and creating agree
+        default_domain = self.app.default_domain
+
+        # Domains, projects and roles are each resolved in a single batch,
+        # not once per user
+        (domains, unknown_domains), (projects, unknown_projects), \
+            (roles, unknown_roles) = utils.run_parallel([
+                functools.partial(
+                    common.find_resources,
+                    identity_client.domains,
+                    [e['domain'] or default_domain for e in entries],
+                ),
+                functools.partial(
+                    common.find_resources,
+                    identity_client.projects,
+                    [e['project'] for e in entries],
+                ),
+                functools.partial(
+                    common.find_resources,
+                    identity_client.roles,
+                    parsed_args.role,
+                ),
+            ])
+        unknown = ["domain '%s'" % d for d in unknown_domains]
+        unknown.extend("project '%s'" % p for p in unknown_projects)
+        unknown.extend("role '%s'" % r for r in unknown_roles)
+        if unknown:
+            msg = "Unknown names in %s: %s" % (
+                parsed_args.file,
+                ', '.join(unknown),
+            )
+            raise exceptions.CommandError(msg)
+
+        # User names are only unique within a domain, so existing users
+        # come from one listing per domain
+        def _domain_id(entry):
+            return domains[entry['domain'] or default_domain].id
+
+        domain_ids = list(set(_domain_id(e) for e in entries))
+        existing = {}
+        for domain_id, users in zip(domain_ids, utils.run_parallel([
+            functools.partial(
+                identity_client.users.list,
+                domain=domain_id,
+            ) for domain_id in domain_ids
+        ])):
+            existing[domain_id] = dict((u.name, u) for u in users)
+
+        def _create(entry):
+            name = entry['name']
+            project = entry['project'] or ''
+            domain_id = _domain_id(entry)
+            user = existing[domain_id].get(name)
+            if user is not None:
+                return (name, user.id, project, '', 'exists')
+            if parsed_args.dry_run:
+                return (name, '', project, '', 'pending')
+            project_id = projects[project].id if project else None
+            try:
+                user = identity_client.users.create(
+                    name=name,
+                    domain=domain_id,
+                    default_project=project_id,
+                    password=entry.get('password'),
+                    email=entry.get('email'),
+                    description=entry.get('description'),
+                    enabled=utils.string_to_bool(
+                        entry.get('enabled', 'true')),
+                )
+            except Exception as e:
+                self.log.error('Unable to create user %s: %s' % (name, e))
+                return (name, '', project, '', 'failed')
+            if project_id:
+                scope = {'project': project_id}
+            else:
+                scope = {'domain': domain_id}
+            granted = []
+            status = 'created'
+            for role in parsed_args.role:
+                try:
+                    identity_client.roles.grant(
+                        roles[role].id,
+                        user=user.id,
+                        **scope
+                    )
+                    granted.append(role)
+                except Exception as e:
+                    self.log.error('Unable to grant role %s to user %s: '
+                                   '%s' % (role, name, e))
+                    status = 'incomplete'
+            return (name, user.id, project, ','.join(granted), status)
+
+        rows = list(utils.map_parallel(
+            _create,
+            entries,
+            max_workers=parsed_args.concurrency,
+        ))
+        columns = ('Name', 'ID', 'Project', 'Roles', 'Status')
+        if parsed_args.results:
+            common.write_results(parsed_args.results, columns, rows)
+        failed = [
+            row[0] for row in rows if row[4] in ('failed', 'incomplete')
+        ]
+        if failed:
+            msg = ("%d of %d users could not be created or given their "
+                   "roles: %s" % (len(failed), len(rows), ', '.join(failed)))
+            raise exceptions.CommandError(msg)
+        return (columns, rows)
+
+
 class ListUser(lister.Lister):
     """List users and optionally roles assigned to users"""
 
@@ -250,7 +478,7 @@ class ListUser(lister.Lister):
                            'Description', 'Email', 'Enabled')
             else:
                 columns = ('ID', 'Name')
-	    kwargs = {}
+            kwargs = {}
             if parsed_args.domain:
                 kwargs['domain'] = utils.find_resource(
                     identity_client.domains,
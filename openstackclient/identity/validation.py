@@ -0,0 +1,352 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Token validation action implementations"""
+
+import calendar
+import datetime
+import hashlib
+import json
+import logging
+import os
+import six
+import tempfile
+import threading
+import time
+
+from cliff import lister
+from cliff import show
+from keystoneclient import access
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
+from openstackclient.common import utils
+from openstackclient.identity import common
+
+
+LOG = logging.getLogger(__name__)
+
+COLUMNS = ('Token', 'Status', 'User', 'Project', 'Domain', 'Roles',
+           'Expires', 'Remaining')
+
+# Characters of a token shown at each end when it is masked
+MASK_KEEP = 4
+
+
+def _digest(token):
+    # Only digests of tokens are kept, never the tokens themselves
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _token_info(auth_ref):
+    expires = auth_ref.expires
+    return {
+        'user_id': auth_ref.user_id,
+        'user_name': auth_ref.username,
+        'project_id': auth_ref.project_id,
+        'project_name': auth_ref.project_name,
+        'domain_id': getattr(auth_ref, 'domain_id', None),
+        'domain_name': getattr(auth_ref, 'domain_name', None),
+        'roles': sorted(auth_ref.role_names or []),
+        'expires': calendar.timegm(expires.utctimetuple()),
+    }
+
+
+class TokenValidator(object):
+    """Validate tokens against Identity with the client's own token
+
+    Each distinct token is checked once, all of them concurrently over the
+    one authenticated client.  Valid tokens are remembered until they
+    expire; if cache_file is given they are also saved there, by digest,
+    for the next invocation.  Invalid tokens are never cached.
+
+    :param identity_client: an authenticated Identity v2.0 or v3 client
+    :param version: the Identity API version of the client, '2.0' or '3'
+    :param cache_file: JSON file to persist valid tokens in, optional
+    """
+
+    def __init__(self, identity_client, version, cache_file=None):
+        self._client = identity_client
+        self.version = version
+        self.cache_file = cache_file
+        self._cache = None
+        self._lock = threading.Lock()
+
+    @property
+    def _scope(self):
+        # Tokens are only valid for the cloud that issued them
+        return getattr(self._client, 'auth_url', None) or ''
+
+    def _fetch(self, token):
+        if self.version == '3':
+            resp, body = self._client.get(
+                '/auth/tokens',
+                headers={'X-Subject-Token': token},
+            )
+        else:
+            resp, body = self._client.get('/tokens/%s' % token)
+        return _token_info(access.AccessInfo.factory(resp, body))
+
+    def validate(self, tokens, max_workers=utils.DEFAULT_WORKERS):
+        """Return a dict mapping each token to its details
+
+        Details are a dict with the user, project, domain, roles and
+        expiry of a valid token, None for an invalid token, or the
+        exception raised while checking it.
+
+        :param tokens: iterable of tokens, empty values are ignored
+        :param max_workers: number of tokens to check at once
+        """
+
+        tokens = set(t for t in tokens if t)
+        self._load()
+        now = time.time()
+        result = {}
+        missing = []
+        with self._lock:
+            for token in tokens:
+                info = self._cache.get(_digest(token))
+                if info and info['expires'] > now:
+                    result[token] = info
+                else:
+                    missing.append(token)
+
+        def _check(token):
+            try:
+                return token, self._fetch(token)
+            except identity_exc.NotFound:
+                return token, None
+            except identity_exc.Unauthorized:
+                # Our own token is no good, no point in going on
+                raise
+            except Exception as e:
+                LOG.debug("Unable to validate token: %s", e)
+                return token, e
+
+        found = False
+        for token, info in utils.map_parallel(
+            _check,
+            missing,
+            max_workers=max_workers,
+            ordered=False,
+        ):
+            result[token] = info
+            if isinstance(info, dict) and info['expires'] > now:
+                found = True
+                with self._lock:
+                    self._cache[_digest(token)] = info
+        if found:
+            self._save()
+        return result
+
+    def _read_file(self):
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as e:
+            LOG.warning("Ignoring corrupt token cache %s: %s",
+                        self.cache_file, e)
+            return {}
+
+    def _load(self):
+        if self._cache is not None:
+            return
+        self._cache = {}
+        if self.cache_file:
+            self._cache.update(self._read_file().get(self._scope, {}))
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        data = self._read_file()
+        now = time.time()
+        with self._lock:
+            data[self._scope] = dict(
+                (digest, info) for digest, info in self._cache.items()
+                if info['expires'] > now
+            )
+        # Write a temporary file and rename it so concurrent invocations
+        # never see a partially written cache
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp_path, self.cache_file)
+        except (IOError, OSError) as e:
+            LOG.warning("Unable to save token cache %s: %s",
+                        self.cache_file, e)
+
+
+def mask_token(token):
+    """Return a token with all but a few characters at each end hidden"""
+    if len(token) < 4 * MASK_KEEP:
+        # Too short to show any of it safely
+        return '*' * MASK_KEEP
+    return token[:MASK_KEEP] + '...' + token[-MASK_KEEP:]
+
+
+def token_row(token, info, now=None, mask=True):
+    """Return a row of COLUMNS for the validation result of a token
+
+    The token itself is masked unless mask is False.
+    """
+    if mask:
+        token = mask_token(token)
+    if info is None:
+        return (token, 'invalid', '', '', '', '', '', 0)
+    if not isinstance(info, dict):
+        return (token, 'error', '', '', '', '', '', 0)
+    now = time.time() if now is None else now
+    return (
+        token,
+        'valid',
+        info['user_name'] or info['user_id'],
+        info['project_name'] or info['project_id'] or '',
+        info['domain_name'] or info['domain_id'] or '',
+        ','.join(info['roles']),
+        datetime.datetime.utcfromtimestamp(
+            info['expires']).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        max(0, int(info['expires'] - now)),
+    )
+
+
+class ValidateToken(lister.Lister):
+    """Validate tokens and show their user, scope, roles and lifetime"""
+
+    log = logging.getLogger(__name__ + '.ValidateToken')
+
+    # Identity API version of the validation request
+    api_version = '2.0'
+
+    def get_parser(self, prog_name):
+        parser = super(ValidateToken, self).get_parser(prog_name)
+        parser.add_argument(
+            'tokens',
+            metavar='<token>',
+            nargs='*',
+            help='Token to validate (repeat to validate multiple tokens)',
+        )
+        parser.add_argument(
+            '--file',
+            metavar='<file>',
+            help='Also validate the tokens in this file, one per line',
+        )
+        parser.add_argument(
+            '--cache',
+            metavar='<cache-file>',
+            default=utils.env('OS_TOKEN_CACHE'),
+            help='File to keep valid tokens in until they expire '
+                 '(Env: OS_TOKEN_CACHE)',
+        )
+        parser.add_argument(
+            '--show-tokens',
+            action='store_true',
+            default=False,
+            help='Show the whole tokens instead of only their first and '
+                 'last characters',
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<count>',
+            type=int,
+            default=utils.DEFAULT_WORKERS,
+            help='Number of tokens to validate at once (default: %d)' %
+                 utils.DEFAULT_WORKERS,
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        tokens = list(parsed_args.tokens)
+        if parsed_args.file:
+            tokens.extend(common.read_lines(parsed_args.file))
+        if not tokens:
+            msg = "Specify tokens to validate or --file"
+            raise exceptions.CommandError(msg)
+
+        validator = TokenValidator(
+            self.app.client_manager.identity,
+            self.api_version,
+            cache_file=parsed_args.cache,
+        )
+        results = validator.validate(tokens, parsed_args.concurrency)
+        now = time.time()
+        seen = set()
+        rows = []
+        for token in tokens:
+            if token not in seen:
+                seen.add(token)
+                rows.append(token_row(
+                    token,
+                    results[token],
+                    now,
+                    mask=not parsed_args.show_tokens,
+                ))
+        return (COLUMNS, rows)
+
+
+class ShowToken(show.ShowOne):
+    """Show the user, scope, roles and lifetime of a token"""
+
+    log = logging.getLogger(__name__ + '.ShowToken')
+
+    # Identity API version of the validation request
+    api_version = '2.0'
+
+    def get_parser(self, prog_name):
+        parser = super(ShowToken, self).get_parser(prog_name)
+        parser.add_argument(
+            'token',
+            metavar='<token>',
+            help='Token to display',
+        )
+        parser.add_argument(
+            '--cache',
+            metavar='<cache-file>',
+            default=utils.env('OS_TOKEN_CACHE'),
+            help='File to keep valid tokens in until they expire '
+                 '(Env: OS_TOKEN_CACHE)',
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+        validator = TokenValidator(
+            self.app.client_manager.identity,
+            self.api_version,
+            cache_file=parsed_args.cache,
+        )
+        info = validator.validate([parsed_args.token])[parsed_args.token]
+        if info is None:
+            raise exceptions.CommandError("Token is not valid")
+        if not isinstance(info, dict):
+            msg = "Unable to validate token: %s" % info
+            raise exceptions.CommandError(msg)
+
+        row = token_row(parsed_args.token, info)
+        data = dict(
+            (column.lower(), value)
+            for column, value in zip(COLUMNS, row)
+            if column not in ('Token', 'Status')
+        )
+        data.update(
+            user_id=info['user_id'],
+            project_id=info['project_id'] or '',
+            domain_id=info['domain_id'] or '',
+        )
+        return zip(*sorted(six.iteritems(data)))
@@ -0,0 +1,226 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Common image code"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from openstackclient.common import exceptions
+
+
+class TransferMeter(object):
+    """Hash, count and optionally throttle image data as it passes by
+
+    :param total: expected number of bytes, if known
+    :param sha256: also compute a SHA-256 digest of the data
+    :param rate_limit: maximum throughput in bytes per second
+    :param callback: called with the meter after every chunk
+    """
+
+    def __init__(self, total=None, sha256=False, rate_limit=None,
+                 callback=None):
+        self.total = total
+        self.rate_limit = rate_limit
+        self.callback = callback
+        self.bytes = 0
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256() if sha256 else None
+        self.started = time.time()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started
+
+    @property
+    def throughput(self):
+        """Average throughput so far in bytes per second"""
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.bytes / elapsed
+
+    def update(self, chunk):
+        self.bytes += len(chunk)
+        self.md5.update(chunk)
+        if self.sha256 is not None:
+            self.sha256.update(chunk)
+        if self.rate_limit:
+            # Sleep off whatever we are ahead of the allowed schedule
+            delay = self.bytes / float(self.rate_limit) - self.elapsed
+            if delay > 0:
+                time.sleep(delay)
+        if self.callback:
+            self.callback(self)
+
+
+class ImageReader(object):
+    """File-like wrapper that feeds everything read through a TransferMeter
+
+    seek() and tell() are only passed through for seekable sources so
+    clients can still discover the size of a real file without reading it,
+    while pipes and network streams look like the unsized streams they are.
+    """
+
+    def __init__(self, fileobj, meter):
+        self._fileobj = fileobj
+        self.meter = meter
+
+    def read(self, size=-1):
+        chunk = self._fileobj.read(size)
+        if chunk:
+            self.meter.update(chunk)
+        return chunk
+
+    def seekable(self):
+        seekable = getattr(self._fileobj, 'seekable', None)
+        if seekable is not None:
+            try:
+                return bool(seekable())
+            except (IOError, OSError, ValueError):
+                return False
+        # py2 files have no seekable(), probe with tell() instead
+        try:
+            self._fileobj.tell()
+        except (AttributeError, IOError, OSError, ValueError):
+            return False
+        return hasattr(self._fileobj, 'seek')
+
+    def __getattr__(self, name):
+        if name in ('seek', 'tell'):
+            if not self.seekable():
+                raise AttributeError(name)
+            return getattr(self._fileobj, name)
+        if name in ('fileno', 'name', 'close'):
+            return getattr(self._fileobj, name)
+        raise AttributeError(name)
+
+
+def get_file_size(fileobj):
+    """Return the size of a regular file object or None"""
+    try:
+        size = os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+    return size or None
+
+
+def format_size(size):
+    """Return a human readable representation of a byte count"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(size) < 1024.0:
+            return "%.1f %s" % (size, unit)
+        size /= 1024.0
+    return "%.1f TiB" % size
+
+
+def progress_printer(stream):
+    """Return a TransferMeter callback that writes a progress line
+
+    :param stream: file-like object to write to, usually stderr
+    """
+
+    def _print(meter):
+        if meter.total:
+            percent = "%3d%% " % (100 * meter.bytes // meter.total)
+        else:
+            percent = ""
+        stream.write("\r%s%s  %s/s" % (
+            percent,
+            format_size(meter.bytes),
+            format_size(meter.throughput),
+        ))
+        if meter.total and meter.bytes >= meter.total:
+            stream.write("\n")
+        stream.flush()
+
+    return _print
+
+
+def _umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def save_image(data, path, meter, buffer_size=None, image=None):
+    """Stream image data chunks to a file or stdout
+
+    Each chunk is written out as soon as it arrives so the image is never
+    held in memory, even when writing to a pipe.  A file is written under
+    a temporary name and only renamed to path once the checksum of image
+    matched, so a damaged download never takes the place of a good file.
+
+    :param data: iterable of image data chunks
+    :param path: file to write to, stdout if None or '-'
+    :param meter: TransferMeter to pass every chunk through
+    :param buffer_size: write buffer size in bytes for the target file
+    :param image: image resource to verify the data against, optional
+    :raises: CommandError on checksum mismatch
+    """
+
+    if path in (None, '-'):
+        # sys.stdout.buffer is only present on py3
+        image_file = getattr(sys.stdout, 'buffer', sys.stdout)
+        for chunk in data:
+            image_file.write(chunk)
+            meter.update(chunk)
+            image_file.flush()
+        if image is not None:
+            verify_checksum(image, meter)
+        return
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix='.%s.' % os.path.basename(path),
+    )
+    try:
+        if buffer_size:
+            image_file = os.fdopen(fd, 'wb', buffer_size)
+        else:
+            image_file = os.fdopen(fd, 'wb')
+        with image_file:
+            for chunk in data:
+                image_file.write(chunk)
+                meter.update(chunk)
+        if image is not None:
+            verify_checksum(image, meter)
+        # mkstemp() creates the file readable by its owner only, give it
+        # the permissions open() would have
+        os.chmod(tmp_path, 0o666 & ~_umask())
+        os.rename(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def verify_checksum(image, meter):
+    """Compare the image checksum reported by the server with our own
+
+    :param image: image resource with a 'checksum' attribute
+    :param meter: the TransferMeter that saw the image data
+    :raises: CommandError on mismatch
+    """
+
+    checksum = getattr(image, 'checksum', None)
+    if checksum and checksum != meter.md5.hexdigest():
+        msg = ("Checksum mismatch for image %s: server reported %s, "
+               "local data has %s" %
+               (image.id, checksum, meter.md5.hexdigest()))
+        raise exceptions.CommandError(msg)
@@ -15,11 +15,18 @@
 
 """Image V1 Action Implementations"""
 
+import itertools
 import logging
 import os
+import requests
 import six
 import sys
 
+try:
+    from urllib.parse import urlparse  # noqa
+except ImportError:
+    from urlparse import urlparse  # noqa
+
 if os.name == "nt":
     import msvcrt
 else:
@@ -29,10 +36,11 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
-from glanceclient.common import utils as gc_utils
+from glanceclient import exc as gc_exceptions
 from openstackclient.common import exceptions
 from openstackclient.common import parseractions
 from openstackclient.common import utils
+from openstackclient.image import common
 
 
 class CreateImage(show.ShowOne):
@@ -105,6 +113,24 @@ class CreateImage(show.ShowOne):
             metavar="<checksum>",
             help="Hash of image data used for verification",
         )
+        parser.add_argument(
+            "--sha256",
+            action="store_true",
+            default=False,
+            help="Also compute the SHA-256 hash of uploaded image data",
+        )
+        parser.add_argument(
+            "--limit-rate",
+            metavar="<kbytes>",
+            type=int,
+            help="Limit upload throughput to <kbytes> KiB per second",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            default=False,
+            help="Show upload progress and throughput",
+        )
         parser.add_argument(
             "--copy-from",
             metavar="<image-url>",
@@ -173,6 +199,9 @@ class CreateImage(show.ShowOne):
         args.pop("formatter")
         args.pop("prefix")
         args.pop("variables")
+        show_progress = args.pop("progress")
+        rate_limit = args.pop("limit_rate", None)
+        compute_sha256 = args.pop("sha256")
 
         if "location" not in args and "copy_from" not in args:
             if "volume" in args:
@@ -184,7 +213,22 @@ class CreateImage(show.ShowOne):
                 if sys.stdin.isatty() is not True:
                     if msvcrt:
                         msvcrt.setmode(sys.stdin.fileno(), os.O_BINARY)
-                    args["data"] = sys.stdin
+                    args["data"] = getattr(sys.stdin, 'buffer', sys.stdin)
+
+        meter = None
+        if args.get("data") is not None:
+            # Hash and meter the image data while glanceclient streams it
+            meter = common.TransferMeter(
+                total=common.get_file_size(args["data"]),
+                sha256=compute_sha256,
+                rate_limit=rate_limit and rate_limit * 1024,
+                callback=(common.progress_printer(self.app.stderr)
+                          if show_progress else None),
+            )
+            args["data"] = common.ImageReader(args["data"], meter)
+            if meter.total and args.get("size") is None:
+                # Spare glanceclient from probing the wrapped file
+                args["size"] = meter.total
 
         if "volume" in args:
             volume_client = self.app.client_manager.volume
@@ -215,6 +259,10 @@ class CreateImage(show.ShowOne):
 
             info = {}
             info.update(image._info)
+            if meter is not None:
+                common.verify_checksum(image, meter)
+                if meter.sha256 is not None:
+                    info['sha256'] = meter.sha256.hexdigest()
         return zip(*sorted(six.iteritems(info)))
 
 
@@ -243,6 +291,208 @@ class DeleteImage(command.Command):
         image_client.images.delete(image.id)
 
 
+class ImportImage(show.ShowOne):
+    """Import an image from a URL"""
+
+    log = logging.getLogger(__name__ + ".ImportImage")
+
+    def get_parser(self, prog_name):
+        parser = super(ImportImage, self).get_parser(prog_name)
+        parser.add_argument(
+            "name",
+            metavar="<name>",
+            help="Name of image",
+        )
+        parser.add_argument(
+            "--url",
+            metavar="<image-url>",
+            required=True,
+            help="HTTP(S) URL to import the image data from",
+        )
+        parser.add_argument(
+            "--disk-format",
+            default="raw",
+            metavar="<disk-format>",
+            help="Disk format of image",
+        )
+        parser.add_argument(
+            "--container-format",
+            default="bare",
+            metavar="<container-format>",
+            help="Container format of image",
+        )
+        parser.add_argument(
+            "--min-disk",
+            metavar="<disk-gb>",
+            help="Minimum size of disk needed to boot image in gigabytes",
+        )
+        parser.add_argument(
+            "--min-ram",
+            metavar="<disk-ram>",
+            help="Minimum amount of ram needed to boot image in megabytes",
+        )
+        parser.add_argument(
+            "--property",
+            dest="properties",
+            metavar="<key=value>",
+            action=parseractions.KeyValueAction,
+            help="Set property on this image "
+                 '(repeat option to set multiple properties)',
+        )
+        public_group = parser.add_mutually_exclusive_group()
+        public_group.add_argument(
+            "--public",
+            dest="is_public",
+            action="store_true",
+            default=True,
+            help="Image is accessible to the public (default)",
+        )
+        public_group.add_argument(
+            "--private",
+            dest="is_public",
+            action="store_false",
+            help="Image is inaccessible to the public",
+        )
+        relay_group = parser.add_mutually_exclusive_group()
+        relay_group.add_argument(
+            "--relay",
+            dest="relay",
+            action="store_true",
+            default=None,
+            help="Always stream the image data through this client",
+        )
+        relay_group.add_argument(
+            "--no-relay",
+            dest="relay",
+            action="store_false",
+            help="Fail instead of streaming the image data through this "
+                 "client when the image service cannot copy it",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            default=False,
+            help="Show relay progress and throughput",
+        )
+        return parser
+
+    def _check_url(self, url):
+        """Make sure the URL looks importable and return its size if known"""
+
+        if urlparse(url).scheme not in ("http", "https"):
+            msg = "Image URL must be http or https: %s" % url
+            raise exceptions.CommandError(msg)
+        try:
+            response = requests.head(
+                url,
+                allow_redirects=True,
+                verify=getattr(self.app.client_manager, "_verify", True),
+            )
+        except requests.RequestException as e:
+            msg = "Unable to reach image URL %s: %s" % (url, e)
+            raise exceptions.CommandError(msg)
+        if response.status_code == 405:
+            # Some servers refuse HEAD, the import proper will tell
+            return None
+        if response.status_code >= 400:
+            msg = "Image URL %s returned HTTP %s" % (
+                url,
+                response.status_code,
+            )
+            raise exceptions.CommandError(msg)
+        size = response.headers.get("content-length")
+        return int(size) if size else None
+
+    def _relay(self, image_client, url, size, args, show_progress=False):
+        """Stream the image from the URL to the image service in one pass"""
+
+        response = requests.get(
+            url,
+            stream=True,
+            verify=getattr(self.app.client_manager, "_verify", True),
+        )
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            meter = common.TransferMeter(
+                total=size,
+                callback=(common.progress_printer(self.app.stderr)
+                          if show_progress else None),
+            )
+            image = image_client.images.create(
+                data=common.ImageReader(response.raw, meter),
+                **args
+            )
+        finally:
+            response.close()
+        common.verify_checksum(image, meter)
+        return image
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)" % parsed_args)
+
+        image_client = self.app.client_manager.image
+
+        args = {}
+        for attr in ("name", "disk_format", "container_format", "min_disk",
+                     "min_ram", "properties", "is_public"):
+            value = getattr(parsed_args, attr)
+            if value is not None:
+                args[attr] = value
+
+        size = self._check_url(parsed_args.url)
+        if size:
+            args["size"] = size
+
+        image = None
+        if parsed_args.relay is not True:
+            # Let the image service fetch the data itself
+            try:
+                image = image_client.images.create(
+                    copy_from=parsed_args.url,
+                    **args
+                )
+            except (gc_exceptions.HTTPBadRequest,
+                    gc_exceptions.HTTPForbidden) as e:
+                if parsed_args.relay is False:
+                    raise
+                self.log.info("Server side copy refused (%s), relaying "
+                              "image data" % e)
+            else:
+                if not utils.wait_for_status(
+                    image_client.images.get,
+                    image.id,
+                    success_status=["active"],
+                    error_status=["killed", "deleted"],
+                    sleep_time=1,
+                    max_sleep_time=30,
+                ):
+                    if parsed_args.relay is False:
+                        msg = "Image service failed to copy %s" % (
+                            parsed_args.url,
+                        )
+                        raise exceptions.CommandError(msg)
+                    self.log.info("Server side copy failed, relaying "
+                                  "image data")
+                    image_client.images.delete(image.id)
+                    image = None
+                else:
+                    image = image_client.images.get(image.id)
+
+        if image is None:
+            image = self._relay(
+                image_client,
+                parsed_args.url,
+                size,
+                args,
+                show_progress=parsed_args.progress,
+            )
+
+        info = {}
+        info.update(image._info)
+        return zip(*sorted(six.iteritems(info)))
+
+
 class ListImage(lister.Lister):
     """List available images"""
 
@@ -253,8 +503,62 @@ class ListImage(lister.Lister):
         parser.add_argument(
             "--page-size",
             metavar="<size>",
+            type=int,
             help="Number of images to request in each paginated request",
         )
+        parser.add_argument(
+            "--limit",
+            metavar="<count>",
+            type=int,
+            help="Stop after listing <count> images",
+        )
+        parser.add_argument(
+            "--name",
+            metavar="<name>",
+            help="Only list images with this name",
+        )
+        parser.add_argument(
+            "--status",
+            metavar="<status>",
+            help="Only list images with this status",
+        )
+        parser.add_argument(
+            "--visibility",
+            metavar="<visibility>",
+            choices=["public", "private"],
+            help="Only list public or private images",
+        )
+        parser.add_argument(
+            "--property",
+            dest="properties",
+            metavar="<key=value>",
+            action=parseractions.KeyValueAction,
+            help="Only list images with this property value "
+                 "(repeat option to filter on multiple properties)",
+        )
+        parser.add_argument(
+            "--size-min",
+            metavar="<bytes>",
+            type=int,
+            help="Only list images of at least <bytes> in size",
+        )
+        parser.add_argument(
+            "--size-max",
+            metavar="<bytes>",
+            type=int,
+            help="Only list images of at most <bytes> in size",
+        )
+        parser.add_argument(
+            "--sort-key",
+            metavar="<key>",
+            help="Image attribute to sort the listing on",
+        )
+        parser.add_argument(
+            "--sort-dir",
+            metavar="<dir>",
+            choices=["asc", "desc"],
+            help="Sort direction, 'asc' or 'desc'",
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -265,8 +569,29 @@ class ListImage(lister.Lister):
         kwargs = {}
         if parsed_args.page_size is not None:
             kwargs["page_size"] = parsed_args.page_size
-
+        if parsed_args.sort_key is not None:
+            kwargs["sort_key"] = parsed_args.sort_key
+        if parsed_args.sort_dir is not None:
+            kwargs["sort_dir"] = parsed_args.sort_dir
+
+        # Push filtering to the server instead of paging through everything
+        filters = {}
+        for attr in ("name", "status", "size_min", "size_max"):
+            value = getattr(parsed_args, attr)
+            if value is not None:
+                filters[attr] = value
+        if parsed_args.visibility is not None:
+            filters["is_public"] = parsed_args.visibility == "public"
+        if parsed_args.properties:
+            filters["properties"] = parsed_args.properties
+        if filters:
+            kwargs["filters"] = filters
+
+        # images.list() is a generator that fetches one page at a time,
+        # leave it unconsumed so rows are emitted as pages arrive
         data = image_client.images.list(**kwargs)
+        if parsed_args.limit is not None:
+            data = itertools.islice(data, parsed_args.limit)
         columns = ["ID", "Name"]
 
         return (columns, (utils.get_item_properties(s, columns) for s in data))
@@ -282,7 +607,20 @@ class SaveImage(command.Command):
         parser.add_argument(
             "--file",
             metavar="<filename>",
-            help="Downloaded image save filename [default: stdout]",
+            help="Downloaded image save filename, '-' for stdout "
+                 "[default: stdout]",
+        )
+        parser.add_argument(
+            "--buffer-size",
+            metavar="<bytes>",
+            type=int,
+            help="Write buffer size for the downloaded image file",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            default=False,
+            help="Show download progress and throughput",
         )
         parser.add_argument(
             "image",
@@ -299,9 +637,20 @@ class SaveImage(command.Command):
             image_client.images,
             parsed_args.image,
         )
-        data = image_client.images.data(image)
+        data = image_client.images.data(image, do_checksum=False)
 
-        gc_utils.save_image(data, parsed_args.file)
+        meter = common.TransferMeter(
+            total=getattr(image, 'size', None),
+            callback=(common.progress_printer(self.app.stderr)
+                      if parsed_args.progress else None),
+        )
+        common.save_image(
+            data,
+            parsed_args.file,
+            meter,
+            buffer_size=parsed_args.buffer_size,
+            image=image,
+        )
 
 
 class SetImage(show.ShowOne):
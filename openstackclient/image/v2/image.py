@@ -15,6 +15,7 @@
 
 """Image V2 Action Implementations"""
 
+import itertools
 import logging
 import six
 
@@ -22,8 +23,9 @@ from cliff import command
 from cliff import lister
 from cliff import show
 
-from glanceclient.common import utils as gc_utils
+from openstackclient.common import parseractions
 from openstackclient.common import utils
+from openstackclient.image import common
 
 
 class DeleteImage(command.Command):
@@ -61,8 +63,62 @@ class ListImage(lister.Lister):
         parser.add_argument(
             "--page-size",
             metavar="<size>",
+            type=int,
             help="Number of images to request in each paginated request",
         )
+        parser.add_argument(
+            "--limit",
+            metavar="<count>",
+            type=int,
+            help="Stop after listing <count> images",
+        )
+        parser.add_argument(
+            "--name",
+            metavar="<name>",
+            help="Only list images with this name",
+        )
+        parser.add_argument(
+            "--status",
+            metavar="<status>",
+            help="Only list images with this status",
+        )
+        parser.add_argument(
+            "--visibility",
+            metavar="<visibility>",
+            choices=["public", "private", "shared"],
+            help="Only list public, private or shared images",
+        )
+        parser.add_argument(
+            "--property",
+            dest="properties",
+            metavar="<key=value>",
+            action=parseractions.KeyValueAction,
+            help="Only list images with this property value "
+                 "(repeat option to filter on multiple properties)",
+        )
+        parser.add_argument(
+            "--size-min",
+            metavar="<bytes>",
+            type=int,
+            help="Only list images of at least <bytes> in size",
+        )
+        parser.add_argument(
+            "--size-max",
+            metavar="<bytes>",
+            type=int,
+            help="Only list images of at most <bytes> in size",
+        )
+        parser.add_argument(
+            "--sort-key",
+            metavar="<key>",
+            help="Image attribute to sort the listing on",
+        )
+        parser.add_argument(
+            "--sort-dir",
+            metavar="<dir>",
+            choices=["asc", "desc"],
+            help="Sort direction, 'asc' or 'desc'",
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -74,7 +130,27 @@ class ListImage(lister.Lister):
         if parsed_args.page_size is not None:
             kwargs["page_size"] = parsed_args.page_size
 
+        # Push filtering to the server instead of paging through everything,
+        # images.list() passes the filters on as query parameters, sorting
+        # included
+        filters = {}
+        for attr in ("name", "status", "size_min", "size_max", "sort_key",
+                     "sort_dir"):
+            value = getattr(parsed_args, attr)
+            if value is not None:
+                filters[attr] = value
+        if parsed_args.visibility is not None:
+            filters["visibility"] = parsed_args.visibility
+        if parsed_args.properties:
+            filters.update(parsed_args.properties)
+        if filters:
+            kwargs["filters"] = filters
+
+        # images.list() is a generator that fetches one page at a time,
+        # leave it unconsumed so rows are emitted as pages arrive
         data = image_client.images.list(**kwargs)
+        if parsed_args.limit is not None:
+            data = itertools.islice(data, parsed_args.limit)
         columns = ["ID", "Name"]
 
         return (columns, (utils.get_item_properties(s, columns) for s in data))
@@ -90,7 +166,20 @@ class SaveImage(command.Command):
         parser.add_argument(
             "--file",
             metavar="<filename>",
-            help="Downloaded image save filename [default: stdout]",
+            help="Downloaded image save filename, '-' for stdout "
+                 "[default: stdout]",
+        )
+        parser.add_argument(
+            "--buffer-size",
+            metavar="<bytes>",
+            type=int,
+            help="Write buffer size for the downloaded image file",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            default=False,
+            help="Show download progress and throughput",
         )
         parser.add_argument(
             "image",
@@ -107,9 +196,20 @@ class SaveImage(command.Command):
             image_client.images,
             parsed_args.image,
         )
-        data = image_client.images.data(image)
+        data = image_client.images.data(image.id, do_checksum=False)
 
-        gc_utils.save_image(data, parsed_args.file)
+        meter = common.TransferMeter(
+            total=getattr(image, 'size', None),
+            callback=(common.progress_printer(self.app.stderr)
+                      if parsed_args.progress else None),
+        )
+        common.save_image(
+            data,
+            parsed_args.file,
+            meter,
+            buffer_size=parsed_args.buffer_size,
+            image=image,
+        )
 
 
 class ShowImage(show.ShowOne):
@@ -125,3 +125,110 @@ class ShowContainer(show.ShowOne):
         )
 
         return zip(*sorted(six.iteritems(data)))
+
+
+class StatContainer(lister.Lister):
+    """Aggregate object counts and bytes by prefix or content type"""
+
+    log = logging.getLogger(__name__ + '.StatContainer')
+
+    def get_parser(self, prog_name):
+        parser = super(StatContainer, self).get_parser(prog_name)
+        parser.add_argument(
+            'containers',
+            metavar='<container>',
+            nargs='*',
+            help='Container(s) to aggregate (default: all containers)',
+        )
+        parser.add_argument(
+            "--prefix",
+            metavar="<prefix>",
+            help="Only aggregate objects whose names begin with <prefix>",
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--depth",
+            metavar="<depth>",
+            type=int,
+            default=0,
+            help="Group objects by the first <depth> pseudo-directory "
+                 "levels of their names (default: 0, whole container)",
+        )
+        group.add_argument(
+            '--by-content-type',
+            action='store_true',
+            default=False,
+            help='Group objects by content type',
+        )
+        parser.add_argument(
+            "--delimiter",
+            metavar="<delimiter>",
+            default='/',
+            help="Pseudo-directory delimiter (default: '/')",
+        )
+        parser.add_argument(
+            "--page-size",
+            metavar="<page-size>",
+            type=int,
+            help="Number of objects to fetch per listing request",
+        )
+        parser.add_argument(
+            "--concurrency",
+            metavar="<count>",
+            type=int,
+            default=4,
+            help="Number of containers to aggregate at once (default: 4)",
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)' % parsed_args)
+
+        api = self.app.restapi
+        url = self.app.client_manager.object_store.endpoint
+
+        if parsed_args.by_content_type:
+            group_by = 'content_type'
+            columns = ('Container', 'Content Type', 'Count', 'Bytes')
+        else:
+            group_by = 'prefix'
+            columns = ('Container', 'Prefix', 'Count', 'Bytes')
+
+        containers = parsed_args.containers
+        if not containers:
+            containers = [c['name'] for c in lib_container.list_containers(
+                api,
+                url,
+                full_listing=True,
+            )]
+
+        def _stat(container):
+            return lib_container.stat_container(
+                api,
+                url,
+                container,
+                prefix=parsed_args.prefix,
+                depth=parsed_args.depth,
+                delimiter=parsed_args.delimiter,
+                group_by=group_by,
+                page_size=parsed_args.page_size,
+            )
+
+        def _rows():
+            for container, stats in zip(
+                containers,
+                utils.map_parallel(
+                    _stat,
+                    containers,
+                    max_workers=parsed_args.concurrency,
+                ),
+            ):
+                for key in sorted(stats):
+                    yield (
+                        container,
+                        key,
+                        stats[key]['count'],
+                        stats[key]['bytes'],
+                    )
+
+        return (columns, _rows())
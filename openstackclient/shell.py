@@ -41,6 +41,13 @@ KEYRING_SERVICE = 'openstack'
 
 DEFAULT_DOMAIN = 'default'
 
+# Seconds to wait on exit for a background catalog refresh
+CATALOG_REFRESH_WAIT = 5
+
+# Commands named like this only read, they are safe to run again when a
+# cached token turns out to be revoked
+READ_ONLY_PREFIXES = ('List', 'Show')
+
 
 def env(*vars, **kwargs):
     """Search for the first defined of possibly many env vars
@@ -282,6 +289,18 @@ class OpenStackShell(app.App):
             help='Identity API version, default=' +
                  identity_client.DEFAULT_IDENTITY_API_VERSION +
                  ' (Env: OS_IDENTITY_API_VERSION)')
+        parser.add_argument(
+            '--os-identity-cache',
+            metavar='<cache-file>',
+            default=env('OS_IDENTITY_CACHE'),
+            help='File to keep resolved project, user and domain names in '
+                 'between commands (Env: OS_IDENTITY_CACHE)')
+        parser.add_argument(
+            '--os-catalog-cache',
+            metavar='<cache-file>',
+            default=env('OS_CATALOG_CACHE'),
+            help='File to keep the token and service catalog in between '
+                 'commands to skip authenticating (Env: OS_CATALOG_CACHE)')
 
         return parser
 
@@ -360,6 +379,8 @@ class OpenStackShell(app.App):
             region_name=self.options.os_region_name,
             verify=self.verify,
             api_version=self.api_version,
+            identity_cache=self.options.os_identity_cache,
+            catalog_cache=self.options.os_catalog_cache,
         )
         return
 
@@ -485,6 +506,35 @@ class OpenStackShell(app.App):
         self.log.debug('clean_up %s', cmd.__class__.__name__)
         if err:
             self.log.debug('got an error: %s', err)
+        # Give a background catalog refresh a moment to save its result
+        client_manager = getattr(self, 'client_manager', None)
+        if client_manager:
+            client_manager.wait_for_refresh(CATALOG_REFRESH_WAIT)
+            if err and client_manager.token_rejected(err):
+                # A command that changes things may have done part of its
+                # work before the 401, only run the ones that read again
+                if cmd.__class__.__name__.startswith(READ_ONLY_PREFIXES):
+                    self._token_rejected = True
+                else:
+                    self.log.error('The cached token was rejected, run the '
+                                   'command again to authenticate')
+
+    def run_subcommand(self, argv):
+        self._token_rejected = False
+        try:
+            result = super(OpenStackShell, self).run_subcommand(argv)
+        except Exception:
+            # --debug raises the error again after clean_up()
+            if not self._token_rejected:
+                raise
+        if self._token_rejected:
+            # The token from the catalog cache was revoked, the cache entry
+            # is gone now so the second run authenticates again.  Only
+            # List and Show commands get here, see clean_up()
+            self.log.warning('cached token was rejected, authenticating '
+                             'again')
+            result = super(OpenStackShell, self).run_subcommand(argv)
+        return result
 
     def interact(self):
         # NOTE(dtroyer): Maintain the old behaviour for interactive use as
@@ -0,0 +1,302 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+
+from openstackclient.common import exceptions
+from openstackclient.common import purge
+from openstackclient.tests import fakes
+from openstackclient.tests import utils
+
+
+project_id = 'pppppppp'
+project_name = 'spinal-tap'
+object_url = 'http://swift/v1/AUTH_aaaaaaaa'
+
+
+def _resource(**info):
+    return fakes.FakeResource(None, info)
+
+
+class TestProjectPurge(utils.TestCommand):
+
+    def setUp(self):
+        super(TestProjectPurge, self).setUp()
+
+        self.app.client_manager.identity = mock.Mock()
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.get.return_value = _resource(
+            id=project_id,
+            name=project_name,
+        )
+
+        self.app.client_manager.compute = mock.Mock()
+        self.servers_mock = self.app.client_manager.compute.servers
+        self.servers_mock.list.return_value = [
+            _resource(id='s1', name='web', status='ACTIVE',
+                      tenant_id=project_id),
+        ]
+        # Servers take a while to go away
+        self.servers_mock.get.side_effect = [
+            _resource(id='s1', status='deleting'),
+            exceptions.NotFound(404),
+        ]
+
+        self.app.client_manager.volume = mock.Mock()
+        self.volumes_mock = self.app.client_manager.volume.volumes
+        self.volumes_mock.list.return_value = [
+            _resource(**{
+                'id': 'v1',
+                'display_name': 'data',
+                'os-vol-tenant-attr:tenant_id': project_id,
+            }),
+        ]
+        self.volumes_mock.get.side_effect = exceptions.NotFound(404)
+        self.snapshots_mock = self.app.client_manager.volume.volume_snapshots
+        self.snapshots_mock.list.return_value = [
+            _resource(**{
+                'id': 'sn1',
+                'display_name': 'nightly',
+                'os-extended-snapshot-attributes:project_id': project_id,
+            }),
+        ]
+        self.snapshots_mock.get.side_effect = exceptions.NotFound(404)
+
+        self.app.client_manager._api_version = {'image': '2'}
+        self.app.client_manager.image = mock.Mock()
+        self.images_mock = self.app.client_manager.image.images
+        self.images_mock.list.return_value = [
+            _resource(id='i1', name='base', owner=project_id),
+            _resource(id='i2', name='public', owner='someone-else'),
+        ]
+
+        self.app.client_manager.object_store = mock.Mock(
+            endpoint=object_url)
+        self.app.restapi = mock.Mock()
+        self.app.restapi.list.side_effect = self._swift_list
+
+        # Record the order of deletions across services
+        self.calls = mock.Mock()
+        self.calls.attach_mock(self.servers_mock.delete, 'server')
+        self.calls.attach_mock(self.snapshots_mock.delete, 'snapshot')
+        self.calls.attach_mock(self.volumes_mock.delete, 'volume')
+
+        sleep = mock.patch('time.sleep')
+        sleep.start()
+        self.addCleanup(sleep.stop)
+
+        # Get the command object to test
+        self.cmd = purge.PurgeProject(self.app, None)
+
+    def _swift_list(self, url, params=None):
+        account = 'http://swift/v1/AUTH_' + project_id
+        if url == account and not params.get('marker'):
+            return [{'name': 'backups'}]
+        if url == account + '/backups' and not params.get('marker'):
+            return [{'name': 'a.tar'}, {'name': 'b.tar'}]
+        return []
+
+    def test_project_purge(self):
+        arglist = [project_name]
+        verifylist = [
+            ('project', project_name),
+            ('dry_run', False),
+            ('keep_project', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('Type', 'ID', 'Name', 'Status'), columns)
+        self.assertEqual([
+            ('image', 'i1', 'base', 'deleted'),
+            ('container', 'backups', 'backups', 'deleted'),
+            ('server', 's1', 'web', 'deleted'),
+            ('snapshot', 'sn1', 'nightly', 'deleted'),
+            ('volume', 'v1', 'data', 'deleted'),
+            ('project', project_id, project_name, 'deleted'),
+        ], data)
+
+        self.servers_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': True, 'tenant_id': project_id})
+        self.volumes_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': True, 'project_id': project_id})
+        # Servers are gone before snapshots and snapshots before volumes
+        self.assertEqual([
+            mock.call.server('s1'),
+            mock.call.snapshot('sn1'),
+            mock.call.volume('v1'),
+        ], self.calls.mock_calls)
+        self.images_mock.delete.assert_called_once_with('i1')
+        account = 'http://swift/v1/AUTH_' + project_id
+        self.assertEqual(sorted([
+            mock.call(account + '/backups/a.tar'),
+            mock.call(account + '/backups/b.tar'),
+        ]), sorted(self.app.restapi.delete.call_args_list[:2]))
+        self.assertEqual(
+            mock.call(account + '/backups'),
+            self.app.restapi.delete.call_args_list[2],
+        )
+        self.projects_mock.delete.assert_called_once_with(project_id)
+        self.images_mock.list.assert_called_once_with(
+            filters={'owner': project_id})
+
+    def test_project_purge_image_v1_private(self):
+        self.app.client_manager._api_version = {'image': '1'}
+        private = _resource(id='i3', name='secret', owner=project_id,
+                            is_public=False)
+
+        def _list(owner=None, **kwargs):
+            # Image API v1 only lists private images without is_public
+            images = self.images_mock.list.return_value
+            if 'is_public' in kwargs and kwargs['is_public'] is None:
+                images = images + [private]
+            return [i for i in images if owner in (None, i.owner)]
+
+        self.images_mock.list.side_effect = _list
+        arglist = [project_name, '--skip', 'compute', '--skip', 'volume',
+                   '--skip', 'object-store']
+        verifylist = [('skip', ['compute', 'volume', 'object-store'])]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('image', 'i1', 'base', 'deleted'),
+            ('image', 'i3', 'secret', 'deleted'),
+            ('project', project_id, project_name, 'deleted'),
+        ], data)
+        self.images_mock.list.assert_called_once_with(
+            owner=project_id,
+            is_public=None,
+        )
+        self.assertEqual(
+            [mock.call('i1'), mock.call('i3')],
+            sorted(self.images_mock.delete.call_args_list),
+        )
+
+    def test_project_purge_dry_run(self):
+        arglist = [project_name, '--dry-run', '--skip', 'object-store']
+        verifylist = [('dry_run', True), ('skip', ['object-store'])]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('server', 's1', 'web', 'pending'),
+            ('image', 'i1', 'base', 'pending'),
+            ('snapshot', 'sn1', 'nightly', 'pending'),
+            ('volume', 'v1', 'data', 'pending'),
+            ('project', project_id, project_name, 'pending'),
+        ], data)
+        self.assertFalse(self.app.restapi.list.called)
+        self.assertEqual([], self.calls.mock_calls)
+        self.assertFalse(self.images_mock.delete.called)
+        self.assertFalse(self.projects_mock.delete.called)
+
+    def test_project_purge_keeps_project_on_failure(self):
+        self.volumes_mock.get.side_effect = None
+        self.volumes_mock.get.return_value = _resource(
+            id='v1',
+            status='error_deleting',
+        )
+        arglist = [project_name, '--skip', 'object-store']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertIn(('volume', 'v1', 'data', 'failed'), data)
+        self.assertEqual(
+            ('project', project_id, project_name, 'kept'),
+            data[-1],
+        )
+        self.assertFalse(self.projects_mock.delete.called)
+
+    def test_project_purge_skips_other_projects(self):
+        # A volume service that ignores the project filter
+        self.volumes_mock.list.return_value.append(_resource(**{
+            'id': 'v2',
+            'display_name': 'theirs',
+            'os-vol-tenant-attr:tenant_id': 'someone-else',
+        }))
+        arglist = [project_name, '--dry-run', '--skip', 'object-store']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertNotIn('v2', [row[1] for row in data])
+
+    def test_project_purge_unknown_owner(self):
+        self.servers_mock.list.return_value = [
+            _resource(id='s1', name='web', status='ACTIVE'),
+        ]
+        arglist = [project_name, '--skip', 'object-store']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertEqual([], self.calls.mock_calls)
+        self.assertFalse(self.images_mock.delete.called)
+        self.assertFalse(self.projects_mock.delete.called)
+
+    def test_project_purge_soft_deleted(self):
+        self.servers_mock.list.return_value.append(
+            _resource(id='s2', name='old', status='SOFT_DELETED',
+                      tenant_id=project_id))
+        # s1 is only soft deleted, both go away once force deleted
+        states = {
+            's1': [_resource(id='s1', status='SOFT_DELETED'),
+                   exceptions.NotFound(404)],
+            's2': [exceptions.NotFound(404)],
+        }
+
+        def _get(server_id):
+            state = states[server_id].pop(0)
+            if isinstance(state, Exception):
+                raise state
+            return state
+
+        self.servers_mock.get.side_effect = _get
+        arglist = [project_name, '--skip', 'object-store', '--skip',
+                   'volume', '--skip', 'image']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.servers_mock.delete.assert_called_once_with('s1')
+        self.assertEqual(
+            sorted([mock.call('s1'), mock.call('s2')]),
+            sorted(self.servers_mock.force_delete.call_args_list),
+        )
+        self.assertEqual([
+            ('server', 's1', 'web', 'deleted'),
+            ('server', 's2', 'old', 'deleted'),
+            ('project', project_id, project_name, 'deleted'),
+        ], data)
+
+    def test_account_url(self):
+        self.assertEqual(
+            'http://swift/v1/AUTH_' + project_id,
+            purge._account_url(object_url + '/', project_id),
+        )
+        self.assertIsNone(
+            purge._account_url('http://swift/v1/account', project_id))
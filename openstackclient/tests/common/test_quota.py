@@ -0,0 +1,376 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+import mock
+import os
+
+from cinderclient import exceptions as volume_exc
+import fixtures
+from keystoneclient import exceptions as identity_exc
+from novaclient import exceptions as compute_exc
+
+from openstackclient.common import exceptions
+from openstackclient.common import quota
+from openstackclient.tests import fakes
+from openstackclient.tests import utils
+
+
+project_id = 'pppppppp'
+
+COMPUTE_QUOTA = {
+    'id': project_id,
+    'cores': 20,
+    'fixed_ips': -1,
+    'floating_ips': 10,
+    'injected_file_content_bytes': 10240,
+    'injected_file_path_bytes': 255,
+    'injected_files': 5,
+    'instances': 10,
+    'key_pairs': 100,
+    'metadata_items': 128,
+    'ram': 51200,
+    'security_group_rules': 20,
+    'security_groups': 10,
+}
+
+VOLUME_QUOTA = {
+    'id': project_id,
+    'gigabytes': 1000,
+    'snapshots': 10,
+    'volumes': 10,
+}
+
+
+class TestQuota(utils.TestCommand):
+
+    def setUp(self):
+        super(TestQuota, self).setUp()
+
+        self.app.client_manager.compute = mock.Mock()
+        self.compute_quotas_mock = self.app.client_manager.compute.quotas
+        self.compute_quotas_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(COMPUTE_QUOTA),
+            loaded=True,
+        )
+
+        self.app.client_manager.volume = mock.Mock()
+        self.volume_quotas_mock = self.app.client_manager.volume.quotas
+        self.volume_quotas_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(VOLUME_QUOTA),
+            loaded=True,
+        )
+
+
+class TestQuotaShow(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaShow, self).setUp()
+
+        # Get the command object to test
+        self.cmd = quota.ShowQuota(self.app, None)
+
+    def test_quota_show(self):
+        arglist = [
+            project_id,
+        ]
+        verifylist = [
+            ('project', project_id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.compute_quotas_mock.get.assert_called_with(project_id)
+        self.volume_quotas_mock.get.assert_called_with(project_id)
+
+        info = dict(zip(columns, data))
+        self.assertEqual(project_id, info['project'])
+        self.assertEqual(20, info['cores'])
+        self.assertEqual(-1, info['fixed-ips'])
+        self.assertEqual(1000, info['gigabytes'])
+        self.assertEqual(10, info['secgroups'])
+        self.assertNotIn('id', info)
+
+
+class TestQuotaSet(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaSet, self).setUp()
+
+        # Get the command object to test
+        self.cmd = quota.SetQuota(self.app, None)
+
+    def test_quota_set(self):
+        arglist = [
+            '--cores', '30',
+            '--volumes', '20',
+            project_id,
+        ]
+        verifylist = [
+            ('cores', 30),
+            ('volumes', 20),
+            ('project', project_id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            project_id,
+            self.compute_quotas_mock.update.call_args[0][0],
+        )
+        self.assertEqual(
+            30,
+            self.compute_quotas_mock.update.call_args[1]['cores'],
+        )
+        self.assertEqual(
+            20,
+            self.volume_quotas_mock.update.call_args[1]['volumes'],
+        )
+
+
+class TestQuotaList(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaList, self).setUp()
+
+        self.app.client_manager.identity = mock.Mock()
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.list.return_value = [
+            fakes.FakeResource(
+                None,
+                {'id': project_id, 'name': 'spinal-tap'},
+                loaded=True,
+            ),
+        ]
+
+        # Get the command object to test
+        self.cmd = quota.ListQuota(self.app, None)
+
+    def test_quota_list(self):
+        parsed_args = self.check_parser(self.cmd, [], [('usage', False)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        collist = ('Project ID', 'Project Name', 'instances', 'cores', 'ram',
+                   'volumes', 'gigabytes', 'snapshots')
+        self.assertEqual(collist, columns)
+        datalist = (
+            (project_id, 'spinal-tap', 10, 20, 51200, 10, 1000, 10),
+        )
+        self.assertEqual(datalist, tuple(data))
+
+    def test_quota_list_usage(self):
+        volume_usage = {
+            'id': project_id,
+            'gigabytes': {'limit': 1000, 'in_use': 250, 'reserved': 0},
+            'snapshots': {'limit': 10, 'in_use': 0, 'reserved': 0},
+            'volumes': {'limit': -1, 'in_use': 3, 'reserved': 0},
+        }
+        self.volume_quotas_mock.get.return_value = fakes.FakeResource(
+            None,
+            volume_usage,
+            loaded=True,
+        )
+        limits_mock = self.app.client_manager.compute.limits
+        limits_mock.get.return_value.absolute = [
+            fakes.FakeResource(None, {'name': name, 'value': value})
+            for name, value in (
+                ('totalInstancesUsed', 5),
+                ('totalCoresUsed', 10),
+                ('totalRAMUsed', 2048),
+            )
+        ]
+
+        arglist = ['--usage', '--concurrency', '2']
+        verifylist = [('usage', True), ('concurrency', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        datalist = (
+            (project_id, 'spinal-tap', '5/10 (50%)', '10/20 (50%)',
+             '2048/51200 (4%)', '3/unlimited', '250/1000 (25%)', '0/10 (0%)'),
+        )
+        self.assertEqual(datalist, tuple(data))
+        self.volume_quotas_mock.get.assert_called_with(project_id, usage=True)
+        limits_mock.get.assert_called_with(tenant_id=project_id)
+
+    def test_quota_list_skips_failures(self):
+        self.compute_quotas_mock.get.side_effect = (
+            compute_exc.NotFound(404))
+
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual((), tuple(data))
+
+    def test_quota_list_skips_volume_failures(self):
+        self.volume_quotas_mock.get.side_effect = (
+            volume_exc.ClientException(500))
+
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual((), tuple(data))
+
+    def test_quota_list_raises_unexpected_errors(self):
+        self.compute_quotas_mock.get.side_effect = TypeError('Boom!')
+
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertRaises(TypeError, tuple, data)
+
+
+class TestQuotaApply(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaApply, self).setUp()
+
+        self.app.client_manager.identity = mock.Mock()
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.resource_class = fakes.FakeResource
+        self.project = fakes.FakeResource(
+            None,
+            {'id': project_id, 'name': 'spinal-tap'},
+            loaded=True,
+        )
+
+        def _get(value):
+            if value == project_id:
+                return self.project
+            raise identity_exc.NotFound(404)
+
+        def _find(name):
+            if name == 'spinal-tap':
+                return self.project
+            raise identity_exc.NotFound(404)
+
+        self.projects_mock.get.side_effect = _get
+        self.projects_mock.find.side_effect = _find
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+
+        # Get the command object to test
+        self.cmd = quota.ApplyQuota(self.app, None)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_quota_apply_yaml(self):
+        path = self._write(
+            'quotas.yaml',
+            'spinal-tap:\n'
+            '  cores: 20\n'
+            '  instances: 15\n'
+            '  gigabytes: 2000\n',
+        )
+        arglist = ['--file', path, '--rate', '100']
+        verifylist = [('file', path), ('rate', 100.0)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        datalist = (
+            (project_id, 'spinal-tap', 'gigabytes', 1000, 2000, 'updated'),
+            (project_id, 'spinal-tap', 'instances', 10, 15, 'updated'),
+        )
+        self.assertEqual(datalist, tuple(data))
+        # cores is already 20, so only instances is sent to compute
+        self.compute_quotas_mock.update.assert_called_once_with(
+            project_id,
+            instances=15,
+        )
+        self.volume_quotas_mock.update.assert_called_once_with(
+            project_id,
+            gigabytes=2000,
+        )
+
+    def test_quota_apply_csv_dry_run(self):
+        path = self._write(
+            'quotas.csv',
+            'project,cores,fixed-ips,volumes\n'
+            '%s,40,,10\n' % project_id,
+        )
+        arglist = ['--file', path, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        datalist = (
+            (project_id, 'spinal-tap', 'cores', 20, 40, 'pending'),
+        )
+        self.assertEqual(datalist, tuple(data))
+        self.assertFalse(self.compute_quotas_mock.update.called)
+        self.assertFalse(self.volume_quotas_mock.update.called)
+
+    def test_quota_apply_unknown_project(self):
+        path = self._write(
+            'quotas.json',
+            '{"spinal-tap": {"cores": 1}, "bogus": {"cores": 1}}',
+        )
+        parsed_args = self.check_parser(self.cmd, ['--file', path], [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+    def test_quota_apply_unknown_quota(self):
+        path = self._write('quotas.yaml', 'spinal-tap: {widgets: 1}\n')
+        parsed_args = self.check_parser(self.cmd, ['--file', path], [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+    def test_quota_apply_ambiguous_project(self):
+        self.projects_mock.find.side_effect = identity_exc.NoUniqueMatch()
+        path = self._write('quotas.yaml', 'spinal-tap: {cores: 40}\n')
+        parsed_args = self.check_parser(self.cmd, ['--file', path], [])
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertIn("'spinal-tap'", str(e))
+        self.assertFalse(self.compute_quotas_mock.update.called)
+
+    def test_quota_apply_failed(self):
+        self.compute_quotas_mock.update.side_effect = \
+            compute_exc.Forbidden(403)
+        path = self._write('quotas.yaml', 'spinal-tap: {cores: 40}\n')
+        parsed_args = self.check_parser(self.cmd, ['--file', path], [])
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertIn('1 of 1 projects: spinal-tap', str(e))
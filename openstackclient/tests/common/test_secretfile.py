@@ -0,0 +1,117 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+import stat
+
+import fixtures
+
+from openstackclient.common import exceptions
+from openstackclient.common import secretfile
+from openstackclient.tests import utils
+
+
+class TestSecretFile(utils.TestCase):
+
+    def setUp(self):
+        super(TestSecretFile, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'secrets',
+        )
+
+    def test_write_read(self):
+        secretfile.write_secrets(
+            self.path,
+            'passphrase',
+            ('access', 'secret'),
+            [('a1', 's1'), ('a2', 's2')],
+        )
+
+        with open(self.path, 'rb') as f:
+            self.assertNotIn(b's1', f.read())
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(
+            [{'access': 'a1', 'secret': 's1'},
+             {'access': 'a2', 'secret': 's2'}],
+            secretfile.read_secrets(self.path, 'passphrase'),
+        )
+
+    def test_write_read_non_ascii(self):
+        secretfile.write_secrets(
+            self.path,
+            'passphrase',
+            ('user', 'secret'),
+            [(u'j\xf6rg', 's1')],
+        )
+
+        self.assertEqual(
+            [{'user': u'j\xf6rg', 'secret': 's1'}],
+            secretfile.read_secrets(self.path, 'passphrase'),
+        )
+
+    def test_read_wrong_passphrase(self):
+        secretfile.write_secrets(self.path, 'passphrase', ('a',), [('b',)])
+        self.assertRaises(
+            exceptions.CommandError,
+            secretfile.read_secrets,
+            self.path,
+            'guess',
+        )
+
+    def test_decrypt_tampered(self):
+        data = bytearray(secretfile.encrypt('passphrase', b'secret'))
+        data[-40] ^= 1
+        self.assertRaises(
+            exceptions.CommandError,
+            secretfile.decrypt,
+            'passphrase',
+            bytes(data),
+        )
+
+    def test_constant_time_compare(self):
+        self.assertTrue(secretfile._constant_time_compare(b'abc', b'abc'))
+        self.assertFalse(secretfile._constant_time_compare(b'abc', b'abd'))
+        self.assertFalse(secretfile._constant_time_compare(b'abc', b'ab'))
+
+    def test_check_output(self):
+        secretfile.check_output(self.path)
+        with open(self.path, 'w') as f:
+            f.write('')
+        self.assertRaises(
+            exceptions.CommandError,
+            secretfile.check_output,
+            self.path,
+        )
+        secretfile.check_output(self.path, overwrite=True)
+        self.assertRaises(
+            exceptions.CommandError,
+            secretfile.check_output,
+            os.path.join(self.path + '.d', 'secrets'),
+        )
+
+    def test_get_passphrase_environment(self):
+        self.useFixture(fixtures.EnvironmentVariable(
+            secretfile.PASSPHRASE_ENV, 'from-env'))
+        self.assertEqual('from-env', secretfile.get_passphrase(None))
+
+    def test_get_passphrase_no_terminal(self):
+        self.useFixture(fixtures.EnvironmentVariable(
+            secretfile.PASSPHRASE_ENV))
+        self.assertRaises(
+            exceptions.CommandError,
+            secretfile.get_passphrase,
+            None,
+        )
@@ -58,6 +58,115 @@ class TestUtils(test_utils.TestCase):
                               utils.get_password,
                               mock_stdin)
 
+    def test_wait_for_status_backoff(self):
+        statuses = ['queued', 'saving', 'saving', 'saving', 'active']
+        status_f = mock.Mock(side_effect=[
+            mock.Mock(status=s) for s in statuses
+        ])
+        with mock.patch('time.sleep') as sleep_mock:
+            self.assertTrue(utils.wait_for_status(
+                status_f,
+                'id1',
+                sleep_time=1,
+                max_sleep_time=3,
+            ))
+        self.assertEqual(
+            [mock.call(1), mock.call(2), mock.call(3), mock.call(3)],
+            sleep_mock.call_args_list,
+        )
+
+    def test_wait_for_status_error_status(self):
+        status_f = mock.Mock(return_value=mock.Mock(status='killed'))
+        with mock.patch('time.sleep') as sleep_mock:
+            self.assertFalse(utils.wait_for_status(
+                status_f,
+                'id1',
+                error_status=['killed'],
+            ))
+        self.assertFalse(sleep_mock.called)
+
+    def test_wait_for_delete(self):
+        rounds = {
+            'a': [mock.Mock(status='deleting'), exceptions.NotFound(404)],
+            'b': [mock.Mock(status='deleting'), mock.Mock(status='error')],
+            'c': [exceptions.NotFound(404)],
+        }
+
+        def status_f(res_id):
+            result = rounds[res_id].pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with mock.patch('time.sleep') as sleep_mock:
+            self.assertEqual(
+                {'a': True, 'b': False, 'c': True},
+                utils.wait_for_delete(status_f, ['a', 'b', 'c'],
+                                      sleep_time=1),
+            )
+        # All resources are polled in the same rounds
+        self.assertEqual([mock.call(1)], sleep_mock.call_args_list)
+
+    def test_wait_for_delete_timeout(self):
+        status_f = mock.Mock(return_value=mock.Mock(status='deleting'))
+        with mock.patch('time.sleep'):
+            with mock.patch('time.time', side_effect=[0, 5, 11]):
+                self.assertEqual(
+                    {'a': False},
+                    utils.wait_for_delete(status_f, ['a'], timeout=10),
+                )
+        self.assertEqual(2, status_f.call_count)
+
+    def test_run_parallel(self):
+        calls = [mock.Mock(return_value=i) for i in range(3)]
+        self.assertEqual([0, 1, 2], utils.run_parallel(calls))
+        for call in calls:
+            call.assert_called_once_with()
+
+    def test_run_parallel_raises(self):
+        calls = [
+            mock.Mock(return_value=1),
+            mock.Mock(side_effect=exceptions.NotFound(404)),
+        ]
+        self.assertRaises(exceptions.NotFound, utils.run_parallel, calls)
+        calls[0].assert_called_once_with()
+
+    def test_map_parallel_ordered(self):
+        result = utils.map_parallel(
+            lambda x: x * 2,
+            iter(range(20)),
+            max_workers=3,
+        )
+        self.assertEqual([x * 2 for x in range(20)], list(result))
+
+    def test_map_parallel_unordered(self):
+        result = utils.map_parallel(
+            lambda x: x * 2,
+            range(20),
+            max_workers=3,
+            ordered=False,
+        )
+        self.assertEqual([x * 2 for x in range(20)], sorted(result))
+
+    def test_rate_limiter(self):
+        limiter = utils.RateLimiter(2)
+        with mock.patch('time.time', return_value=100.0):
+            with mock.patch('time.sleep') as sleep_mock:
+                limiter.wait()
+                limiter.wait()
+                limiter.wait()
+        self.assertEqual(
+            [mock.call(0.5), mock.call(1.0)],
+            sleep_mock.call_args_list,
+        )
+
+    def test_rate_limiter_unlimited(self):
+        limiter = utils.RateLimiter()
+        with mock.patch('time.sleep') as sleep_mock:
+            limiter.wait()
+            limiter.wait()
+        self.assertFalse(sleep_mock.called)
+
 
 class NoUniqueMatch(Exception):
     pass
@@ -31,10 +31,23 @@ SERVER = {
 
 class FakeComputev2Client(object):
     def __init__(self, **kwargs):
+        self.aggregates = mock.Mock()
+        self.aggregates.resource_class = fakes.FakeResource(None, {})
+        self.hypervisors = mock.Mock()
+        self.hypervisors.resource_class = fakes.FakeResource(None, {})
         self.images = mock.Mock()
         self.images.resource_class = fakes.FakeResource(None, {})
         self.servers = mock.Mock()
         self.servers.resource_class = fakes.FakeResource(None, {})
+        self.security_groups = mock.Mock()
+        self.security_groups.resource_class = fakes.FakeResource(None, {})
+        self.security_group_rules = mock.Mock()
+        self.security_group_rules.resource_class = fakes.FakeResource(
+            None, {})
+        self.services = mock.Mock()
+        self.services.resource_class = fakes.FakeResource(None, {})
+        self.usage = mock.Mock()
+        self.usage.resource_class = fakes.FakeResource(None, {})
         self.auth_token = kwargs['token']
         self.management_url = kwargs['endpoint']
 
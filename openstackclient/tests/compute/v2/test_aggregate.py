@@ -0,0 +1,202 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+
+import mock
+
+from openstackclient.common import exceptions
+from openstackclient.compute.v2 import aggregate
+from openstackclient.tests.compute.v2 import fakes as compute_fakes
+from openstackclient.tests import fakes
+
+
+aggregate_id = 'aaaaaaaa'
+aggregate_name = 'ssd'
+
+AGGREGATE = {
+    'id': aggregate_id,
+    'name': aggregate_name,
+    'availability_zone': 'az1',
+    'hosts': ['host1'],
+    'metadata': {'availability_zone': 'az1', 'ssd': 'true'},
+}
+
+
+class TestAggregate(compute_fakes.TestComputev2):
+
+    def setUp(self):
+        super(TestAggregate, self).setUp()
+
+        self.aggregates_mock = self.app.client_manager.compute.aggregates
+        self.aggregates_mock.reset_mock()
+        self.aggregates_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(AGGREGATE),
+            loaded=True,
+        )
+
+
+class TestAggregateAddHost(TestAggregate):
+
+    def setUp(self):
+        super(TestAggregateAddHost, self).setUp()
+
+        # Get the command object to test
+        self.cmd = aggregate.AddAggregateHost(self.app, None)
+
+    def test_aggregate_add_hosts(self):
+        arglist = [aggregate_id, 'host1', 'host2', 'host3', 'host2']
+        verifylist = [
+            ('aggregate', aggregate_id),
+            ('host', ['host1', 'host2', 'host3', 'host2']),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # host1 is already a member and host2 is only added once
+        calls = self.aggregates_mock.add_host.call_args_list
+        self.assertEqual(['host2', 'host3'], sorted(c[0][1] for c in calls))
+        # The aggregate is fetched to find it and once more for the result
+        self.assertEqual(2, self.aggregates_mock.get.call_count)
+        self.assertEqual(
+            ('availability_zone', 'hosts', 'id', 'metadata', 'name'),
+            tuple(columns),
+        )
+
+    def test_aggregate_add_hosts_partial_failure(self):
+        def _add_host(agg, host):
+            if host == 'host2':
+                raise Exception('no such host')
+        self.aggregates_mock.add_host.side_effect = _add_host
+        arglist = [aggregate_id, 'host2', 'host3']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+        # The other host is still added
+        self.assertEqual(2, self.aggregates_mock.add_host.call_count)
+        self.assertIn('1 of 2 hosts: host2', str(e))
+
+    def test_aggregate_add_hosts_all_failed(self):
+        self.aggregates_mock.add_host.side_effect = Exception('no such host')
+        arglist = [aggregate_id, 'host2', 'host3']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+
+class TestAggregateRemoveHost(TestAggregate):
+
+    def setUp(self):
+        super(TestAggregateRemoveHost, self).setUp()
+
+        # Get the command object to test
+        self.cmd = aggregate.RemoveAggregateHost(self.app, None)
+
+    def test_aggregate_remove_hosts(self):
+        arglist = [aggregate_id, 'host1', 'host2']
+        verifylist = [('host', ['host1', 'host2'])]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        # host2 is not a member
+        self.aggregates_mock.remove_host.assert_called_once_with(
+            mock.ANY,
+            'host1',
+        )
+
+
+class TestAggregateSet(TestAggregate):
+
+    def setUp(self):
+        super(TestAggregateSet, self).setUp()
+
+        # Get the command object to test
+        self.cmd = aggregate.SetAggregate(self.app, None)
+
+    def test_aggregate_set(self):
+        self.aggregates_mock.update.return_value = fakes.FakeResource(
+            None,
+            dict(AGGREGATE, name='fast', availability_zone='az2',
+                 metadata={'availability_zone': 'az2'}),
+        )
+        self.aggregates_mock.set_metadata.return_value = fakes.FakeResource(
+            None,
+            dict(AGGREGATE, name='fast', availability_zone='az2',
+                 metadata={'availability_zone': 'az2', 'ssd': 'false'}),
+        )
+        arglist = [
+            aggregate_id,
+            '--name', 'fast',
+            '--zone', 'az2',
+            '--property', 'ssd=false',
+        ]
+        verifylist = [
+            ('name', 'fast'),
+            ('zone', 'az2'),
+            ('property', {'ssd': 'false'}),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # The metadata is only changed once the update is done
+        self.assertEqual([
+            mock.call.update(
+                mock.ANY,
+                {'name': 'fast', 'availability_zone': 'az2'},
+            ),
+            mock.call.set_metadata(mock.ANY, {'ssd': 'false'}),
+        ], [c for c in self.aggregates_mock.mock_calls
+            if c[0] in ('update', 'set_metadata')])
+        info = dict(zip(columns, data))
+        self.assertEqual('fast', info['name'])
+        self.assertEqual('az2', info['availability_zone'])
+        self.assertEqual(
+            {'availability_zone': 'az2', 'ssd': 'false'},
+            info['metadata'],
+        )
+
+    def test_aggregate_set_name(self):
+        self.aggregates_mock.update.return_value = fakes.FakeResource(
+            None,
+            dict(AGGREGATE, name='fast'),
+        )
+        arglist = [
+            aggregate_id,
+            '--name', 'fast',
+        ]
+        verifylist = [
+            ('name', 'fast'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertFalse(self.aggregates_mock.set_metadata.called)
+        self.assertEqual('fast', dict(zip(columns, data))['name'])
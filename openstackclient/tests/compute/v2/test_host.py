@@ -0,0 +1,242 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+from novaclient import exceptions as compute_exc
+
+from openstackclient.common import exceptions
+from openstackclient.compute.v2 import host
+from openstackclient.tests.compute.v2 import fakes as compute_fakes
+from openstackclient.tests import fakes
+
+
+host_name = 'compute1'
+
+
+def _server(server_id, status='ACTIVE', host=host_name, task_state=None):
+    return fakes.FakeResource(None, {
+        'id': server_id,
+        'name': 'name-' + server_id,
+        'status': status,
+        'OS-EXT-SRV-ATTR:host': host,
+        'OS-EXT-STS:task_state': task_state,
+    })
+
+
+class TestHostEvacuate(compute_fakes.TestComputev2):
+
+    def setUp(self):
+        super(TestHostEvacuate, self).setUp()
+
+        self.servers_mock = self.app.client_manager.compute.servers
+        self.servers_mock.reset_mock()
+        self.servers = [
+            _server('s1'),
+            _server('s2'),
+            _server('s3', status='SHUTOFF'),
+        ]
+        self.servers_mock.list.side_effect = self._list
+
+        # A clock that only moves when sleeping
+        self.now = 1000.0
+        time_patch = mock.patch.object(host, 'time')
+        time_mock = time_patch.start()
+        self.addCleanup(time_patch.stop)
+        time_mock.time.side_effect = lambda: self.now
+        self.sleep_mock = time_mock.sleep
+        self.sleep_mock.side_effect = self._sleep
+
+        # Get the command object to test
+        self.cmd = host.EvacuateHost(self.app, None)
+
+    def _list(self, search_opts):
+        # One page of servers, then an empty page after it
+        if 'marker' in search_opts:
+            return []
+        return self.servers
+
+    def _sleep(self, seconds):
+        self.now += seconds
+
+    def test_host_evacuate(self):
+        states = {
+            's1': [_server('s1', 'MIGRATING', task_state='migrating'),
+                   _server('s1', host='compute2')],
+            's2': [_server('s2', host='compute3')],
+        }
+        self.servers_mock.get.side_effect = lambda i: states[i].pop(0)
+        arglist = [host_name, '--concurrency', '2']
+        verifylist = [('host', host_name), ('concurrency', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            mock.call(search_opts={
+                'host': host_name,
+                'all_tenants': True,
+                'limit': host.PAGE_SIZE,
+            }),
+            mock.call(search_opts={
+                'host': host_name,
+                'all_tenants': True,
+                'limit': host.PAGE_SIZE,
+                'marker': 's3',
+            }),
+        ], self.servers_mock.list.call_args_list)
+        self.assertEqual(
+            [mock.call('s1', None, False, False),
+             mock.call('s2', None, False, False)],
+            sorted(self.servers_mock.live_migrate.call_args_list),
+        )
+        # Both migrations share the polling loop
+        self.assertEqual(2, self.sleep_mock.call_count)
+        self.assertEqual(
+            ('ID', 'Name', 'Status', 'Attempts', 'Host', 'Duration'),
+            columns,
+        )
+        self.assertEqual([
+            ('s1', 'name-s1', 'migrated', 1, 'compute2'),
+            ('s2', 'name-s2', 'migrated', 1, 'compute3'),
+            ('s3', 'name-s3', 'skipped', 0, host_name),
+        ], [row[:5] for row in data])
+
+    def test_host_evacuate_retry(self):
+        self.servers = [_server('s1')]
+        # The first attempt is rolled back, the second succeeds
+        states = [_server('s1'), _server('s1', host='compute2')]
+        self.servers_mock.get.side_effect = lambda i: states.pop(0)
+        arglist = [host_name, '--target', 'compute2']
+        verifylist = [('target', 'compute2'), ('retries', 1)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.servers_mock.live_migrate.call_count)
+        self.servers_mock.live_migrate.assert_called_with(
+            's1', 'compute2', False, False)
+        self.assertEqual(
+            [('s1', 'name-s1', 'migrated', 2, 'compute2')],
+            [row[:5] for row in data],
+        )
+
+    def test_host_evacuate_failed(self):
+        self.servers = [_server('s1')]
+        self.servers_mock.live_migrate.side_effect = Exception('no host')
+        arglist = [host_name, '--retries', '2']
+        verifylist = [('retries', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(3, self.servers_mock.live_migrate.call_count)
+        # Each retry waits twice as long as the one before
+        self.assertEqual(
+            [mock.call(5), mock.call(10)],
+            self.sleep_mock.call_args_list,
+        )
+        self.assertEqual(
+            [('s1', 'name-s1', 'failed', 3, host_name)],
+            [row[:5] for row in data],
+        )
+
+    def test_host_evacuate_error_not_retried(self):
+        self.servers = [_server('s1')]
+        self.servers_mock.get.return_value = _server('s1', status='ERROR')
+        arglist = [host_name]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(1, self.servers_mock.live_migrate.call_count)
+        self.assertEqual(
+            [('s1', 'name-s1', 'failed', 1, host_name)],
+            [row[:5] for row in data],
+        )
+
+    def test_host_evacuate_dry_run(self):
+        arglist = [host_name, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertFalse(self.servers_mock.live_migrate.called)
+        self.assertEqual(
+            ['pending', 'pending', 'skipped'],
+            [row[2] for row in data],
+        )
+
+    def test_host_evacuate_paged(self):
+        pages = [
+            [_server('s1'), _server('s2')],
+            [_server('s3', status='SHUTOFF')],
+            [],
+        ]
+        self.servers_mock.list.side_effect = (
+            lambda search_opts: pages.pop(0))
+        arglist = [host_name, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            [None, 's2', 's3'],
+            [c[1]['search_opts'].get('marker')
+             for c in self.servers_mock.list.call_args_list],
+        )
+        self.assertEqual(['s1', 's2', 's3'], [row[0] for row in data])
+
+    def test_host_evacuate_marker_ignored(self):
+        # A server that ignores the marker returns the same page again
+        self.servers_mock.list.side_effect = (
+            lambda search_opts: self.servers)
+        arglist = [host_name, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.servers_mock.list.call_count)
+        self.assertEqual(3, len(tuple(data)))
+
+    def test_host_evacuate_server_deleted(self):
+        self.servers = [_server('s1')]
+        self.servers_mock.get.side_effect = compute_exc.NotFound(404)
+        arglist = [host_name]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(1, self.servers_mock.live_migrate.call_count)
+        self.assertEqual(
+            [('s1', 'name-s1', 'deleted', 1, host_name)],
+            [row[:5] for row in data],
+        )
+
+    def test_host_evacuate_bad_concurrency(self):
+        arglist = [host_name, '--concurrency', '0']
+        verifylist = [('concurrency', 0)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.servers_mock.list.called)
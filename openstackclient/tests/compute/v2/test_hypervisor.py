@@ -0,0 +1,121 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+from openstackclient.compute.v2 import hypervisor
+from openstackclient.tests.compute.v2 import fakes as compute_fakes
+from openstackclient.tests import fakes
+
+
+def _hypervisor(host, vcpus_used, memory_mb_used, local_gb_used):
+    return fakes.FakeResource(None, {
+        'id': host,
+        'hypervisor_hostname': host + '.example.com',
+        'service': {'id': 1, 'host': host},
+        'vcpus': 8,
+        'vcpus_used': vcpus_used,
+        'memory_mb': 1000,
+        'memory_mb_used': memory_mb_used,
+        'local_gb': 100,
+        'local_gb_used': local_gb_used,
+    })
+
+
+class TestHypervisorStats(compute_fakes.TestComputev2):
+
+    def setUp(self):
+        super(TestHypervisorStats, self).setUp()
+
+        compute_client = self.app.client_manager.compute
+        compute_client.hypervisors.list.return_value = [
+            _hypervisor('host1', 2, 250, 10),
+            _hypervisor('host2', 4, 500, 20),
+            _hypervisor('host3', 8, 900, 90),
+        ]
+        compute_client.aggregates.list.return_value = [
+            fakes.FakeResource(None, {
+                'name': 'ssd',
+                'hosts': ['host1', 'host3'],
+            }),
+        ]
+        compute_client.services.list.return_value = [
+            fakes.FakeResource(None, {'host': 'host1', 'zone': 'az1'}),
+            fakes.FakeResource(None, {'host': 'host2', 'zone': 'az1'}),
+            fakes.FakeResource(None, {'host': 'host3', 'zone': 'az2'}),
+        ]
+        self.compute_client = compute_client
+
+        # Get the command object to test
+        self.cmd = hypervisor.StatHypervisor(self.app, None)
+
+    def test_hypervisor_stats_zone(self):
+        arglist = []
+        verifylist = [('group_by', 'zone'), ('resource', 'ram')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.compute_client.hypervisors.list.assert_called_once_with()
+        self.compute_client.aggregates.list.assert_called_once_with()
+        self.compute_client.services.list.assert_called_once_with(
+            binary='nova-compute')
+        self.assertEqual('Zone', columns[0])
+        self.assertEqual((
+            ('az1', 2, 16, 10, 2000, 1250, 200, 170, 25.0, 50.0, 50.0),
+            ('az2', 1, 8, 0, 1000, 100, 100, 10, 90.0, 90.0, 90.0),
+            ('(total)', 3, 24, 10, 3000, 1350, 300, 180, 50.0, 90.0, 90.0),
+        ), tuple(data))
+
+    def test_hypervisor_stats_aggregate(self):
+        arglist = ['--group-by', 'aggregate', '--resource', 'disk']
+        verifylist = [('group_by', 'aggregate'), ('resource', 'disk')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual('Aggregate', columns[0])
+        data = tuple(data)
+        self.assertEqual(
+            ['', 'ssd', '(total)'],
+            [row[0] for row in data],
+        )
+        self.assertEqual(
+            ('ssd', 2, 16, 6, 2000, 850, 200, 100, 10.0, 90.0, 90.0),
+            data[1],
+        )
+
+    def test_hypervisor_stats_top(self):
+        arglist = ['--top', '2', '--resource', 'vcpus']
+        verifylist = [('top', 2), ('resource', 'vcpus')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ('Host', 'Zone', 'Aggregates', 'vCPUs Used %', 'RAM Used %',
+             'Disk Used %'),
+            columns,
+        )
+        self.assertEqual((
+            ('host3', 'az2', 'ssd', 100.0, 90.0, 90.0),
+            ('host2', 'az1', '', 50.0, 50.0, 20.0),
+        ), tuple(data))
+
+    def test_percentile(self):
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(5, hypervisor._percentile(values, 50))
+        self.assertEqual(9, hypervisor._percentile(values, 90))
+        self.assertEqual(10, hypervisor._percentile(values, 100))
+        self.assertEqual(1, hypervisor._percentile(values, 0))
+        self.assertEqual(0, hypervisor._percentile([], 50))
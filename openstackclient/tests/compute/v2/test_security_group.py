@@ -0,0 +1,359 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+import json
+import os
+
+import fixtures
+import mock
+import yaml
+
+from openstackclient.common import exceptions
+from openstackclient.compute.v2 import security_group
+from openstackclient.tests.compute.v2 import fakes as compute_fakes
+from openstackclient.tests import fakes
+
+
+security_group_id = 'gggggggg'
+security_group_name = 'web'
+
+RULE_HTTP = {
+    'id': 'r1',
+    'parent_group_id': security_group_id,
+    'ip_protocol': 'tcp',
+    'from_port': 80,
+    'to_port': 80,
+    'ip_range': {'cidr': '0.0.0.0/0'},
+    'group': {},
+}
+
+RULE_SSH = {
+    'id': 'r2',
+    'parent_group_id': security_group_id,
+    'ip_protocol': 'tcp',
+    'from_port': 22,
+    'to_port': 22,
+    'ip_range': {'cidr': '10.0.0.0/8'},
+    'group': {},
+}
+
+SECURITY_GROUP = {
+    'id': security_group_id,
+    'name': security_group_name,
+    'description': 'web servers',
+    'tenant_id': 'pppppppp',
+    'rules': [RULE_HTTP, RULE_SSH],
+}
+
+
+class TestSecurityGroup(compute_fakes.TestComputev2):
+
+    def setUp(self):
+        super(TestSecurityGroup, self).setUp()
+
+        self.groups_mock = self.app.client_manager.compute.security_groups
+        self.groups_mock.reset_mock()
+        self.groups_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(SECURITY_GROUP),
+            loaded=True,
+        )
+        self.rules_mock = \
+            self.app.client_manager.compute.security_group_rules
+        self.rules_mock.reset_mock()
+
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+
+    def write_file(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+
+class TestSecurityGroupRuleExport(TestSecurityGroup):
+
+    def setUp(self):
+        super(TestSecurityGroupRuleExport, self).setUp()
+
+        # Get the command object to test
+        self.cmd = security_group.ExportSecurityGroupRule(self.app, None)
+
+    def test_export_json(self):
+        arglist = [security_group_id]
+        verifylist = [('group', security_group_id)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        data = json.loads(self.app.stdout.make_string())
+        self.assertEqual(security_group_name, data['group'])
+        self.assertEqual([
+            {'ip_protocol': 'tcp', 'from_port': 22, 'to_port': 22,
+             'cidr': '10.0.0.0/8'},
+            {'ip_protocol': 'tcp', 'from_port': 80, 'to_port': 80,
+             'cidr': '0.0.0.0/0'},
+        ], data['rules'])
+
+    def test_export_yaml_file(self):
+        path = os.path.join(self.tmpdir, 'rules.yaml')
+        arglist = [security_group_id, '--file', path]
+        verifylist = [('group', security_group_id), ('file', path)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        with open(path) as f:
+            data = yaml.safe_load(f)
+        self.assertEqual(2, len(data['rules']))
+
+
+class TestSecurityGroupRuleImport(TestSecurityGroup):
+
+    def setUp(self):
+        super(TestSecurityGroupRuleImport, self).setUp()
+
+        self.path = self.write_file('rules.json', json.dumps({
+            'group': security_group_name,
+            'rules': [
+                {'ip_protocol': 'tcp', 'from_port': 80, 'to_port': 80,
+                 'cidr': '0.0.0.0/0'},
+                {'ip_protocol': 'tcp', 'from_port': 443, 'to_port': 443,
+                 'cidr': '0.0.0.0/0'},
+            ],
+        }))
+
+        # Get the command object to test
+        self.cmd = security_group.ImportSecurityGroupRule(self.app, None)
+
+    def test_import_creates_missing(self):
+        arglist = [security_group_id, '--file', self.path]
+        verifylist = [
+            ('group', security_group_id),
+            ('file', self.path),
+            ('prune', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = tuple(data)
+
+        self.rules_mock.create.assert_called_once_with(
+            security_group_id,
+            'tcp',
+            443,
+            443,
+            '0.0.0.0/0',
+            None,
+        )
+        self.assertFalse(self.rules_mock.delete.called)
+        self.assertEqual(
+            (('create', 'tcp', '0.0.0.0/0', '443:443', '', 'created'),),
+            data,
+        )
+
+    def test_import_prune(self):
+        arglist = [security_group_id, '--file', self.path, '--prune']
+        verifylist = [('prune', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = tuple(data)
+
+        self.rules_mock.delete.assert_called_once_with('r2')
+        self.assertEqual(('delete', 'tcp', '10.0.0.0/8', '22:22', '',
+                          'deleted'), data[1])
+
+    def test_import_dry_run(self):
+        arglist = [security_group_id, '--file', self.path, '--dry-run',
+                   '--prune']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['pending', 'pending'], [r[-1] for r in data])
+        self.assertFalse(self.rules_mock.create.called)
+        self.assertFalse(self.rules_mock.delete.called)
+
+    def test_import_failure_reported(self):
+        self.rules_mock.create.side_effect = Exception('over quota')
+        arglist = [security_group_id, '--file', self.path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['failed'], [r[-1] for r in data])
+
+    def test_import_remote_group(self):
+        path = self.write_file('rules.yaml', (
+            "- ip_protocol: tcp\n"
+            "  from_port: 3306\n"
+            "  to_port: 3306\n"
+            "  remote_group: db\n"
+        ))
+        remote = fakes.FakeResource(None, {'id': 'hhhhhhhh', 'name': 'db'})
+        self.groups_mock.get.side_effect = [
+            fakes.FakeResource(None, copy.deepcopy(SECURITY_GROUP)),
+            remote,
+        ]
+        arglist = [security_group_id, '--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        tuple(data)
+
+        self.rules_mock.create.assert_called_once_with(
+            security_group_id, 'tcp', 3306, 3306, None, 'hhhhhhhh')
+        self.assertEqual(
+            [mock.call(security_group_id), mock.call('db')],
+            self.groups_mock.get.call_args_list,
+        )
+
+    def test_import_missing_cidr(self):
+        # A rule without a source means 0.0.0.0/0 and is already there
+        path = self.write_file('rules.yaml', (
+            "- ip_protocol: tcp\n"
+            "  from_port: 80\n"
+            "  to_port: 80\n"
+        ))
+        arglist = [security_group_id, '--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual((), tuple(data))
+        self.assertFalse(self.rules_mock.create.called)
+
+    def test_import_bad_file(self):
+        path = self.write_file('rules.yaml', "rules: 42\n")
+        arglist = [security_group_id, '--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+
+class TestSecurityGroupList(TestSecurityGroup):
+
+    def setUp(self):
+        super(TestSecurityGroupList, self).setUp()
+
+        self.groups_mock.list.return_value = [
+            fakes.FakeResource(None, copy.deepcopy(SECURITY_GROUP)),
+        ]
+        self.app.client_manager.identity = mock.Mock()
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.get.return_value = fakes.FakeResource(
+            None,
+            {'id': 'pppppppp', 'name': 'spinal-tap'},
+        )
+
+        # Get the command object to test
+        self.cmd = security_group.ListSecurityGroup(self.app, None)
+
+    def test_security_group_list_no_options(self):
+        arglist = []
+        verifylist = [('all_projects', False)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('ID', 'Name', 'Description'), columns)
+        self.assertEqual(
+            ((security_group_id, security_group_name, 'web servers'),),
+            tuple(data),
+        )
+        self.groups_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': False})
+        # Project names are not shown so none are looked up
+        self.assertFalse(self.projects_mock.get.called)
+        self.assertFalse(self.projects_mock.list.called)
+
+    def test_security_group_list_all_projects(self):
+        arglist = ['--all-projects']
+        verifylist = [('all_projects', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ('ID', 'Name', 'Description', 'Project'),
+            columns,
+        )
+        self.assertEqual(
+            ((security_group_id, security_group_name, 'web servers',
+              'spinal-tap'),),
+            tuple(data),
+        )
+        self.projects_mock.get.assert_called_once_with('pppppppp')
+        self.assertFalse(self.projects_mock.list.called)
+
+    def test_security_group_list_name(self):
+        other = dict(SECURITY_GROUP, id='ffffffff', name='default')
+        self.groups_mock.list.return_value.append(
+            fakes.FakeResource(None, other))
+        arglist = ['--name', security_group_name]
+        verifylist = [('name', security_group_name)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([security_group_id], [r[0] for r in data])
+        self.groups_mock.list.assert_called_once_with(
+            search_opts={'all_tenants': False, 'name': security_group_name})
+
+    def test_security_group_list_paged(self):
+        groups = [
+            fakes.FakeResource(None, dict(SECURITY_GROUP, id='g%d' % i))
+            for i in range(3)
+        ]
+        self.groups_mock.list.side_effect = [groups[:2], groups[2:]]
+        arglist = ['--page-size', '2']
+        verifylist = [('page_size', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['g0', 'g1', 'g2'], [r[0] for r in data])
+        self.assertEqual([
+            mock.call(search_opts={'all_tenants': False, 'limit': 2,
+                                   'offset': 0}),
+            mock.call(search_opts={'all_tenants': False, 'limit': 2,
+                                   'offset': 2}),
+        ], self.groups_mock.list.call_args_list)
+
+    def test_security_group_list_limit(self):
+        groups = [
+            fakes.FakeResource(None, dict(SECURITY_GROUP, id='g%d' % i))
+            for i in range(2)
+        ]
+        self.groups_mock.list.side_effect = [groups, groups]
+        arglist = ['--page-size', '2', '--limit', '1']
+        verifylist = [('limit', 1)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['g0'], [r[0] for r in data])
+        self.assertEqual(1, self.groups_mock.list.call_count)
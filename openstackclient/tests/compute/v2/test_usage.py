@@ -0,0 +1,141 @@
+#   Copyright 2014 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import datetime
+import mock
+
+from openstackclient.compute.v2 import usage
+from openstackclient.tests.compute.v2 import fakes as compute_fakes
+from openstackclient.tests import fakes
+
+
+project_id = 'pppppppp'
+project_name = 'spinal-tap'
+
+USAGE = {
+    'tenant_id': project_id,
+    'total_memory_mb_usage': 1024.0,
+    'total_vcpus_usage': 2.0,
+    'total_local_gb_usage': 10.0,
+}
+
+
+class TestUsage(compute_fakes.TestComputev2):
+
+    def setUp(self):
+        super(TestUsage, self).setUp()
+
+        self.usage_mock = self.app.client_manager.compute.usage
+        self.usage_mock.reset_mock()
+        self.usage_mock.list.side_effect = lambda start, end: [
+            fakes.FakeResource(None, dict(USAGE), loaded=True),
+        ]
+
+        self.app.client_manager.identity = mock.Mock()
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.get.return_value = fakes.FakeResource(
+            None,
+            {'id': project_id, 'name': project_name},
+            loaded=True,
+        )
+
+        # Get the command object to test
+        self.cmd = usage.ListUsage(self.app, None)
+
+    def test_usage_list_whole_range(self):
+        arglist = [
+            '--start', '2014-01-01',
+            '--end', '2014-03-01',
+        ]
+        verifylist = [
+            ('start', '2014-01-01'),
+            ('end', '2014-03-01'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.usage_mock.list.assert_called_once_with(
+            datetime.datetime(2014, 1, 1),
+            datetime.datetime(2014, 3, 1),
+        )
+        self.projects_mock.get.assert_called_once_with(project_id)
+        collist = ('Project', 'RAM MB-Hours', 'CPU Hours', 'Disk GB-Hours')
+        self.assertEqual(collist, columns)
+        datalist = (
+            (project_name, 1024.0, 2.0, 10.0),
+        )
+        self.assertEqual(datalist, tuple(data))
+
+    def test_usage_list_windows(self):
+        arglist = [
+            '--start', '2014-01-01',
+            '--end', '2014-01-11',
+            '--window', '4',
+        ]
+        verifylist = [
+            ('window', 4),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(3, self.usage_mock.list.call_count)
+        self.usage_mock.list.assert_any_call(
+            datetime.datetime(2014, 1, 9),
+            datetime.datetime(2014, 1, 11),
+        )
+        # The three windows are merged into a single row
+        datalist = (
+            (project_name, 3072.0, 6.0, 30.0),
+        )
+        self.assertEqual(datalist, tuple(data))
+
+    def test_usage_list_bucket_and_window(self):
+        arglist = [
+            '--window', '4',
+            '--bucket', 'week',
+        ]
+        self.assertRaises(
+            SystemExit,
+            self.check_parser,
+            self.cmd,
+            arglist,
+            [],
+        )
+
+    def test_usage_list_bucket_week(self):
+        arglist = [
+            '--start', '2014-01-01',
+            '--end', '2014-01-15',
+            '--bucket', 'week',
+        ]
+        verifylist = [
+            ('bucket', 'week'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        collist = ('Start', 'Project', 'RAM MB-Hours', 'CPU Hours',
+                   'Disk GB-Hours')
+        self.assertEqual(collist, columns)
+        datalist = (
+            ('2014-01-01', project_name, 1024.0, 2.0, 10.0),
+            ('2014-01-08', project_name, 1024.0, 2.0, 10.0),
+        )
+        self.assertEqual(datalist, tuple(data))
+        # One lookup for the single project present in the usage
+        self.projects_mock.get.assert_called_once_with(project_id)
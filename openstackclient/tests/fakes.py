@@ -16,6 +16,8 @@
 import six
 import sys
 
+from openstackclient.identity import lookup
+
 
 AUTH_TOKEN = "foobar"
 AUTH_URL = "http://0.0.0.0"
@@ -53,6 +55,7 @@ class FakeClientManager(object):
         self.object = None
         self.volume = None
         self.auth_ref = None
+        self.identity_lookup = lookup.IdentityLookup(self)
 
 
 class FakeModule(object):
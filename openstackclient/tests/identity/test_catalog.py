@@ -0,0 +1,353 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import datetime
+import os
+import stat
+
+import fixtures
+from keystoneclient import access as identity_access
+from keystoneclient import exceptions as identity_exc
+import mock
+
+from openstackclient.common import clientmanager
+from openstackclient.common import exceptions
+from openstackclient.identity import catalog
+from openstackclient.identity import common
+from openstackclient.tests import fakes
+from openstackclient.tests import utils
+
+
+V2_CATALOG = [
+    {
+        'type': 'compute',
+        'name': 'nova',
+        'endpoints': [
+            {
+                'id': 'c1',
+                'region': 'one',
+                'publicURL': 'http://nova.one/v2',
+                'adminURL': 'http://nova.one:8774/v2',
+            },
+            {
+                'id': 'c2',
+                'region': 'two',
+                'publicURL': 'http://nova.two/v2',
+            },
+        ],
+    },
+]
+
+V3_CATALOG = [
+    {
+        'type': 'identity',
+        'name': 'keystone',
+        'endpoints': [
+            {
+                'id': 'k1',
+                'interface': 'public',
+                'region_id': 'one',
+                'url': 'http://keystone/v3',
+            },
+            {
+                'id': 'k2',
+                'interface': 'admin',
+                'region': 'one',
+                'url': 'http://keystone:35357/v3',
+            },
+        ],
+    },
+]
+
+
+def _in(seconds):
+    return datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+
+
+def _access(expires):
+    return identity_access.AccessInfo.factory(
+        resp=mock.Mock(headers={'X-Subject-Token': fakes.AUTH_TOKEN}),
+        body={
+            'token': {
+                'methods': ['password'],
+                'expires_at': expires.strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+                'user': {
+                    'id': 'uuuuuuuu',
+                    'name': 'admin',
+                    'domain': {'id': 'default', 'name': 'Default'},
+                },
+                'project': {
+                    'id': 'pppppppp',
+                    'name': 'admin',
+                    'domain': {'id': 'default', 'name': 'Default'},
+                },
+                'catalog': V3_CATALOG,
+            },
+        },
+    )
+
+
+class TestServiceCatalog(utils.TestCase):
+
+    def test_url_for_v2(self):
+        service_catalog = catalog.ServiceCatalog.from_auth_ref(
+            {'serviceCatalog': V2_CATALOG})
+
+        self.assertEqual('http://nova.one/v2',
+                         service_catalog.url_for('compute'))
+        self.assertEqual('http://nova.two/v2',
+                         service_catalog.url_for('compute', region='two'))
+        self.assertEqual('http://nova.one:8774/v2',
+                         service_catalog.url_for('compute', 'admin'))
+        self.assertEqual(3, len(service_catalog.endpoints))
+
+    def test_url_for_v3(self):
+        service_catalog = catalog.ServiceCatalog.from_auth_ref(
+            {'catalog': V3_CATALOG})
+
+        self.assertEqual('http://keystone:35357/v3',
+                         service_catalog.url_for('identity', 'admin', 'one'))
+        self.assertEqual('http://keystone/v3',
+                         service_catalog.url_for('identity'))
+
+    def test_url_for_missing(self):
+        service_catalog = catalog.ServiceCatalog.from_auth_ref(
+            {'serviceCatalog': V2_CATALOG})
+
+        self.assertRaises(
+            exceptions.EndpointNotFound,
+            service_catalog.url_for,
+            'compute',
+            'internal',
+        )
+        self.assertRaises(
+            exceptions.EndpointNotFound,
+            service_catalog.url_for,
+            'compute',
+            region='three',
+        )
+
+    def test_catalog_endpoints(self):
+        client_manager = fakes.FakeClientManager()
+        client_manager.catalog = catalog.ServiceCatalog.from_auth_ref(
+            {'catalog': V3_CATALOG})
+
+        columns, data = common.catalog_endpoints(client_manager)
+
+        self.assertEqual(('ID', 'Region', 'Service Name', 'Service Type',
+                          'Interface', 'URL'), columns)
+        self.assertEqual([
+            ('k2', 'one', 'keystone', 'identity', 'admin',
+             'http://keystone:35357/v3'),
+            ('k1', 'one', 'keystone', 'identity', 'public',
+             'http://keystone/v3'),
+        ], list(data))
+
+    def test_catalog_endpoints_token_flow(self):
+        self.assertRaises(
+            exceptions.CommandError,
+            common.catalog_endpoints,
+            fakes.FakeClientManager(),
+        )
+
+
+class TestCatalogCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestCatalogCache, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'catalog.json',
+        )
+        self.cache = catalog.CatalogCache(self.path)
+
+    def test_save_load(self):
+        self.cache.save('scope', _access(_in(3600)))
+
+        access, service_catalog, stale = self.cache.load('scope')
+
+        self.assertEqual(fakes.AUTH_TOKEN, access.auth_token)
+        self.assertEqual('uuuuuuuu', access.user_id)
+        self.assertEqual('pppppppp', access.project_id)
+        self.assertEqual('http://keystone/v3',
+                         service_catalog.url_for('identity'))
+        self.assertEqual(fakes.AUTH_TOKEN, access.service_catalog.get_token()[
+            'id'])
+        self.assertFalse(stale)
+        self.assertIsNone(self.cache.load('other-scope'))
+        # The file holds a token
+        self.assertEqual(
+            0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_load_expiring(self):
+        self.cache.save('scope', _access(_in(30)))
+        self.assertIsNone(self.cache.load('scope'))
+
+    def test_load_stale(self):
+        self.cache.refresh = 0
+        self.cache.save('scope', _access(_in(3600)))
+        self.assertTrue(self.cache.load('scope')[2])
+
+    def test_load_old_entry(self):
+        # Entries from before the whole AccessInfo was kept are not usable
+        with open(self.path, 'w') as f:
+            f.write('{"scope": {"token": "x", "expires": 9999999999, '
+                    '"endpoints": []}}')
+        self.assertIsNone(self.cache.load('scope'))
+
+    def test_drop(self):
+        self.cache.save('scope', _access(_in(3600)))
+        self.cache.save('other-scope', _access(_in(3600)))
+
+        self.cache.drop('scope')
+
+        self.assertIsNone(self.cache.load('scope'))
+        self.assertIsNotNone(self.cache.load('other-scope'))
+
+    def test_load_corrupt(self):
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        self.assertIsNone(self.cache.load('scope'))
+
+
+class TestClientManagerCatalogCache(utils.TestCase):
+
+    def setUp(self):
+        super(TestClientManagerCatalogCache, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'catalog.json',
+        )
+        self.kwargs = dict(
+            auth_url=fakes.AUTH_URL,
+            username='admin',
+            password='secret',
+            project_name='admin',
+            api_version={'identity': '3'},
+            catalog_cache=self.path,
+        )
+        clientmanager.ClientManager._reset_clients()
+        self.addCleanup(clientmanager.ClientManager._reset_clients)
+
+    def test_cached_token_skips_authentication(self):
+        access = _access(_in(3600))
+        scope = clientmanager.ClientManager(
+            token=fakes.AUTH_TOKEN,
+            url=fakes.AUTH_URL,
+            **self.kwargs)._catalog_scope()
+        catalog.CatalogCache(self.path).save(scope, access)
+
+        with mock.patch.object(
+            clientmanager.ClientManager,
+            'identity',
+        ) as identity:
+            client_manager = clientmanager.ClientManager(**self.kwargs)
+
+        self.assertFalse(identity.mock_calls)
+        self.assertEqual(fakes.AUTH_TOKEN, client_manager._token)
+        self.assertEqual('uuuuuuuu', client_manager.auth_ref.user_id)
+        self.assertEqual(
+            'http://keystone:35357/v3',
+            client_manager.get_endpoint_for_service_type(
+                'identity',
+                interface='admin',
+            ),
+        )
+        self.assertIsNone(client_manager._refresh_thread)
+        self.assertTrue(client_manager.token_from_cache)
+        # Commands like token issue need the catalog of the token
+        self.assertEqual(
+            fakes.AUTH_TOKEN,
+            client_manager._service_catalog.get_token()['id'],
+        )
+
+    def test_cached_identity_client_has_catalog(self):
+        self.kwargs['api_version'] = {'identity': '2.0'}
+        scope = clientmanager.ClientManager(
+            token=fakes.AUTH_TOKEN,
+            url=fakes.AUTH_URL,
+            **self.kwargs)._catalog_scope()
+        catalog.CatalogCache(self.path).save(scope, _access(_in(3600)))
+
+        client_manager = clientmanager.ClientManager(**self.kwargs)
+
+        self.assertEqual(
+            'pppppppp',
+            client_manager.identity.service_catalog.get_token()['tenant_id'],
+        )
+
+    def test_cached_token_rejected(self):
+        scope = clientmanager.ClientManager(
+            token=fakes.AUTH_TOKEN,
+            url=fakes.AUTH_URL,
+            **self.kwargs)._catalog_scope()
+        catalog.CatalogCache(self.path).save(scope, _access(_in(3600)))
+        client_manager = clientmanager.ClientManager(**self.kwargs)
+
+        self.assertFalse(client_manager.token_rejected(
+            identity_exc.NotFound()))
+        self.assertIsNotNone(catalog.CatalogCache(self.path).load(scope))
+        identity = client_manager.identity
+        self.assertTrue(client_manager.token_rejected(
+            identity_exc.Unauthorized()))
+        self.assertIsNone(catalog.CatalogCache(self.path).load(scope))
+        # The next ClientManager does not get the client with the old token
+        self.assertIsNot(identity, client_manager.identity)
+
+    def test_new_token_rejected(self):
+        with mock.patch.object(
+            clientmanager.ClientManager,
+            'identity',
+        ) as identity:
+            identity.auth_ref = _access(_in(3600))
+            identity.auth_token = fakes.AUTH_TOKEN
+            client_manager = clientmanager.ClientManager(**self.kwargs)
+
+        self.assertFalse(client_manager.token_rejected(
+            identity_exc.Unauthorized()))
+
+    def test_scope_password(self):
+        scope = clientmanager.ClientManager(
+            token=fakes.AUTH_TOKEN,
+            url=fakes.AUTH_URL,
+            **self.kwargs)._catalog_scope()
+        self.kwargs['password'] = 'changed'
+        other = clientmanager.ClientManager(
+            token=fakes.AUTH_TOKEN,
+            url=fakes.AUTH_URL,
+            **self.kwargs)._catalog_scope()
+
+        self.assertNotEqual(scope, other)
+        self.assertNotIn('secret', scope)
+
+    def test_authentication_saves_catalog(self):
+        access = _access(_in(3600))
+        with mock.patch.object(
+            clientmanager.ClientManager,
+            'identity',
+        ) as identity:
+            identity.auth_ref = access
+            identity.auth_token = fakes.AUTH_TOKEN
+            client_manager = clientmanager.ClientManager(**self.kwargs)
+
+        self.assertEqual(
+            'http://keystone/v3',
+            client_manager.get_endpoint_for_service_type('identity'),
+        )
+        self.assertEqual(
+            fakes.AUTH_TOKEN,
+            catalog.CatalogCache(self.path).load(
+                client_manager._catalog_scope())[0].auth_token,
+        )
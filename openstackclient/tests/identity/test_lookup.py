@@ -0,0 +1,179 @@
+#   Copyright 2012-2013 OpenStack Foundation
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+
+import fixtures
+from keystoneclient import exceptions as identity_exc
+import mock
+
+from openstackclient.common import exceptions
+from openstackclient.identity import common
+from openstackclient.identity import lookup
+from openstackclient.tests import fakes
+from openstackclient.tests import utils
+
+
+def _resource(resource_id):
+    return fakes.FakeResource(
+        None,
+        {'id': resource_id, 'name': 'name-' + resource_id},
+        loaded=True,
+    )
+
+
+class TestIdentityLookup(utils.TestCase):
+
+    def setUp(self):
+        super(TestIdentityLookup, self).setUp()
+        self.client_manager = fakes.FakeClientManager()
+        self.client_manager._auth_url = fakes.AUTH_URL
+        self.client_manager.identity = mock.Mock()
+        self.projects_mock = self.client_manager.identity.projects
+        self.projects_mock.get.side_effect = _resource
+        self.lookup = lookup.IdentityLookup(self.client_manager)
+
+    def test_names_fetches_only_missing(self):
+        self.assertEqual(
+            {'p1': 'name-p1'},
+            self.lookup.names('project', ['p1', None, '']),
+        )
+        self.assertEqual(
+            {'p1': 'name-p1', 'p2': 'name-p2'},
+            self.lookup.names('project', ['p1', 'p2']),
+        )
+        self.assertEqual(
+            [mock.call('p1'), mock.call('p2')],
+            self.projects_mock.get.call_args_list,
+        )
+
+    def test_names_expired(self):
+        self.lookup.ttl = 0
+        self.lookup.names('project', ['p1'])
+        self.lookup.names('project', ['p1'])
+        self.assertEqual(2, self.projects_mock.get.call_count)
+
+    def test_names_many_uses_list(self):
+        ids = ['p%d' % i for i in range(common.LIST_THRESHOLD + 1)]
+        self.projects_mock.list.return_value = [_resource(i) for i in ids]
+
+        names = self.lookup.names('project', ids)
+
+        self.projects_mock.list.assert_called_once_with()
+        self.assertFalse(self.projects_mock.get.called)
+        self.assertEqual(dict((i, 'name-' + i) for i in ids), names)
+
+    def test_names_failure_falls_back_to_id(self):
+        self.projects_mock.get.side_effect = Exception('forbidden')
+        self.assertEqual('p1', self.lookup.name('project', 'p1'))
+        # Failures are not cached
+        self.lookup.name('project', 'p1')
+        self.assertEqual(2, self.projects_mock.get.call_count)
+
+    def test_names_users_and_domains(self):
+        identity = self.client_manager.identity
+        identity.users.get.side_effect = _resource
+        identity.domains.get.side_effect = _resource
+        self.assertEqual('name-u1', self.lookup.name('user', 'u1'))
+        self.assertEqual('name-d1', self.lookup.name('domain', 'd1'))
+
+    def test_names_v2_tenants(self):
+        self.client_manager.identity = mock.Mock(spec=['tenants'])
+        self.client_manager.identity.tenants.get.side_effect = _resource
+        self.assertEqual('name-p1', self.lookup.name('project', 'p1'))
+
+    def test_names_unknown_kind(self):
+        self.assertRaises(ValueError, self.lookup.names, 'service', ['s1'])
+
+    def test_cache_file(self):
+        path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'identity.json',
+        )
+        first = lookup.IdentityLookup(self.client_manager, cache_file=path)
+        first.names('project', ['p1'])
+        self.assertTrue(os.path.exists(path))
+
+        second = lookup.IdentityLookup(self.client_manager, cache_file=path)
+        self.assertEqual('name-p1', second.name('project', 'p1'))
+        self.assertEqual(1, self.projects_mock.get.call_count)
+
+        # Another cloud does not share the names
+        self.client_manager._auth_url = 'http://other'
+        third = lookup.IdentityLookup(self.client_manager, cache_file=path)
+        third.name('project', 'p1')
+        self.assertEqual(2, self.projects_mock.get.call_count)
+
+
+class TestFindResources(utils.TestCase):
+
+    def setUp(self):
+        super(TestFindResources, self).setUp()
+        self.manager = mock.Mock()
+        self.manager.resource_class = fakes.FakeResource
+        self.resources = [_resource('p%d' % i)
+                          for i in range(common.LIST_THRESHOLD + 1)]
+        # Another project with the same name as p1
+        self.resources.append(fakes.FakeResource(
+            None,
+            {'id': 'other', 'name': 'name-p1'},
+            loaded=True,
+        ))
+        self.manager.list.return_value = self.resources
+
+    def test_find_resources_list(self):
+        values = ['p%d' % i for i in range(common.LIST_THRESHOLD)]
+        values.extend(['name-p2', 'nope'])
+
+        found, unknown = common.find_resources(self.manager, values)
+
+        self.manager.list.assert_called_once_with()
+        self.assertEqual('p2', found['name-p2'].id)
+        self.assertEqual('p0', found['p0'].id)
+        self.assertEqual(['nope'], unknown)
+
+    def test_find_resources_list_ambiguous(self):
+        values = ['p%d' % i for i in range(common.LIST_THRESHOLD)]
+        values.append('name-p1')
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            common.find_resources,
+            self.manager,
+            values,
+        )
+        self.assertIn("'name-p1'", str(e))
+
+    def test_find_resources_lookup_ambiguous(self):
+        self.manager.get.side_effect = identity_exc.NotFound(404)
+        self.manager.find.side_effect = identity_exc.NoUniqueMatch()
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            common.find_resources,
+            self.manager,
+            ['name-p1'],
+        )
+        self.assertIn("'name-p1'", str(e))
+        self.assertFalse(self.manager.list.called)
+
+    def test_find_resources_lookup_unknown(self):
+        self.manager.get.side_effect = identity_exc.NotFound(404)
+        self.manager.find.side_effect = identity_exc.NotFound(404)
+
+        found, unknown = common.find_resources(self.manager, ['nope', ''])
+
+        self.assertEqual({}, found)
+        self.assertEqual(['nope'], unknown)
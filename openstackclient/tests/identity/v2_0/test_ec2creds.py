@@ -0,0 +1,153 @@
+#   Copyright 2013 Nebula Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+
+import fixtures
+import mock
+
+from openstackclient.common import exceptions
+from openstackclient.common import secretfile
+from openstackclient.identity.v2_0 import ec2creds
+from openstackclient.tests import fakes
+from openstackclient.tests.identity.v2_0 import fakes as identity_fakes
+
+
+def _creds(access, secret=None, tenant_id=identity_fakes.project_id):
+    return fakes.FakeResource(None, {
+        'access': access,
+        'secret': secret or 'secret-' + access,
+        'tenant_id': tenant_id,
+    })
+
+
+class TestEC2Creds(identity_fakes.TestIdentityv2):
+
+    def setUp(self):
+        super(TestEC2Creds, self).setUp()
+
+        # Get a shortcut to the EC2 credentials Mock
+        self.app.client_manager.identity.ec2 = mock.Mock()
+        self.ec2_mock = self.app.client_manager.identity.ec2
+
+
+class TestEC2CredsRotate(TestEC2Creds):
+
+    def setUp(self):
+        super(TestEC2CredsRotate, self).setUp()
+
+        self.tenants_mock = self.app.client_manager.identity.tenants
+        self.tenants_mock.get.return_value = fakes.FakeResource(
+            None,
+            {'id': identity_fakes.project_id},
+        )
+        self.users_mock = self.app.client_manager.identity.users
+        self.users_mock.list.return_value = [
+            fakes.FakeResource(None, {'id': 'id-john', 'name': 'john'}),
+        ]
+        self.ec2_mock.list.return_value = [
+            _creds('old'),
+            _creds('other', tenant_id='elsewhere'),
+        ]
+        self.ec2_mock.create.return_value = _creds('new', 'shiny')
+
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'secrets',
+        )
+        self.useFixture(fixtures.EnvironmentVariable(
+            secretfile.PASSPHRASE_ENV, 'passphrase'))
+
+        # Get the command object to test
+        self.cmd = ec2creds.RotateEC2Creds(self.app, None)
+
+    def test_ec2_credentials_rotate_project(self):
+        arglist = [
+            '--project', identity_fakes.project_name,
+            '--output', self.path,
+            '--delete-old-after', '0',
+        ]
+        verifylist = [
+            ('project', identity_fakes.project_name),
+            ('delete_old_after', 0),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('john', identity_fakes.project_id, 'old', 'new', 'replaced'),
+        ], data)
+        self.users_mock.list.assert_called_once_with(
+            tenant_id=identity_fakes.project_id)
+        # Only the credentials of the project are rotated
+        self.ec2_mock.create.assert_called_once_with(
+            'id-john',
+            identity_fakes.project_id,
+        )
+        self.ec2_mock.delete.assert_called_once_with('id-john', 'old')
+        self.assertEqual([{
+            'user_id': 'id-john',
+            'user': 'john',
+            'project_id': identity_fakes.project_id,
+            'access': 'new',
+            'secret': 'shiny',
+            'old_id': '',
+            'old_access': '',
+            'delete_after': '',
+        }], secretfile.read_secrets(self.path, 'passphrase'))
+
+    def test_ec2_credentials_rotate_non_ascii(self):
+        name = u'j\xf6rg'
+        self.users_mock.list.return_value = [
+            fakes.FakeResource(None, {'id': 'id-joerg', 'name': name}),
+        ]
+        arglist = [
+            '--project', identity_fakes.project_name,
+            '--output', self.path,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            (name, identity_fakes.project_id, 'old', 'new', 'rotated'),
+        ], data)
+        self.assertEqual(
+            name,
+            secretfile.read_secrets(self.path, 'passphrase')[0]['user'],
+        )
+
+    def test_ec2_credentials_rotate_unwritable_secrets(self):
+        arglist = [
+            '--project', identity_fakes.project_name,
+            '--output', self.path,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        with mock.patch.object(
+            secretfile,
+            'encode_secrets',
+            side_effect=exceptions.CommandError('bad name'),
+        ):
+            self.assertRaises(
+                exceptions.CommandError,
+                self.cmd.take_action,
+                parsed_args,
+            )
+
+        # Nothing is created when the secrets cannot be saved
+        self.assertFalse(self.ec2_mock.create.called)
+        self.assertFalse(os.path.exists(self.path))
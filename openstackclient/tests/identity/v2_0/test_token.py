@@ -13,7 +13,14 @@
 #   under the License.
 #
 
+import datetime
+
+import mock
+
+from keystoneclient import exceptions as identity_exc
+
 from openstackclient.identity.v2_0 import token
+from openstackclient.tests import fakes
 from openstackclient.tests.identity.v2_0 import fakes as identity_fakes
 
 
@@ -54,3 +61,70 @@ class TestTokenCreate(TestToken):
             identity_fakes.user_id,
         )
         self.assertEqual(data, datalist)
+
+
+class TestTokenValidate(TestToken):
+
+    def setUp(self):
+        super(TestTokenValidate, self).setUp()
+
+        expires = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        self.body = {
+            'access': {
+                'token': {
+                    'id': 'good',
+                    'expires': expires.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'tenant': {
+                        'id': identity_fakes.project_id,
+                        'name': identity_fakes.project_name,
+                    },
+                },
+                'user': {
+                    'id': identity_fakes.user_id,
+                    'name': identity_fakes.user_name,
+                    'roles': [{'name': 'admin'}],
+                },
+            },
+        }
+        self.identity_mock = self.app.client_manager.identity
+        self.identity_mock.auth_url = fakes.AUTH_URL
+        self.identity_mock.get = mock.Mock(side_effect=self._get)
+
+        # Get the command object to test
+        self.cmd = token.ValidateToken(self.app, None)
+
+    def _get(self, url):
+        if url != '/tokens/good':
+            raise identity_exc.NotFound(404)
+        return mock.Mock(), self.body
+
+    def test_token_validate(self):
+        tokens = ['good', 'bad']
+        arglist = tokens + ['--show-tokens']
+        verifylist = [('tokens', tokens), ('show_tokens', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ('good', 'valid', identity_fakes.user_name,
+             identity_fakes.project_name, '', 'admin'),
+            data[0][:6],
+        )
+        self.assertEqual(('bad', 'invalid'), data[1][:2])
+        self.assertEqual(
+            sorted([mock.call('/tokens/good'), mock.call('/tokens/bad')]),
+            sorted(self.identity_mock.get.call_args_list),
+        )
+
+    def test_token_validate_masked(self):
+        long_token = 'abcd' + 'x' * 32 + 'wxyz'
+        arglist = ['good', long_token]
+        verifylist = [('tokens', arglist), ('show_tokens', False)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('****', 'valid'), data[0][:2])
+        self.assertEqual(('abcd...wxyz', 'invalid'), data[1][:2])
+        self.identity_mock.get.assert_any_call('/tokens/' + long_token)
@@ -14,8 +14,15 @@
 #
 
 import copy
+import csv
+import os
+
+import fixtures
 import mock
 
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
 from openstackclient.identity.v2_0 import user
 from openstackclient.tests import fakes
 from openstackclient.tests.identity.v2_0 import fakes as identity_fakes
@@ -34,6 +41,21 @@ class TestUser(identity_fakes.TestIdentityv2):
         self.users_mock = self.app.client_manager.identity.users
         self.users_mock.reset_mock()
 
+    @staticmethod
+    def _get(info):
+        # Only the fake resource's own name and ID are found
+        def _get(value):
+            if value in (info['id'], info['name']):
+                return fakes.FakeResource(None, copy.deepcopy(info))
+            raise Exception('not found')
+        return _get
+
+    def write_file(self, name, text):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
 
 class TestUserCreate(TestUser):
 
@@ -375,6 +397,216 @@ class TestUserDelete(TestUser):
             identity_fakes.user_id,
         )
 
+    def test_user_delete_from_file(self):
+        path = self.write_file('users.yaml', (
+            "- name: %s\n"
+            "- name: ringo\n"
+            "- name: john\n" % identity_fakes.user_name
+        ))
+        results = path + '.csv'
+        self.users_mock.get.side_effect = self._get(identity_fakes.USER)
+        self.users_mock.find.side_effect = identity_exc.NotFound(404)
+        self.users_mock.resource_class = fakes.FakeResource
+        arglist = ['--from-file', path, '--results', results]
+        verifylist = [
+            ('user', None),
+            ('from_file', path),
+            ('results', results),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        # Users that do not exist are reported but are not an error
+        self.users_mock.delete.assert_called_once_with(
+            identity_fakes.user_id,
+        )
+        with open(results) as f:
+            self.assertEqual([
+                ['Name', 'ID', 'Status'],
+                [identity_fakes.user_name, identity_fakes.user_id,
+                 'deleted'],
+                ['ringo', '', 'not found'],
+                ['john', '', 'not found'],
+            ], list(csv.reader(f)))
+
+    def test_user_delete_from_file_failure(self):
+        path = self.write_file('users.yaml', (
+            "- name: %s\n" % identity_fakes.user_name
+        ))
+        self.users_mock.delete.side_effect = Exception('forbidden')
+        arglist = ['--from-file', path]
+        verifylist = [('from_file', path)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+    def test_user_delete_needs_user_or_file(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+
+class TestUserImport(TestUser):
+
+    def setUp(self):
+        super(TestUserImport, self).setUp()
+
+        for manager, info in (
+            (self.users_mock, identity_fakes.USER),
+            (self.projects_mock, identity_fakes.PROJECT),
+            (self.app.client_manager.identity.roles, identity_fakes.ROLE),
+        ):
+            manager.reset_mock()
+            manager.get.side_effect = self._get(info)
+            manager.find.side_effect = identity_exc.NotFound(404)
+            manager.resource_class = fakes.FakeResource
+        self.roles_mock = self.app.client_manager.identity.roles
+
+        self.users_mock.create.side_effect = lambda name, *a, **kw: \
+            fakes.FakeResource(None, {'id': 'id-' + name, 'name': name})
+
+        self.path = self.write_file('users.csv', (
+            "name,email,project,enabled\n"
+            "%s,,,\n"
+            "john,john@example.com,%s,\n"
+            "george,,,false\n" % (
+                identity_fakes.user_name,
+                identity_fakes.project_name,
+            )
+        ))
+
+        # Get the command object to test
+        self.cmd = user.ImportUser(self.app, None)
+
+    def test_user_import(self):
+        results = self.path + '.out'
+        arglist = [
+            '--file', self.path,
+            '--project', identity_fakes.project_id,
+            '--role', identity_fakes.role_name,
+            '--results', results,
+        ]
+        verifylist = [
+            ('file', self.path),
+            ('project', identity_fakes.project_id),
+            ('role', [identity_fakes.role_name]),
+            ('results', results),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('Name', 'ID', 'Project', 'Roles', 'Status'),
+                         columns)
+        self.assertEqual([
+            (identity_fakes.user_name, identity_fakes.user_id,
+             identity_fakes.project_id, '', 'exists'),
+            ('john', 'id-john', identity_fakes.project_name,
+             identity_fakes.role_name, 'created'),
+            ('george', 'id-george', identity_fakes.project_id,
+             identity_fakes.role_name, 'created'),
+        ], data)
+        self.assertEqual(sorted([
+            mock.call('john', None, 'john@example.com',
+                      tenant_id=identity_fakes.project_id, enabled=True),
+            mock.call('george', None, None,
+                      tenant_id=identity_fakes.project_id, enabled=False),
+        ]), sorted(self.users_mock.create.call_args_list))
+        self.assertEqual(sorted([
+            mock.call('id-john', identity_fakes.role_id,
+                      identity_fakes.project_id),
+            mock.call('id-george', identity_fakes.role_id,
+                      identity_fakes.project_id),
+        ]), sorted(self.roles_mock.add_user_role.call_args_list))
+        # Each distinct project value is looked up once
+        self.assertEqual(
+            sorted([
+                mock.call(identity_fakes.project_id),
+                mock.call(identity_fakes.project_name),
+            ]),
+            sorted(self.projects_mock.get.call_args_list),
+        )
+        with open(results) as f:
+            self.assertEqual(4, len(list(csv.reader(f))))
+
+    def test_user_import_dry_run(self):
+        arglist = ['--file', self.path, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['exists', 'pending', 'pending'],
+                         [row[-1] for row in data])
+        self.assertFalse(self.users_mock.create.called)
+
+    def test_user_import_failures(self):
+        self.users_mock.create.side_effect = Exception('conflict')
+        results = self.path + '.out'
+        arglist = ['--file', self.path, '--results', results]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+        self.assertIn('2 of 3 users', str(e))
+        # The outcome of every user is still recorded
+        with open(results) as f:
+            self.assertEqual(
+                ['Status', 'exists', 'failed', 'failed'],
+                [row[-1] for row in csv.reader(f)],
+            )
+
+    def test_user_import_non_ascii(self):
+        name = u'J\xfcrgen'
+        path = self.write_file('users.yaml', '')
+        with open(path, 'wb') as f:
+            f.write((u'- name: %s\n' % name).encode('utf-8'))
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([(name, 'id-' + name, '', '', 'created')], data)
+
+    def test_user_import_unknown_project(self):
+        arglist = ['--file', self.path, '--project', 'nope']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertIn("project 'nope'", str(e))
+        self.assertFalse(self.users_mock.create.called)
+
+    def test_user_import_role_needs_project(self):
+        arglist = ['--file', self.path, '--role', identity_fakes.role_name]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
 
 class TestUserList(TestUser):
 
@@ -447,6 +679,12 @@ class TestUserList(TestUser):
         self.assertEqual(tuple(data), datalist)
 
     def test_user_list_long(self):
+        self.projects_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(identity_fakes.PROJECT),
+            loaded=True,
+        )
+
         arglist = [
             '--long',
         ]
@@ -459,6 +697,11 @@ class TestUserList(TestUser):
         columns, data = self.cmd.take_action(parsed_args)
 
         self.users_mock.list.assert_called_with(tenant_id=None)
+        # Only the project of the listed user is looked up
+        self.projects_mock.get.assert_called_once_with(
+            identity_fakes.project_id,
+        )
+        self.assertFalse(self.projects_mock.list.called)
 
         collist = ('ID', 'Name', 'Project', 'Email', 'Enabled')
         self.assertEqual(columns, collist)
@@ -125,9 +125,13 @@ class FakeIdentityv3Client(object):
         self.projects.resource_class = fakes.FakeResource(None, {})
         self.roles = mock.Mock()
         self.roles.resource_class = fakes.FakeResource(None, {})
+        self.role_assignments = mock.Mock()
+        self.role_assignments.resource_class = fakes.FakeResource(None, {})
         self.services = mock.Mock()
         self.services.resource_class = fakes.FakeResource(None, {})
         self.service_catalog = mock.Mock()
+        self.sids = mock.Mock()
+        self.sids.resource_class = fakes.FakeResource(None, {})
         self.users = mock.Mock()
         self.users.resource_class = fakes.FakeResource(None, {})
         self.auth_token = kwargs['token']
@@ -0,0 +1,290 @@
+#   Copyright 2013 Nebula Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import json
+import os
+import time
+
+import fixtures
+import mock
+
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
+from openstackclient.common import secretfile
+from openstackclient.identity.v3 import credential
+from openstackclient.tests import fakes
+from openstackclient.tests.identity.v3 import fakes as identity_fakes
+
+
+def _resource(**info):
+    return fakes.FakeResource(None, info)
+
+
+def _ec2(credential_id, user_id, access):
+    return _resource(
+        id=credential_id,
+        type='ec2',
+        user_id=user_id,
+        project_id=identity_fakes.project_id,
+        blob=json.dumps({'access': access, 'secret': 'old-secret'}),
+    )
+
+
+class TestCredential(identity_fakes.TestIdentityv3):
+
+    def setUp(self):
+        super(TestCredential, self).setUp()
+
+        # Get a shortcut to the CredentialManager Mock
+        self.app.client_manager.identity.credentials = mock.Mock()
+        self.credentials_mock = self.app.client_manager.identity.credentials
+
+
+class TestCredentialRotate(TestCredential):
+
+    def setUp(self):
+        super(TestCredentialRotate, self).setUp()
+
+        self.users = {
+            'john': _resource(id='id-john', name='john'),
+            'paul': _resource(id='id-paul', name='paul'),
+        }
+        users_mock = self.app.client_manager.identity.users
+
+        def _get(value):
+            if value in self.users:
+                return self.users[value]
+            raise identity_exc.NotFound(404)
+        users_mock.get.side_effect = _get
+        users_mock.find.side_effect = identity_exc.NotFound(404)
+        users_mock.resource_class = fakes.FakeResource
+
+        self.credentials = {
+            'id-john': [
+                _ec2('c1', 'id-john', 'old-john'),
+                _resource(id='c2', type='cert', user_id='id-john',
+                          blob='-----BEGIN CERTIFICATE-----'),
+            ],
+            'id-paul': [_ec2('c3', 'id-paul', 'old-paul')],
+        }
+        self.credentials_mock.list.side_effect = \
+            lambda user_id: self.credentials[user_id]
+        self.credentials_mock.create.side_effect = \
+            lambda **kw: _resource(id='new-' + kw['user'])
+
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'secrets',
+        )
+        self.useFixture(fixtures.EnvironmentVariable(
+            secretfile.PASSPHRASE_ENV, 'passphrase'))
+
+        # Get the command object to test
+        self.cmd = credential.RotateCredential(self.app, None)
+
+    def test_credential_rotate(self):
+        arglist = [
+            '--user', 'john',
+            '--user', 'paul',
+            '--user', 'stu',
+            '--output', self.path,
+            '--delete-old-after', '30',
+        ]
+        verifylist = [
+            ('user', ['john', 'paul', 'stu']),
+            ('output', self.path),
+            ('delete_old_after', 30),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ('User', 'Project', 'Old Access', 'New Access', 'Status'),
+            columns,
+        )
+        secrets = dict(
+            (s['user_id'], s)
+            for s in secretfile.read_secrets(self.path, 'passphrase'))
+        self.assertEqual(sorted([
+            ('stu', '', '', '', 'not found'),
+            ('john', identity_fakes.project_id, 'old-john',
+             secrets['id-john']['access'], 'scheduled'),
+            ('paul', identity_fakes.project_id, 'old-paul',
+             secrets['id-paul']['access'], 'scheduled'),
+        ]), sorted(data))
+        self.assertEqual(
+            ('c1', 'old-john'),
+            (secrets['id-john']['old_id'], secrets['id-john']['old_access']),
+        )
+        self.assertTrue(
+            0 < int(secrets['id-john']['delete_after']) - time.time() <= 30)
+
+        # The new secrets match what was created
+        for call in self.credentials_mock.create.call_args_list:
+            blob = json.loads(call[1]['blob'])
+            secret = secrets[call[1]['user']]
+            self.assertEqual(
+                (blob['access'], blob['secret']),
+                (secret['access'], secret['secret']),
+            )
+        self.assertEqual(2, self.credentials_mock.create.call_count)
+        # Nothing is deleted before the time is up
+        self.assertFalse(self.credentials_mock.delete.called)
+
+    def _delete_replaced(self):
+        arglist = ['--delete-replaced', self.path]
+        verifylist = [('delete_replaced', self.path)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        return self.cmd.take_action(parsed_args)
+
+    def test_credential_rotate_delete_replaced(self):
+        arglist = [
+            '--user', 'john',
+            '--user', 'paul',
+            '--output', self.path,
+            '--delete-old-after', '30',
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+
+        columns, data = self._delete_replaced()
+
+        self.assertEqual(['waiting', 'waiting'], [row[4] for row in data])
+        self.assertFalse(self.credentials_mock.delete.called)
+
+        with mock.patch('time.time', return_value=time.time() + 31):
+            columns, data = self._delete_replaced()
+
+        self.assertEqual(
+            [('john', 'old-john', 'replaced'),
+             ('paul', 'old-paul', 'replaced')],
+            sorted((row[0], row[2], row[4]) for row in data),
+        )
+        # The certificate is left alone
+        self.assertEqual(
+            sorted([mock.call('c1'), mock.call('c3')]),
+            sorted(self.credentials_mock.delete.call_args_list),
+        )
+        # The new secrets are kept, the deleted credentials are forgotten
+        secrets = secretfile.read_secrets(self.path, 'passphrase')
+        self.assertEqual(2, len(secrets))
+        self.assertEqual(
+            [('', '', '')] * 2,
+            [(s['old_id'], s['old_access'], s['delete_after'])
+             for s in secrets],
+        )
+        self.assertEqual([], self._delete_replaced()[1])
+
+    def test_credential_rotate_existing_output(self):
+        with open(self.path, 'w') as f:
+            f.write('keep me')
+        arglist = ['--user', 'john', '--output', self.path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.credentials_mock.create.called)
+        with open(self.path) as f:
+            self.assertEqual('keep me', f.read())
+
+    def test_credential_rotate_overwrite(self):
+        with open(self.path, 'w') as f:
+            f.write('old secrets')
+        arglist = ['--user', 'john', '--output', self.path, '--overwrite']
+        verifylist = [('overwrite', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ['id-john'],
+            [s['user_id'] for s in secretfile.read_secrets(
+                self.path, 'passphrase')],
+        )
+
+    def test_credential_rotate_output_not_writable(self):
+        path = os.path.join(self.path, 'missing', 'secrets')
+        arglist = ['--user', 'john', '--output', path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.credentials_mock.create.called)
+
+    def test_credential_rotate_keeps_old(self):
+        self.credentials_mock.create.side_effect = [
+            _resource(id='new'),
+            Exception('quota'),
+        ]
+        arglist = ['--user', 'john', '--user', 'paul', '--output', self.path]
+        verifylist = [('delete_old_after', None)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ['failed', 'rotated'],
+            sorted(row[4] for row in data),
+        )
+        self.assertEqual(
+            1, len(secretfile.read_secrets(self.path, 'passphrase')))
+        self.assertFalse(self.credentials_mock.delete.called)
+
+    def test_credential_rotate_project_dry_run(self):
+        self.app.client_manager.identity.projects.get.return_value = \
+            _resource(id=identity_fakes.project_id)
+        self.app.client_manager.identity.role_assignments.list.return_value = [
+            _resource(user={'id': 'id-john'}, role={'id': 'r1'},
+                      scope={'project': {'id': identity_fakes.project_id}}),
+        ]
+        self.app.client_manager.identity_lookup = mock.Mock()
+        self.app.client_manager.identity_lookup.names.return_value = {
+            'id-john': 'john',
+        }
+        arglist = ['--project', identity_fakes.project_name, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('john', identity_fakes.project_id, 'old-john', '', 'pending'),
+        ], data)
+        self.app.client_manager.identity.role_assignments.list.\
+            assert_called_once_with(
+                project=identity_fakes.project_id,
+                effective=True,
+            )
+        self.assertFalse(self.credentials_mock.create.called)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_credential_rotate_needs_output(self):
+        arglist = ['--user', 'john']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
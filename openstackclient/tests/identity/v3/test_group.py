@@ -0,0 +1,249 @@
+#   Copyright 2013 Nebula Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+import os
+
+import fixtures
+import mock
+
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
+from openstackclient.identity.v3 import group
+from openstackclient.tests import fakes
+from openstackclient.tests.identity.v3 import fakes as identity_fakes
+
+
+def _user(name, domain_id=identity_fakes.domain_id):
+    return fakes.FakeResource(None, {
+        'id': 'id-' + name,
+        'name': name,
+        'domain_id': domain_id,
+    })
+
+
+class TestGroup(identity_fakes.TestIdentityv3):
+
+    def setUp(self):
+        super(TestGroup, self).setUp()
+
+        # Get a shortcut to the DomainManager Mock
+        self.domains_mock = self.app.client_manager.identity.domains
+        self.domains_mock.reset_mock()
+
+        # Get a shortcut to the GroupManager Mock
+        self.groups_mock = self.app.client_manager.identity.groups
+        self.groups_mock.reset_mock()
+
+        # Get a shortcut to the UserManager Mock
+        self.users_mock = self.app.client_manager.identity.users
+        self.users_mock.reset_mock()
+
+
+class TestGroupSync(TestGroup):
+
+    def setUp(self):
+        super(TestGroupSync, self).setUp()
+
+        self.groups_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(identity_fakes.GROUP),
+            loaded=True,
+        )
+
+        # john and paul are members, george and ringo exist
+        self.members = [_user('john'), _user('paul')]
+        self.others = dict(
+            (u.name, u) for u in (_user('george'), _user('ringo')))
+        self.users_mock.list.side_effect = lambda **kw: \
+            self.members if 'group' in kw else list(self.others.values())
+
+        def _get(value):
+            if value in self.others:
+                return self.others[value]
+            raise identity_exc.NotFound(404)
+        self.users_mock.get.side_effect = _get
+        self.users_mock.find.side_effect = identity_exc.NotFound(404)
+        self.users_mock.resource_class = fakes.FakeResource
+
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'members.txt',
+        )
+        with open(self.path, 'w') as f:
+            f.write("# from ldap\njohn\ngeorge\n\ngeorge\nstu\n")
+
+        # Get the command object to test
+        self.cmd = group.SyncGroup(self.app, None)
+
+    def test_group_sync(self):
+        arglist = [identity_fakes.group_name, '--members-file', self.path]
+        verifylist = [
+            ('group', identity_fakes.group_name),
+            ('members_file', self.path),
+            ('dry_run', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('Action', 'User', 'Status'), columns)
+        self.assertEqual(sorted([
+            ('add', 'george', 'added'),
+            ('add', 'stu', 'not found'),
+            ('remove', 'paul', 'removed'),
+        ]), sorted(data))
+        self.users_mock.list.assert_called_once_with(
+            group=identity_fakes.group_id,
+        )
+        # Current members are not looked up again
+        self.assertEqual(
+            sorted([mock.call('george'), mock.call('stu')]),
+            sorted(self.users_mock.get.call_args_list),
+        )
+        self.users_mock.add_to_group.assert_called_once_with(
+            'id-george',
+            identity_fakes.group_id,
+        )
+        self.users_mock.remove_from_group.assert_called_once_with(
+            'id-paul',
+            identity_fakes.group_id,
+        )
+
+    def test_group_sync_domain_dry_run(self):
+        self.domains_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(identity_fakes.DOMAIN),
+        )
+        arglist = [
+            identity_fakes.group_name,
+            '--members-file', self.path,
+            '--domain', identity_fakes.domain_name,
+            '--dry-run',
+        ]
+        verifylist = [
+            ('domain', identity_fakes.domain_name),
+            ('dry_run', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(sorted([
+            ('add', 'george', 'pending'),
+            ('add', 'stu', 'not found'),
+            ('remove', 'paul', 'pending'),
+        ]), sorted(data))
+        # Names in the domain come from one listing
+        self.assertEqual([
+            mock.call(group=identity_fakes.group_id),
+            mock.call(domain=identity_fakes.domain_id),
+        ], self.users_mock.list.call_args_list)
+        self.assertFalse(self.users_mock.get.called)
+        self.assertFalse(self.users_mock.add_to_group.called)
+        self.assertFalse(self.users_mock.remove_from_group.called)
+
+    def test_group_sync_domain_scopes_members(self):
+        # This john is a member from another domain
+        self.members = [_user('john', 'other'), _user('paul')]
+        self.others['john'] = fakes.FakeResource(
+            None,
+            {'id': 'id-john2', 'name': 'john'},
+        )
+        self.domains_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(identity_fakes.DOMAIN),
+        )
+        arglist = [
+            identity_fakes.group_name,
+            '--members-file', self.path,
+            '--domain', identity_fakes.domain_name,
+            '--dry-run',
+        ]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(sorted([
+            ('add', 'john', 'pending'),
+            ('add', 'george', 'pending'),
+            ('add', 'stu', 'not found'),
+            ('remove', 'john', 'pending'),
+            ('remove', 'paul', 'pending'),
+        ]), sorted(data))
+
+    def test_group_sync_ambiguous_member(self):
+        self.members = [_user('john'), _user('john', 'other')]
+        self.members[1].id = 'id-john2'
+        arglist = [identity_fakes.group_name, '--members-file', self.path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.users_mock.remove_from_group.called)
+
+    def test_group_sync_empty_needs_force(self):
+        with open(self.path, 'w') as f:
+            f.write("# nobody\n")
+        arglist = [identity_fakes.group_name, '--members-file', self.path]
+        verifylist = [('force', False)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.users_mock.remove_from_group.called)
+
+        arglist.append('--force')
+        parsed_args = self.check_parser(self.cmd, arglist, [('force', True)])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ['removed', 'removed'],
+            [row[2] for row in data],
+        )
+
+    def test_group_sync_failure(self):
+        self.users_mock.remove_from_group.side_effect = Exception('nope')
+        arglist = [identity_fakes.group_name, '--members-file', self.path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertIn(('remove', 'paul', 'failed'), list(data))
+
+    def test_group_sync_missing_file(self):
+        arglist = [
+            identity_fakes.group_name,
+            '--members-file', self.path + '.gone',
+        ]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
@@ -14,7 +14,13 @@
 #
 
 import copy
+import os
+import six
 
+import fixtures
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
 from openstackclient.identity.v3 import role
 from openstackclient.tests import fakes
 from openstackclient.tests.identity.v3 import fakes as identity_fakes
@@ -206,6 +212,248 @@ class TestRoleAdd(TestRole):
         )
 
 
+class TestRoleApply(TestRole):
+
+    def setUp(self):
+        super(TestRoleApply, self).setUp()
+
+        for manager, info in (
+            (self.users_mock, identity_fakes.USER),
+            (self.groups_mock, identity_fakes.GROUP),
+            (self.domains_mock, identity_fakes.DOMAIN),
+            (self.projects_mock, identity_fakes.PROJECT),
+            (self.roles_mock, identity_fakes.ROLE),
+        ):
+            manager.get.side_effect = self._get(info)
+            manager.find.side_effect = identity_exc.NotFound(404)
+            manager.resource_class = fakes.FakeResource
+
+        # The user already has the role on the project
+        self.assignments_mock = \
+            self.app.client_manager.identity.role_assignments
+        self.assignments_mock.reset_mock()
+        self.assignments_mock.list.side_effect = lambda **kw: [
+            fakes.FakeResource(None, {
+                'role': {'id': identity_fakes.role_id},
+                'user': {'id': identity_fakes.user_id},
+                'scope': {'project': {'id': identity_fakes.project_id}},
+            }),
+        ] if kw == {'project': identity_fakes.project_id} else []
+
+        self.tmpdir = self.useFixture(fixtures.TempDir()).path
+
+        # Get the command object to test
+        self.cmd = role.ApplyRole(self.app, None)
+
+    @staticmethod
+    def _get(info):
+        # Only the fake resource's own name and ID are found
+        def _get(value):
+            if value in (info['id'], info['name']):
+                return fakes.FakeResource(None, copy.deepcopy(info))
+            raise Exception('not found')
+        return _get
+
+    def write_file(self, text):
+        path = os.path.join(self.tmpdir, 'roles.yaml')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_role_apply(self):
+        path = self.write_file(
+            "- {role: %(role)s, user: %(user)s, project: %(project)s}\n"
+            "- {role: %(role)s, group: '%(group)s', domain: %(domain)s}\n"
+            "- {role: %(role)s, user: %(user)s, project: %(project)s,"
+            " state: present}\n"
+            % {
+                'role': identity_fakes.role_name,
+                'user': identity_fakes.user_name,
+                'group': identity_fakes.group_name,
+                'project': identity_fakes.project_name,
+                'domain': identity_fakes.domain_name,
+            })
+        arglist = ['--file', path]
+        verifylist = [('file', path), ('dry_run', False)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        data = tuple(data)
+
+        # Only the missing assignment is granted
+        self.roles_mock.grant.assert_called_once_with(
+            identity_fakes.role_id,
+            group=identity_fakes.group_id,
+            domain=identity_fakes.domain_id,
+        )
+        self.assertFalse(self.roles_mock.revoke.called)
+        # Every distinct name is resolved once
+        self.assertEqual(1, self.users_mock.get.call_count)
+        self.assertEqual(1, self.roles_mock.get.call_count)
+        self.assertEqual(('Action', 'Role', 'Actor', 'Scope', 'Status'),
+                         columns)
+        self.assertEqual((
+            ('grant', identity_fakes.role_name,
+             'group:' + identity_fakes.group_name,
+             'domain:' + identity_fakes.domain_name, 'granted'),
+        ), data)
+
+    def test_role_apply_inherited(self):
+        # An inherited grant on the domain is not the direct one asked for
+        self.assignments_mock.list.side_effect = lambda **kw: [
+            fakes.FakeResource(None, {
+                'role': {'id': identity_fakes.role_id},
+                'user': {'id': identity_fakes.user_id},
+                'scope': {
+                    'domain': {'id': identity_fakes.domain_id},
+                    'OS-INHERIT:inherited_to': 'projects',
+                },
+            }),
+        ]
+        path = self.write_file(
+            "- {role: %(role)s, user: %(user)s, domain: %(domain)s}\n"
+            "- {role: %(role)s, user: %(user)s, project: %(project)s,"
+            " state: absent}\n"
+            % {
+                'role': identity_fakes.role_id,
+                'user': identity_fakes.user_id,
+                'domain': identity_fakes.domain_id,
+                'project': identity_fakes.project_id,
+            })
+        arglist = ['--file', path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+        tuple(data)
+
+        self.roles_mock.grant.assert_called_once_with(
+            identity_fakes.role_id,
+            user=identity_fakes.user_id,
+            domain=identity_fakes.domain_id,
+        )
+        self.assertFalse(self.roles_mock.revoke.called)
+
+    def test_role_apply_non_ascii(self):
+        name = u'r\xf4le'
+        path = self.write_file('')
+        with open(path, 'wb') as f:
+            f.write((u"- {role: %s, user: %s, project: %s}\n" % (
+                name,
+                identity_fakes.user_id,
+                identity_fakes.project_id,
+            )).encode('utf-8'))
+        arglist = ['--file', path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+        self.assertIn(u"role '%s'" % name, six.text_type(e))
+
+    def test_role_apply_revoke(self):
+        path = self.write_file(
+            "- {role: %s, user: %s, project: %s, state: absent}\n" % (
+                identity_fakes.role_id,
+                identity_fakes.user_id,
+                identity_fakes.project_id,
+            ))
+        arglist = ['--file', path, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['revoke'], [row[0] for row in data])
+        self.assertFalse(self.roles_mock.revoke.called)
+
+    def test_role_apply_sid(self):
+        path = self.write_file(
+            "- {role: %s, user: %s, sid: %s}\n" % (
+                identity_fakes.role_name,
+                identity_fakes.user_name,
+                identity_fakes.domain_name,
+            ))
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+        tuple(data)
+
+        self.roles_mock.grant_sid.assert_called_once_with(
+            identity_fakes.role_id,
+            user=identity_fakes.user_id,
+            sid=identity_fakes.domain_id,
+        )
+        self.assertFalse(self.assignments_mock.list.called)
+
+    def test_role_apply_sid_group(self):
+        path = self.write_file(
+            "- {role: %s, group: %s, sip: %s}\n" % (
+                identity_fakes.role_name,
+                identity_fakes.group_name,
+                identity_fakes.project_name,
+            ))
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.roles_mock.grant_sid.called)
+
+    def test_role_apply_unknown_names(self):
+        path = self.write_file(
+            "- {role: admin, user: nobody, project: %s}\n" %
+            identity_fakes.project_name)
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.roles_mock.grant.called)
+
+    def test_role_apply_invalid_entry(self):
+        path = self.write_file("- {role: admin, project: p1}\n")
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+    def test_role_apply_conflict(self):
+        path = self.write_file(
+            "- {role: r1, user: u1, project: p1}\n"
+            "- {role: r1, user: u1, project: p1, state: absent}\n")
+        self.roles_mock.get.side_effect = self._get({'id': 'r1', 'name': 'a'})
+        self.users_mock.get.side_effect = self._get({'id': 'u1', 'name': 'b'})
+        self.projects_mock.get.side_effect = self._get(
+            {'id': 'p1', 'name': 'c'})
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+
 class TestRoleCreate(TestRole):
 
     def setUp(self):
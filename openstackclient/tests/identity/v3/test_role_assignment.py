@@ -0,0 +1,120 @@
+#   Copyright 2013 Nebula Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import copy
+
+from openstackclient.identity.v3 import role_assignment
+from openstackclient.tests import fakes
+from openstackclient.tests.identity.v3 import fakes as identity_fakes
+
+
+ASSIGNMENT_USER_PROJECT = {
+    'role': {'id': identity_fakes.role_id},
+    'user': {'id': identity_fakes.user_id},
+    'scope': {'project': {'id': identity_fakes.project_id}},
+}
+
+ASSIGNMENT_GROUP_DOMAIN = {
+    'role': {'id': identity_fakes.role_id},
+    'group': {'id': identity_fakes.group_id},
+    'scope': {
+        'domain': {'id': identity_fakes.domain_id},
+        'OS-INHERIT:inherited_to': 'projects',
+    },
+}
+
+
+class TestRoleAssignmentList(identity_fakes.TestIdentityv3):
+
+    def setUp(self):
+        super(TestRoleAssignmentList, self).setUp()
+
+        identity_client = self.app.client_manager.identity
+        self.assignments_mock = identity_client.role_assignments
+        self.assignments_mock.reset_mock()
+        self.assignments_mock.list.return_value = [
+            fakes.FakeResource(None, copy.deepcopy(ASSIGNMENT_USER_PROJECT)),
+            fakes.FakeResource(None, copy.deepcopy(ASSIGNMENT_GROUP_DOMAIN)),
+        ]
+        for manager, info in (
+            (identity_client.roles, identity_fakes.ROLE),
+            (identity_client.users, identity_fakes.USER),
+            (identity_client.groups, identity_fakes.GROUP),
+            (identity_client.projects, identity_fakes.PROJECT),
+            (identity_client.domains, identity_fakes.DOMAIN),
+        ):
+            manager.reset_mock()
+            manager.get.return_value = fakes.FakeResource(
+                None,
+                copy.deepcopy(info),
+                loaded=True,
+            )
+        self.identity_client = identity_client
+
+        # Get the command object to test
+        self.cmd = role_assignment.ListRoleAssignment(self.app, None)
+
+    def test_role_assignment_list(self):
+        arglist = []
+        verifylist = [('effective', False), ('names', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assignments_mock.list.assert_called_once_with()
+        # Every distinct ID is looked up once
+        self.identity_client.users.get.assert_called_once_with(
+            identity_fakes.user_id)
+        self.identity_client.roles.get.assert_called_once_with(
+            identity_fakes.role_id)
+        self.assertEqual(
+            ('Role', 'User', 'Group', 'Project', 'Domain', 'Inherited'),
+            columns,
+        )
+        self.assertEqual((
+            (identity_fakes.role_name, identity_fakes.user_name, '',
+             identity_fakes.project_name, '', False),
+            (identity_fakes.role_name, '', identity_fakes.group_name,
+             '', identity_fakes.domain_name, True),
+        ), tuple(data))
+
+    def test_role_assignment_list_filters(self):
+        arglist = [
+            '--user', identity_fakes.user_id,
+            '--project', identity_fakes.project_id,
+            '--effective',
+            '--no-names',
+        ]
+        verifylist = [
+            ('user', identity_fakes.user_id),
+            ('project', identity_fakes.project_id),
+            ('effective', True),
+            ('names', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assignments_mock.list.assert_called_once_with(
+            user=identity_fakes.user_id,
+            project=identity_fakes.project_id,
+            effective=True,
+        )
+        self.assertEqual(
+            (identity_fakes.role_id, identity_fakes.user_id, '',
+             identity_fakes.project_id, '', False),
+            tuple(data)[0],
+        )
+        self.assertFalse(self.identity_client.roles.get.called)
@@ -0,0 +1,282 @@
+#   Copyright 2013 Nebula Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import mock
+
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
+from openstackclient.identity import common as identity_common
+from openstackclient.identity.v3 import sid
+from openstackclient.tests import fakes
+from openstackclient.tests.identity.v3 import fakes as identity_fakes
+
+
+sid_id = 'ssssssss'
+sid_name = 'research'
+
+SID = {
+    'id': sid_id,
+    'name': sid_name,
+    'description': 'research domains',
+    'enabled': True,
+    'members': [],
+}
+
+
+def _domain(n):
+    return fakes.FakeResource(None, {'id': 'd%d' % n, 'name': 'dom%d' % n})
+
+
+class TestSid(identity_fakes.TestIdentityv3):
+
+    def setUp(self):
+        super(TestSid, self).setUp()
+
+        # Get a shortcut to the DomainManager Mock
+        self.domains_mock = self.app.client_manager.identity.domains
+        self.domains_mock.reset_mock()
+        self.domains_mock.resource_class = fakes.FakeResource
+        self.domains = dict(
+            (d.name, d) for d in (_domain(n) for n in range(30)))
+
+        def _get(value):
+            if value in self.domains:
+                return self.domains[value]
+            raise identity_exc.NotFound(404)
+        self.domains_mock.get.side_effect = _get
+        self.domains_mock.find.side_effect = identity_exc.NotFound(404)
+        self.domains_mock.list.return_value = list(self.domains.values())
+
+        # Get a shortcut to the SidManager Mock
+        self.sids_mock = self.app.client_manager.identity.sids
+        self.sids_mock.reset_mock()
+        self.sids_mock.create.return_value = fakes.FakeResource(None, SID)
+
+
+class TestSidCreate(TestSid):
+
+    def setUp(self):
+        super(TestSidCreate, self).setUp()
+
+        # Get the command object to test
+        self.cmd = sid.CreateSid(self.app, None)
+
+    def test_sid_create_few_members(self):
+        arglist = [sid_name, '--members', 'dom1, dom2,dom1']
+        verifylist = [('name', sid_name), ('members', 'dom1, dom2,dom1')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.domains_mock.get.call_count)
+        self.assertFalse(self.domains_mock.list.called)
+        self.sids_mock.create.assert_called_with(
+            name=sid_name,
+            members=['d1', 'd2'],
+            description=None,
+            enabled=True,
+        )
+
+    def test_sid_create_many_members(self):
+        count = identity_common.LIST_THRESHOLD + 1
+        names = ['dom%d' % n for n in range(count)]
+        arglist = [sid_name, '--members', ','.join(names)]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        # One listing instead of a lookup per member
+        self.domains_mock.list.assert_called_once_with()
+        self.assertFalse(self.domains_mock.get.called)
+        self.assertEqual(
+            ['d%d' % n for n in range(count)],
+            self.sids_mock.create.call_args[1]['members'],
+        )
+
+    def test_sid_create_unknown_members(self):
+        arglist = [sid_name, '--members', 'dom1,nope,gone']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        e = self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        # All unknown members are reported together
+        self.assertIn('gone, nope', str(e))
+        self.assertFalse(self.sids_mock.create.called)
+
+
+class TestSidSet(TestSid):
+
+    def setUp(self):
+        super(TestSidSet, self).setUp()
+
+        self.sids_mock.get.return_value = fakes.FakeResource(None, dict(SID))
+
+        # Get the command object to test
+        self.cmd = sid.SetSid(self.app, None)
+
+    def test_sid_set_members(self):
+        arglist = [sid_id, '--members', 'dom3,dom4']
+        verifylist = [('sid', sid_id), ('members', 'dom3,dom4')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.sids_mock.update.assert_called_once_with(
+            sid_id,
+            name=sid_name,
+            description='research domains',
+            enabled=True,
+            members=['d3', 'd4'],
+        )
+        self.assertEqual(
+            sorted([mock.call('dom3'), mock.call('dom4')]),
+            sorted(self.domains_mock.get.call_args_list),
+        )
+
+    def test_sid_set_members_replaces_members_id(self):
+        self.sids_mock.get.return_value = fakes.FakeResource(
+            None,
+            dict(SID, members_id=['d1']),
+        )
+        arglist = [sid_id, '--members', 'dom3']
+        verifylist = [('sid', sid_id), ('members', 'dom3')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.sids_mock.update.assert_called_once_with(
+            sid_id,
+            name=sid_name,
+            description='research domains',
+            enabled=True,
+            members=['d3'],
+        )
+
+    def test_sid_set_keeps_members_id(self):
+        self.sids_mock.get.return_value = fakes.FakeResource(
+            None,
+            dict(SID, members_id=['d1']),
+        )
+        arglist = [sid_id, '--name', 'lab']
+        verifylist = [('sid', sid_id), ('name', 'lab')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.sids_mock.update.assert_called_once_with(
+            sid_id,
+            name='lab',
+            description='research domains',
+            enabled=True,
+            members=['d1'],
+        )
+
+
+class TestSidTree(TestSid):
+
+    def setUp(self):
+        super(TestSidTree, self).setUp()
+
+        self.sids_mock.list.return_value = [
+            fakes.FakeResource(None, dict(SID, members=['d1', 'd2'])),
+        ]
+        self.domains_mock.list.return_value = [_domain(1), _domain(2)]
+        self.projects_mock = self.app.client_manager.identity.projects
+        self.projects_mock.reset_mock()
+        self.projects_mock.list.return_value = [
+            fakes.FakeResource(None, {
+                'id': 'p1', 'name': 'alpha', 'domain_id': 'd1'}),
+            fakes.FakeResource(None, {
+                'id': 'p2', 'name': 'beta', 'domain_id': 'd1',
+                'parent_id': 'p1'}),
+            fakes.FakeResource(None, {
+                'id': 'p3', 'name': 'lab', 'domain_id': sid_id}),
+            fakes.FakeResource(None, {
+                'id': 'p4', 'name': 'other', 'domain_id': 'd9'}),
+        ]
+        self.assignments_mock = \
+            self.app.client_manager.identity.role_assignments
+        self.assignments_mock.reset_mock()
+        self.assignments_mock.list.return_value = [
+            fakes.FakeResource(None, {
+                'role': {'id': 'r1'},
+                'user': {'id': 'u1'},
+                'scope': {'project': {'id': 'p1'}},
+            }),
+            fakes.FakeResource(None, {
+                'role': {'id': 'r1'},
+                'user': {'id': 'u2'},
+                'scope': {'project': {'id': 'p1'}},
+            }),
+            fakes.FakeResource(None, {
+                'role': {'id': 'r2'},
+                'group': {'id': 'g1'},
+                'scope': {'domain': {'id': 'd2'}},
+            }),
+        ]
+
+        # Get the command object to test
+        self.cmd = sid.TreeSid(self.app, None)
+
+    def test_sid_tree(self):
+        arglist = []
+        verifylist = [('sid', None), ('assignments', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            ('Type', 'ID', 'Name', 'Path', 'Parent', 'Assignments'),
+            columns,
+        )
+        self.assertEqual((
+            ('sid', sid_id, sid_name, sid_name, '', 0),
+            ('domain', 'd1', 'dom1', 'research/dom1', sid_id, 0),
+            ('project', 'p1', 'alpha', 'research/dom1/alpha', 'd1', 2),
+            ('project', 'p2', 'beta', 'research/dom1/alpha/beta', 'p1', 0),
+            ('domain', 'd2', 'dom2', 'research/dom2', sid_id, 1),
+            ('sip', 'p3', 'lab', 'research/lab', sid_id, 0),
+        ), tuple(data))
+        # Everything comes from a single listing of each collection
+        self.sids_mock.list.assert_called_once_with()
+        self.domains_mock.list.assert_called_once_with()
+        self.projects_mock.list.assert_called_once_with()
+        self.assignments_mock.list.assert_called_once_with()
+        self.assertFalse(self.domains_mock.get.called)
+        self.assertFalse(self.projects_mock.get.called)
+
+    def test_sid_tree_one_sid_no_assignments(self):
+        self.sids_mock.get.return_value = fakes.FakeResource(
+            None,
+            dict(SID, members=['d2']),
+        )
+        arglist = [sid_id, '--no-assignments']
+        verifylist = [('sid', sid_id), ('assignments', False)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            [('sid', sid_id), ('domain', 'd2'), ('sip', 'p3')],
+            [row[:2] for row in data],
+        )
+        self.assertFalse(self.sids_mock.list.called)
+        self.assertFalse(self.assignments_mock.list.called)
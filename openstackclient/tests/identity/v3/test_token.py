@@ -13,7 +13,17 @@
 #   under the License.
 #
 
+import datetime
+import os
+
+import fixtures
+import mock
+
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
 from openstackclient.identity.v3 import token
+from openstackclient.tests import fakes
 from openstackclient.tests.identity.v3 import fakes as identity_fakes
 
 
@@ -77,3 +87,145 @@ class TestTokenCreate(TestToken):
             identity_fakes.user_id,
         )
         self.assertEqual(data, datalist)
+
+
+def _expires_at(seconds):
+    expires = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+    return expires.strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+
+
+class TestTokenValidation(TestToken):
+
+    def setUp(self):
+        super(TestTokenValidation, self).setUp()
+
+        self.identity_mock = self.app.client_manager.identity
+        self.identity_mock.auth_url = fakes.AUTH_URL
+        self.identity_mock.get = mock.Mock(side_effect=self._get)
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'tokens.json',
+        )
+
+    def _get(self, url, headers=None):
+        self.assertEqual('/auth/tokens', url)
+        subject = headers['X-Subject-Token']
+        if subject == 'bad':
+            raise identity_exc.NotFound(404)
+        if subject == 'broken':
+            raise identity_exc.InternalServerError(500)
+        body = {
+            'token': {
+                'methods': ['token'],
+                'expires_at': _expires_at(3600),
+                'user': {
+                    'id': identity_fakes.user_id,
+                    'name': identity_fakes.user_name,
+                    'domain': {'id': identity_fakes.domain_id},
+                },
+                'project': {
+                    'id': identity_fakes.project_id,
+                    'name': identity_fakes.project_name,
+                    'domain': {'id': identity_fakes.domain_id},
+                },
+                'roles': [
+                    {'id': '2', 'name': 'member'},
+                    {'id': '1', 'name': 'admin'},
+                ],
+            },
+        }
+        return mock.Mock(headers={'X-Subject-Token': subject}), body
+
+
+class TestTokenValidate(TestTokenValidation):
+
+    def setUp(self):
+        super(TestTokenValidate, self).setUp()
+
+        # Get the command object to test
+        self.cmd = token.ValidateToken(self.app, None)
+
+    def test_token_validate(self):
+        tokens = ['good', 'bad', 'broken', 'good']
+        arglist = tokens + ['--show-tokens']
+        verifylist = [('tokens', tokens), ('show_tokens', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('Token', 'Status', 'User', 'Project', 'Domain',
+                          'Roles', 'Expires', 'Remaining'), columns)
+        self.assertEqual(3, len(data))
+        self.assertEqual(
+            ('good', 'valid', identity_fakes.user_name,
+             identity_fakes.project_name, '', 'admin,member'),
+            data[0][:6],
+        )
+        self.assertTrue(3500 < data[0][7] <= 3600)
+        self.assertEqual(('bad', 'invalid'), data[1][:2])
+        self.assertEqual(('broken', 'error'), data[2][:2])
+        # Duplicates are only validated once
+        self.assertEqual(3, self.identity_mock.get.call_count)
+
+    def test_token_validate_cache(self):
+        arglist = ['good', 'bad', '--cache', self.path]
+        verifylist = [('cache', self.path)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+        self.identity_mock.get.reset_mock()
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # Only the invalid token is checked again
+        self.identity_mock.get.assert_called_once_with(
+            '/auth/tokens',
+            headers={'X-Subject-Token': 'bad'},
+        )
+        self.assertEqual('valid', data[0][1])
+        with open(self.path) as f:
+            self.assertNotIn('good', f.read())
+
+    def test_token_validate_nothing(self):
+        arglist = []
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+
+class TestTokenShow(TestTokenValidation):
+
+    def setUp(self):
+        super(TestTokenShow, self).setUp()
+
+        # Get the command object to test
+        self.cmd = token.ShowToken(self.app, None)
+
+    def test_token_show(self):
+        arglist = ['good']
+        verifylist = [('token', 'good')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('domain', 'domain_id', 'expires', 'project',
+                          'project_id', 'remaining', 'roles', 'user',
+                          'user_id'), columns)
+        self.assertEqual(identity_fakes.project_id, data[4])
+        self.assertEqual('admin,member', data[6])
+        self.assertEqual(identity_fakes.user_id, data[8])
+
+    def test_token_show_invalid(self):
+        arglist = ['bad']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
@@ -14,8 +14,15 @@
 #
 
 import copy
+import csv
+import os
+
+import fixtures
 import mock
 
+from keystoneclient import exceptions as identity_exc
+
+from openstackclient.common import exceptions
 from openstackclient.identity.v3 import user
 from openstackclient.tests import fakes
 from openstackclient.tests.identity.v3 import fakes as identity_fakes
@@ -42,6 +49,21 @@ class TestUser(identity_fakes.TestIdentityv3):
         self.users_mock = self.app.client_manager.identity.users
         self.users_mock.reset_mock()
 
+    @staticmethod
+    def _get(info):
+        # Only the fake resource's own name and ID are found
+        def _get(value):
+            if value in (info['id'], info['name']):
+                return fakes.FakeResource(None, copy.deepcopy(info))
+            raise Exception('not found')
+        return _get
+
+    def write_file(self, name, text):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
 
 class TestUserCreate(TestUser):
 
@@ -470,6 +492,238 @@ class TestUserDelete(TestUser):
             identity_fakes.user_id,
         )
 
+    def test_user_delete_from_file(self):
+        path = self.write_file('users.csv', (
+            "name,email\n"
+            "%s,\n"
+            "ringo,ringo@example.com\n" % identity_fakes.user_name
+        ))
+        results = path + '.out'
+        self.users_mock.get.side_effect = self._get(identity_fakes.USER)
+        self.users_mock.find.side_effect = identity_exc.NotFound(404)
+        self.users_mock.resource_class = fakes.FakeResource
+        arglist = ['--from-file', path, '--results', results,
+                   '--concurrency', '2']
+        verifylist = [
+            ('user', None),
+            ('from_file', path),
+            ('concurrency', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.users_mock.delete.assert_called_once_with(
+            identity_fakes.user_id,
+        )
+        with open(results) as f:
+            self.assertEqual(
+                ['deleted', 'not found'],
+                [row[-1] for row in list(csv.reader(f))[1:]],
+            )
+
+    def test_user_delete_from_file_domain(self):
+        # john exists in the domain and elsewhere, paul only elsewhere
+        path = self.write_file('users.yaml', (
+            "- name: john\n"
+            "  domain: %s\n"
+            "- name: paul\n" % identity_fakes.domain_name
+        ))
+        self.domains_mock.get.side_effect = self._get(identity_fakes.DOMAIN)
+        self.domains_mock.find.side_effect = identity_exc.NotFound(404)
+        self.domains_mock.resource_class = fakes.FakeResource
+        self.users_mock.list.side_effect = lambda domain: [
+            fakes.FakeResource(None, {'id': 'u-john', 'name': 'john'}),
+        ]
+        self.users_mock.get.side_effect = identity_exc.NotFound(404)
+        self.users_mock.find.side_effect = identity_exc.NotFound(404)
+        self.users_mock.resource_class = fakes.FakeResource
+        arglist = ['--from-file', path]
+        verifylist = [('from_file', path), ('domain', None)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.users_mock.list.assert_called_once_with(
+            domain=identity_fakes.domain_id,
+        )
+        self.users_mock.delete.assert_called_once_with('u-john')
+
+    def test_user_delete_from_file_default_domain(self):
+        path = self.write_file('users.csv', "name\njohn\n")
+        self.domains_mock.get.side_effect = self._get(identity_fakes.DOMAIN)
+        self.domains_mock.find.side_effect = identity_exc.NotFound(404)
+        self.domains_mock.resource_class = fakes.FakeResource
+        self.users_mock.list.side_effect = lambda domain: [
+            fakes.FakeResource(None, {'id': 'u-john', 'name': 'john'}),
+        ]
+        arglist = ['--from-file', path, '--domain', identity_fakes.domain_id]
+        verifylist = [('domain', identity_fakes.domain_id)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertFalse(self.users_mock.find.called)
+        self.users_mock.delete.assert_called_once_with('u-john')
+
+    def test_user_delete_from_file_ambiguous(self):
+        path = self.write_file('users.csv', "name\njohn\n")
+        self.users_mock.get.side_effect = identity_exc.NotFound(404)
+        self.users_mock.find.side_effect = identity_exc.NoUniqueMatch()
+        self.users_mock.resource_class = fakes.FakeResource
+        arglist = ['--from-file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.users_mock.delete.called)
+
+
+class TestUserImport(TestUser):
+
+    def setUp(self):
+        super(TestUserImport, self).setUp()
+
+        for manager, info in (
+            (self.domains_mock, identity_fakes.DOMAIN),
+            (self.projects_mock, identity_fakes.PROJECT),
+            (self.roles_mock, identity_fakes.ROLE),
+        ):
+            manager.get.side_effect = self._get(info)
+            manager.find.side_effect = identity_exc.NotFound(404)
+            manager.resource_class = fakes.FakeResource
+
+        # Users without a domain go to the configured default domain
+        self.app.default_domain = 'Default'
+        get_domain = self.domains_mock.get.side_effect
+
+        def _get_domain(value):
+            if value == 'Default':
+                return fakes.FakeResource(None, {
+                    'id': 'dddddddd',
+                    'name': 'Default',
+                })
+            return get_domain(value)
+        self.domains_mock.get.side_effect = _get_domain
+
+        # paul only exists in the domain
+        self.users_mock.list.side_effect = lambda domain: [
+            fakes.FakeResource(None, copy.deepcopy(identity_fakes.USER)),
+        ] if domain == identity_fakes.domain_id else []
+        self.users_mock.create.side_effect = lambda **kw: \
+            fakes.FakeResource(None, {
+                'id': 'id-' + kw['name'],
+                'name': kw['name'],
+            })
+
+        # Get the command object to test
+        self.cmd = user.ImportUser(self.app, None)
+
+    def test_user_import(self):
+        path = self.write_file('users.yaml', (
+            "- name: john\n"
+            "  domain: %s\n"
+            "  description: rhythm guitar\n"
+            "- name: george\n"
+            "  project: %s\n"
+            "- name: ringo\n"
+            "  domain: %s\n" % (
+                identity_fakes.domain_id,
+                identity_fakes.project_name,
+                identity_fakes.domain_name,
+            )
+        ))
+        arglist = ['--file', path, '--role', identity_fakes.role_id]
+        verifylist = [
+            ('file', path),
+            ('role', [identity_fakes.role_id]),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('john', 'id-john', '', identity_fakes.role_id, 'created'),
+            ('george', 'id-george', identity_fakes.project_name,
+             identity_fakes.role_id, 'created'),
+            ('ringo', 'id-ringo', '', identity_fakes.role_id, 'created'),
+        ], data)
+        # One listing of existing users per domain
+        self.assertEqual(
+            sorted([identity_fakes.domain_id, 'dddddddd']),
+            sorted(c[1]['domain']
+                   for c in self.users_mock.list.call_args_list),
+        )
+        self.users_mock.create.assert_any_call(
+            name='john',
+            domain=identity_fakes.domain_id,
+            default_project=None,
+            password=None,
+            email=None,
+            description='rhythm guitar',
+            enabled=True,
+        )
+        # Users without a domain are created where they were looked for
+        self.users_mock.create.assert_any_call(
+            name='george',
+            domain='dddddddd',
+            default_project=identity_fakes.project_id,
+            password=None,
+            email=None,
+            description=None,
+            enabled=True,
+        )
+        self.roles_mock.grant.assert_any_call(
+            identity_fakes.role_id,
+            user='id-george',
+            project=identity_fakes.project_id,
+        )
+        self.roles_mock.grant.assert_any_call(
+            identity_fakes.role_id,
+            user='id-ringo',
+            domain=identity_fakes.domain_id,
+        )
+
+    def test_user_import_failures(self):
+        self.users_mock.create.side_effect = Exception('conflict')
+        path = self.write_file('users.yaml', "- name: john\n")
+        arglist = ['--file', path]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
+    def test_user_import_existing(self):
+        path = self.write_file('users.yaml', (
+            "- name: %s\n"
+            "  domain: %s\n"
+            "- name: %s\n" % (
+                identity_fakes.user_name,
+                identity_fakes.domain_name,
+                'john',
+            )
+        ))
+        arglist = ['--file', path, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            (identity_fakes.user_name, identity_fakes.user_id, '', '',
+             'exists'),
+            ('john', '', '', '', 'pending'),
+        ], data)
+        self.assertFalse(self.users_mock.create.called)
+
 
 class TestUserList(TestUser):
 
@@ -571,7 +825,9 @@ class TestUserList(TestUser):
         # DisplayCommandBase.take_action() returns two tuples
         columns, data = self.cmd.take_action(parsed_args)
 
-        self.users_mock.list.assert_called_with()
+        self.users_mock.list.assert_called_with(
+            domain=identity_fakes.domain_id,
+        )
 
         collist = ('ID', 'Name')
         self.assertEqual(columns, collist)
@@ -14,13 +14,41 @@
 #
 
 import copy
+import hashlib
+import io
 import mock
+import os
+import six
 
+import fixtures
+from glanceclient.common import utils as gc_utils
+from glanceclient import exc as gc_exceptions
+
+from openstackclient.common import exceptions
 from openstackclient.image.v1 import image
 from openstackclient.tests import fakes
 from openstackclient.tests.image.v1 import fakes as image_fakes
 
 
+class NonSeekableStream(object):
+    """Behaves like urllib3's response.raw, which can not seek"""
+
+    def __init__(self, data):
+        self._data = six.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+    def seekable(self):
+        return False
+
+    def seek(self, offset, whence=0):
+        raise io.UnsupportedOperation('seek')
+
+    def tell(self):
+        raise io.UnsupportedOperation('tell')
+
+
 class TestImage(image_fakes.TestImagev1):
 
     def setUp(self):
@@ -105,6 +133,106 @@ class TestImageCreate(TestImage):
         for expected, result in zip(expects, results):
             self.assertEqual(expected, result)
 
+    def _make_image_file(self, content):
+        tmpdir = self.useFixture(fixtures.TempDir()).path
+        path = os.path.join(tmpdir, 'image.img')
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def _fake_upload(self, checksum):
+        # Drain the data the way glanceclient would and report a checksum
+        def _create(**kwargs):
+            data = kwargs['data']
+            while data.read(4):
+                pass
+            info = copy.deepcopy(image_fakes.IMAGE)
+            info['checksum'] = checksum
+            return fakes.FakeResource(None, info, loaded=True)
+        return _create
+
+    @mock.patch('openstackclient.image.v1.image.utils.find_resource')
+    def test_create_file_checksum(self, find_mock):
+        content = b'0123456789' * 10
+        path = self._make_image_file(content)
+        find_mock.side_effect = exceptions.CommandError()
+        self.images_mock.create.side_effect = self._fake_upload(
+            hashlib.md5(content).hexdigest(),
+        )
+
+        arglist = [
+            '--file', path,
+            '--sha256',
+            '--limit-rate', '1024',
+            image_fakes.image_name,
+        ]
+        verifylist = [
+            ('file', path),
+            ('sha256', True),
+            ('limit_rate', 1024),
+            ('progress', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        kwargs = self.images_mock.create.call_args[1]
+        self.assertNotIn('sha256', kwargs)
+        self.assertNotIn('limit_rate', kwargs)
+        self.assertNotIn('progress', kwargs)
+        self.assertEqual(len(content), kwargs['data'].meter.bytes)
+        self.assertIn('sha256', columns)
+        self.assertEqual(
+            hashlib.sha256(content).hexdigest(),
+            data[columns.index('sha256')],
+        )
+
+    @mock.patch('openstackclient.image.v1.image.utils.find_resource')
+    def test_create_file_size(self, find_mock):
+        content = b'0123456789'
+        path = self._make_image_file(content)
+        find_mock.side_effect = exceptions.CommandError()
+        sizes = []
+
+        def _create(**kwargs):
+            # glanceclient probes the data for its size before sending it
+            sizes.append(gc_utils.get_file_size(kwargs['data']))
+            return self._fake_upload(hashlib.md5(content).hexdigest())(
+                **kwargs)
+        self.images_mock.create.side_effect = _create
+
+        arglist = [
+            '--file', path,
+            image_fakes.image_name,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual([len(content)], sizes)
+        self.assertEqual(
+            len(content),
+            self.images_mock.create.call_args[1]['size'],
+        )
+
+    @mock.patch('openstackclient.image.v1.image.utils.find_resource')
+    def test_create_file_checksum_mismatch(self, find_mock):
+        path = self._make_image_file(b'not what the server saw')
+        find_mock.side_effect = exceptions.CommandError()
+        self.images_mock.create.side_effect = self._fake_upload('bogus')
+
+        arglist = [
+            '--file', path,
+            image_fakes.image_name,
+        ]
+        verifylist = [
+            ('file', path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+
 
 class TestImageDelete(TestImage):
 
@@ -137,3 +265,288 @@ class TestImageDelete(TestImage):
         self.images_mock.delete.assert_called_with(
             image_fakes.image_id,
         )
+
+
+class TestImageSave(TestImage):
+
+    content = [b'0123456789', b'abcdefghij']
+
+    def setUp(self):
+        super(TestImageSave, self).setUp()
+
+        image_info = copy.deepcopy(image_fakes.IMAGE)
+        image_info['size'] = 20
+        image_info['checksum'] = hashlib.md5(
+            b''.join(self.content),
+        ).hexdigest()
+        self.images_mock.get.return_value = fakes.FakeResource(
+            None,
+            image_info,
+            loaded=True,
+        )
+        self.images_mock.data.return_value = iter(self.content)
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'image.img',
+        )
+
+        # Get the command object to test
+        self.cmd = image.SaveImage(self.app, None)
+
+    def test_image_save_verified(self):
+        arglist = [
+            '--file', self.path,
+            '--buffer-size', '4096',
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', self.path),
+            ('buffer_size', 4096),
+            ('image', image_fakes.image_id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertFalse(self.images_mock.data.call_args[1]['do_checksum'])
+        with open(self.path, 'rb') as f:
+            self.assertEqual(b''.join(self.content), f.read())
+
+    def test_image_save_checksum_mismatch(self):
+        self.images_mock.get.return_value.checksum = 'bogus'
+
+        arglist = [
+            '--file', self.path,
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', self.path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertEqual([], os.listdir(os.path.dirname(self.path)))
+
+
+class TestImageList(TestImage):
+
+    def setUp(self):
+        super(TestImageList, self).setUp()
+
+        self.images_mock.list.return_value = (
+            fakes.FakeResource(
+                None,
+                {'id': 'im%d' % i, 'name': 'image-%d' % i},
+                loaded=True,
+            ) for i in range(5)
+        )
+
+        # Get the command object to test
+        self.cmd = image.ListImage(self.app, None)
+
+    def test_image_list_no_options(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.list.assert_called_with()
+        self.assertEqual(["ID", "Name"], columns)
+        self.assertEqual(5, len(tuple(data)))
+
+    def test_image_list_filters(self):
+        arglist = [
+            '--page-size', '100',
+            '--name', image_fakes.image_name,
+            '--status', 'active',
+            '--visibility', 'private',
+            '--property', 'os_distro=ubuntu',
+            '--size-min', '1024',
+            '--sort-key', 'name',
+            '--sort-dir', 'asc',
+            '--limit', '2',
+        ]
+        verifylist = [
+            ('page_size', 100),
+            ('name', image_fakes.image_name),
+            ('status', 'active'),
+            ('visibility', 'private'),
+            ('properties', {'os_distro': 'ubuntu'}),
+            ('size_min', 1024),
+            ('size_max', None),
+            ('sort_key', 'name'),
+            ('sort_dir', 'asc'),
+            ('limit', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.list.assert_called_with(
+            page_size=100,
+            sort_key='name',
+            sort_dir='asc',
+            filters={
+                'name': image_fakes.image_name,
+                'status': 'active',
+                'size_min': 1024,
+                'is_public': False,
+                'properties': {'os_distro': 'ubuntu'},
+            },
+        )
+        datalist = (
+            ('im0', 'image-0'),
+            ('im1', 'image-1'),
+        )
+        self.assertEqual(datalist, tuple(data))
+
+
+@mock.patch('openstackclient.image.v1.image.requests')
+class TestImageImport(TestImage):
+
+    url = 'http://images.example.com/cirros.img'
+
+    def setUp(self):
+        super(TestImageImport, self).setUp()
+
+        self.image_info = copy.deepcopy(image_fakes.IMAGE)
+        self.image_info['status'] = 'active'
+        self.images_mock.create.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(self.image_info),
+            loaded=True,
+        )
+        self.images_mock.get.return_value = fakes.FakeResource(
+            None,
+            copy.deepcopy(self.image_info),
+            loaded=True,
+        )
+
+        # Get the command object to test
+        self.cmd = image.ImportImage(self.app, None)
+
+    def _head(self, r_mock, size=64):
+        r_mock.head.return_value = mock.Mock(
+            status_code=200,
+            headers={'content-length': str(size)},
+        )
+
+    def test_image_import_server_copy(self, r_mock):
+        self._head(r_mock)
+
+        arglist = [
+            '--url', self.url,
+            image_fakes.image_name,
+        ]
+        verifylist = [
+            ('url', self.url),
+            ('name', image_fakes.image_name),
+            ('relay', None),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.create.assert_called_with(
+            copy_from=self.url,
+            name=image_fakes.image_name,
+            disk_format='raw',
+            container_format='bare',
+            is_public=True,
+            size=64,
+        )
+        self.assertFalse(r_mock.get.called)
+        self.assertEqual(('id', 'name', 'status'), columns)
+
+    def test_image_import_relay_fallback(self, r_mock):
+        self._head(r_mock, size=8)
+        r_mock.get.return_value.raw = six.BytesIO(b'01234567')
+        self.images_mock.create.side_effect = [
+            gc_exceptions.HTTPForbidden(),
+            self.images_mock.create.return_value,
+        ]
+
+        arglist = [
+            '--url', self.url,
+            image_fakes.image_name,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.images_mock.create.call_count)
+        kwargs = self.images_mock.create.call_args[1]
+        self.assertNotIn('copy_from', kwargs)
+        self.assertEqual(b'01234567', kwargs['data'].read())
+        r_mock.get.return_value.close.assert_called_with()
+
+    def test_image_import_relay_non_seekable(self, r_mock):
+        content = b'0123456789' * 10
+        self._head(r_mock, size=len(content))
+        r_mock.get.return_value.raw = NonSeekableStream(content)
+        received = []
+
+        def _create(**kwargs):
+            if 'copy_from' in kwargs:
+                raise gc_exceptions.HTTPForbidden()
+            # A stream that can not seek must not pretend it can, clients
+            # then send it in chunks instead of sizing it first
+            data = kwargs['data']
+            received.append((hasattr(data, 'seek'), hasattr(data, 'tell')))
+            received.append(b''.join(iter(lambda: data.read(16), b'')))
+            info = copy.deepcopy(self.image_info)
+            info['checksum'] = hashlib.md5(content).hexdigest()
+            return fakes.FakeResource(None, info, loaded=True)
+        self.images_mock.create.side_effect = _create
+
+        arglist = [
+            '--url', self.url,
+            image_fakes.image_name,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual([(False, False), content], received)
+        kwargs = self.images_mock.create.call_args[1]
+        self.assertEqual(len(content), kwargs['size'])
+        self.assertFalse(hasattr(kwargs['data'], 'seek'))
+        self.assertEqual(len(content), kwargs['data'].meter.bytes)
+
+    def test_image_import_no_relay(self, r_mock):
+        self._head(r_mock)
+        self.images_mock.create.side_effect = gc_exceptions.HTTPForbidden()
+
+        arglist = [
+            '--url', self.url,
+            '--no-relay',
+            image_fakes.image_name,
+        ]
+        verifylist = [
+            ('relay', False),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            gc_exceptions.HTTPForbidden,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(r_mock.get.called)
+
+    def test_image_import_bad_scheme(self, r_mock):
+        arglist = [
+            '--url', 'file:///etc/passwd',
+            image_fakes.image_name,
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        self.assertFalse(self.images_mock.create.called)
@@ -14,8 +14,16 @@
 #
 
 import copy
+import hashlib
+import io
+import mock
+import os
 
+import fixtures
+
+from openstackclient.common import exceptions
 from openstackclient.image.v1 import image
+from openstackclient.image.v2 import image as image_v2
 from openstackclient.tests import fakes
 from openstackclient.tests.image.v2 import fakes as image_fakes
 
@@ -61,3 +69,207 @@ class TestImageDelete(TestImage):
         self.images_mock.delete.assert_called_with(
             image_fakes.image_id,
         )
+
+
+class TestImageSave(TestImage):
+
+    content = [b'0123456789', b'abcdefghij']
+
+    def setUp(self):
+        super(TestImageSave, self).setUp()
+
+        image_info = copy.deepcopy(image_fakes.IMAGE)
+        image_info['size'] = 20
+        image_info['checksum'] = hashlib.md5(
+            b''.join(self.content),
+        ).hexdigest()
+        self.images_mock.get.return_value = fakes.FakeResource(
+            None,
+            image_info,
+            loaded=True,
+        )
+        self.images_mock.data.return_value = iter(self.content)
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path,
+            'image.img',
+        )
+
+        # Get the command object to test
+        self.cmd = image_v2.SaveImage(self.app, None)
+
+    def test_image_save_verified(self):
+        arglist = [
+            '--file', self.path,
+            '--buffer-size', '4096',
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', self.path),
+            ('buffer_size', 4096),
+            ('image', image_fakes.image_id),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.images_mock.data.assert_called_with(
+            image_fakes.image_id,
+            do_checksum=False,
+        )
+        with open(self.path, 'rb') as f:
+            self.assertEqual(b''.join(self.content), f.read())
+        self.assertEqual(['image.img'],
+                         os.listdir(os.path.dirname(self.path)))
+
+    def test_image_save_checksum_mismatch(self):
+        self.images_mock.get.return_value.checksum = 'bogus'
+
+        arglist = [
+            '--file', self.path,
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', self.path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        # Neither the image nor the partial download is left behind
+        self.assertEqual([], os.listdir(os.path.dirname(self.path)))
+
+    def test_image_save_checksum_mismatch_keeps_existing_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'good image')
+        self.images_mock.get.return_value.checksum = 'bogus'
+
+        arglist = [
+            '--file', self.path,
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', self.path),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.assertRaises(
+            exceptions.CommandError,
+            self.cmd.take_action,
+            parsed_args,
+        )
+        with open(self.path, 'rb') as f:
+            self.assertEqual(b'good image', f.read())
+
+    def test_image_save_stdout(self):
+        arglist = [
+            '--file', '-',
+            image_fakes.image_id,
+        ]
+        verifylist = [
+            ('file', '-'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        stdout = mock.Mock(buffer=io.BytesIO())
+        with mock.patch('sys.stdout', stdout):
+            self.cmd.take_action(parsed_args)
+
+        self.assertEqual(b''.join(self.content), stdout.buffer.getvalue())
+        self.assertFalse(os.path.exists('-'))
+
+
+class TestImageList(TestImage):
+
+    def setUp(self):
+        super(TestImageList, self).setUp()
+
+        self.fetched = []
+
+        def _list(**kwargs):
+            for i in range(5):
+                self.fetched.append(i)
+                yield fakes.FakeResource(
+                    None,
+                    {'id': 'im%d' % i, 'name': 'image-%d' % i},
+                    loaded=True,
+                )
+
+        self.images_mock.list.side_effect = _list
+
+        # Get the command object to test
+        self.cmd = image_v2.ListImage(self.app, None)
+
+    def test_image_list_no_options(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.list.assert_called_with()
+        self.assertEqual(["ID", "Name"], columns)
+        self.assertEqual(5, len(tuple(data)))
+
+    def test_image_list_filters(self):
+        arglist = [
+            '--page-size', '100',
+            '--name', image_fakes.image_name,
+            '--status', 'active',
+            '--visibility', 'shared',
+            '--property', 'os_distro=ubuntu',
+            '--size-min', '1024',
+            '--size-max', '4096',
+            '--sort-key', 'name',
+            '--sort-dir', 'desc',
+        ]
+        verifylist = [
+            ('page_size', 100),
+            ('name', image_fakes.image_name),
+            ('status', 'active'),
+            ('visibility', 'shared'),
+            ('properties', {'os_distro': 'ubuntu'}),
+            ('size_min', 1024),
+            ('size_max', 4096),
+            ('sort_key', 'name'),
+            ('sort_dir', 'desc'),
+            ('limit', None),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.list.assert_called_with(
+            page_size=100,
+            filters={
+                'name': image_fakes.image_name,
+                'status': 'active',
+                'visibility': 'shared',
+                'size_min': 1024,
+                'size_max': 4096,
+                'os_distro': 'ubuntu',
+                'sort_key': 'name',
+                'sort_dir': 'desc',
+            },
+        )
+        self.assertEqual(5, len(tuple(data)))
+
+    def test_image_list_limit(self):
+        arglist = [
+            '--limit', '2',
+        ]
+        verifylist = [
+            ('limit', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.images_mock.list.assert_called_with()
+        datalist = (
+            ('im0', 'image-0'),
+            ('im1', 'image-1'),
+        )
+        self.assertEqual(datalist, tuple(data))
+        # The listing stops without fetching the remaining images
+        self.assertEqual([0, 1], self.fetched)
@@ -355,3 +355,109 @@ class TestContainerShow(TestObject):
             object_fakes.container_name,
         )
         self.assertEqual(data, datalist)
+
+
+class TestContainerStats(TestObject):
+
+    def setUp(self):
+        super(TestContainerStats, self).setUp()
+
+        self.app.restapi = mock.Mock()
+
+        # Get the command object to test
+        self.cmd = container.StatContainer(self.app, None)
+
+    def _fake_listing(self, url, params=None):
+        # Serve a two-object listing one object per page
+        listing = [
+            copy.deepcopy(object_fakes.OBJECT),
+            copy.deepcopy(object_fakes.OBJECT_2),
+        ]
+        listing[0]['name'] = 'cards/' + listing[0]['name']
+        listing[1]['name'] = 'disks/' + listing[1]['name']
+        listing[1]['content_type'] = 'application/octet-stream'
+        marker = params.get('marker')
+        for i, obj in enumerate(listing):
+            if marker is None or obj['name'] > marker:
+                return listing[i:i + 1]
+        return []
+
+    def test_container_stats_depth(self):
+        self.app.restapi.list.side_effect = self._fake_listing
+
+        arglist = [
+            object_fakes.container_name,
+            '--depth', '1',
+        ]
+        verifylist = [
+            ('containers', [object_fakes.container_name]),
+            ('depth', 1),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        collist = ('Container', 'Prefix', 'Count', 'Bytes')
+        self.assertEqual(columns, collist)
+        datalist = (
+            (object_fakes.container_name, 'cards/', 1,
+             object_fakes.object_bytes_1),
+            (object_fakes.container_name, 'disks/', 1,
+             object_fakes.object_bytes_2),
+        )
+        self.assertEqual(tuple(data), datalist)
+        # Two pages of objects plus the terminating empty page
+        self.assertEqual(self.app.restapi.list.call_count, 3)
+
+    def test_container_stats_by_content_type(self):
+        self.app.restapi.list.side_effect = self._fake_listing
+
+        arglist = [
+            object_fakes.container_name,
+            '--by-content-type',
+        ]
+        verifylist = [
+            ('by_content_type', True),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        collist = ('Container', 'Content Type', 'Count', 'Bytes')
+        self.assertEqual(columns, collist)
+        datalist = (
+            (object_fakes.container_name, 'application/octet-stream', 1,
+             object_fakes.object_bytes_2),
+            (object_fakes.container_name, object_fakes.object_content_type_1,
+             1, object_fakes.object_bytes_1),
+        )
+        self.assertEqual(tuple(data), datalist)
+
+    @mock.patch(
+        'openstackclient.object.v1.container.lib_container.stat_container'
+    )
+    @mock.patch(
+        'openstackclient.object.v1.container.lib_container.list_containers'
+    )
+    def test_container_stats_all_containers(self, l_mock, s_mock):
+        l_mock.return_value = [
+            copy.deepcopy(object_fakes.CONTAINER),
+            copy.deepcopy(object_fakes.CONTAINER_2),
+        ]
+        s_mock.return_value = {'': {'count': 2, 'bytes': 10}}
+
+        parsed_args = self.check_parser(self.cmd, [], [('containers', [])])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        l_mock.assert_called_with(
+            self.app.restapi,
+            AUTH_URL,
+            full_listing=True,
+        )
+        datalist = (
+            (object_fakes.container_name, '', 2, 10),
+            (object_fakes.container_name_2, '', 2, 10),
+        )
+        self.assertEqual(tuple(data), datalist)
+        self.assertEqual(s_mock.call_count, 2)